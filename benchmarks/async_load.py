@@ -0,0 +1,131 @@
+"""
+Sync vs async dashboard read path under concurrent clients, in one worker.
+
+    python -m benchmarks.async_load --clients 200 --requests 5 --halls 4 --tables 15 --machines 200
+
+Every client is a coroutine sending requests through Django's async request
+handler (the test ``AsyncClient``), which runs views the way an ASGI server
+does: async views on the event loop, sync DRF views handed to the worker's
+sync thread. The response cache is replaced by a dummy cache unless
+``--cached`` is given, so each request exercises the ORM path.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, timedelta
+
+from benchmarks import benchmark_database, setup_django, summarize
+
+ENDPOINTS = {
+    'table_halls': ('/api/table/hall/', '/api/table/async/hall/'),
+    'table_game_day': ('/api/table/game-day/', '/api/table/async/game-day/'),
+    'slot_halls': ('/api/slot/halls/', '/api/slot/async/halls/'),
+    'slot_game_date': ('/api/slot/game_date/', '/api/slot/async/game_date/'),
+}
+
+
+def populate(halls, tables, machines, days):
+    from game_table.models import CloseFloot, GameDayLive, Hall, Plaque, Table, TableResult
+    from slot_machine.models import DailyAmount, GameDay, HallDailySummary, SlotMachine
+    from slot_machine.models import Hall as SlotHall
+
+    first_day = date(2024, 1, 1)
+    live_day = GameDayLive.objects.create(date=first_day + timedelta(days=days - 1))
+    table_rows = []
+    for hall_index in range(halls):
+        hall = Hall.objects.create(name=f'Hall {hall_index}')
+        table_rows += Table.objects.bulk_create([
+            Table(name=f'H{hall_index} T{index}', hall=hall, open_flot={'5': 10, '25': 4}, open_flot_total=150)
+            for index in range(tables)
+        ])
+    CloseFloot.objects.bulk_create([CloseFloot(table=table, game_day=live_day) for table in table_rows], batch_size=100)
+    Plaque.objects.bulk_create([Plaque(table=table, game_day=live_day) for table in table_rows], batch_size=100)
+    TableResult.objects.bulk_create([TableResult(table=table, game_day=live_day) for table in table_rows],
+                                    batch_size=100)
+
+    slot_halls = [SlotHall.objects.create(name=f'Slot hall {index}') for index in range(halls)]
+    slot_machines = [
+        SlotMachine.objects.create(name=f'{index}', brand=f'Brand {index % 5}', hall=slot_halls[index % halls])
+        for index in range(machines)
+    ]
+    slot_days = GameDay.objects.bulk_create([GameDay(date=first_day + timedelta(days=offset)) for offset in range(days)])
+    DailyAmount.objects.bulk_create([
+        DailyAmount(slot_machine=slot_machine, game_day=game_day, amount=(slot_machine.id * offset) % 500)
+        for offset, game_day in enumerate(slot_days) for slot_machine in slot_machines
+    ], batch_size=200)
+    HallDailySummary.objects.rebuild()
+
+    return {'start_date': str(first_day), 'end_date': str(slot_days[-1].date)}
+
+
+async def load(path, params, clients, requests_per_client):
+    from django.test import AsyncClient
+
+    latencies = []
+
+    async def client():
+        http = AsyncClient()
+        for _ in range(requests_per_client):
+            started = time.perf_counter()
+            response = await http.get(path, params)
+            latencies.append((time.perf_counter() - started) * 1000)
+            assert response.status_code == 200, (path, response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    wall = time.perf_counter() - started
+
+    return {
+        **summarize(latencies),
+        'wall_s': round(wall, 3),
+        'requests_per_s': round(len(latencies) / wall, 1),
+    }
+
+
+def run(clients, requests_per_client, halls, tables, machines, days, cached):
+    from django.test import override_settings
+    from django_rest import game_days
+
+    caches = None if cached else {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+
+    with benchmark_database():
+        date_range = populate(halls, tables, machines, days)
+        game_days.invalidate()
+        report = {
+            'clients': clients,
+            'requests_per_client': requests_per_client,
+            'rows': {'halls': halls, 'tables': halls * tables, 'slot_machines': machines, 'days': days},
+            'cached': cached,
+            'endpoints': {},
+        }
+
+        with override_settings(**({'CACHES': caches} if caches else {})):
+            for name, (sync_path, async_path) in ENDPOINTS.items():
+                params = date_range if name == 'slot_halls' else {}
+                report['endpoints'][name] = {
+                    variant: asyncio.run(load(path, params, clients, requests_per_client))
+                    for variant, path in (('sync', sync_path), ('async', async_path))
+                }
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clients', type=int, default=200, help="Concurrent clients.")
+    parser.add_argument('--requests', type=int, default=5, help="Requests per client per endpoint variant.")
+    parser.add_argument('--halls', type=int, default=4)
+    parser.add_argument('--tables', type=int, default=15, help="Live tables per hall.")
+    parser.add_argument('--machines', type=int, default=200, help="Slot machines in total.")
+    parser.add_argument('--days', type=int, default=7, help="Slot game days, all covered by the range report.")
+    parser.add_argument('--cached', action='store_true', help="Keep the response cache enabled.")
+    options = parser.parse_args()
+
+    setup_django()
+    print(json.dumps(run(options.clients, options.requests, options.halls, options.tables, options.machines,
+                         options.days, options.cached), indent=2))
+
+
+if __name__ == '__main__':
+    main()
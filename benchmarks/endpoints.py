@@ -0,0 +1,313 @@
+"""
+Query count, latency and response size of every API endpoint at several data
+scales, as a JSON report.
+
+    python -m benchmarks.endpoints --scale small --scale medium --requests 20 --output report.json
+    python -m benchmarks.endpoints --scale small --compare report.json
+
+Each scale gets a fresh database filled by ``populate()``: N halls of M live
+tables and M slot machines each, D game days, and F fills per table and day.
+Every endpoint is then called ``--requests`` times through the test client
+(full middleware stack). The read endpoints run first, then the write
+endpoints, whose requests are built so they can be repeated. The response
+cache is replaced by a dummy cache unless ``--cached`` is given, so every
+request exercises the ORM path.
+
+``--compare`` takes a previous report and lists the endpoints whose query
+count grew, or whose p95 latency grew by more than ``--tolerance``.
+
+The event streams (``events/``), the file import and the destructive
+endpoints (deletes, hall moves, day creation) are not measured.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from datetime import date, timedelta
+
+from benchmarks import benchmark_database, setup_django, summarize
+
+SCALES = {
+    'small': {'halls': 2, 'tables': 10, 'days': 7, 'fills': 4},
+    'medium': {'halls': 4, 'tables': 30, 'days': 30, 'fills': 8},
+    'large': {'halls': 8, 'tables': 60, 'days': 90, 'fills': 12},
+}
+
+DENOMINATIONS = (1, 5, 25, 100, 500)
+OPEN_FLOT = {'5': 40, '25': 20, '100': 10, '500': 4}
+
+# (name, method, path, request data); paths and data are formatted with the
+# ids returned by populate(), data may also be a callable of (ids, iteration).
+READS = [
+    ('table.list', 'GET', '/api/table/create/', None),
+    ('table.detail', 'GET', '/api/table/delete/{table}/', None),
+    ('table.halls', 'GET', '/api/table/hall/', None),
+    ('table.halls.async', 'GET', '/api/table/async/hall/', None),
+    ('table.game_day', 'GET', '/api/table/game-day/', None),
+    ('table.game_day.async', 'GET', '/api/table/async/game-day/', None),
+    ('table.close_floot', 'GET', '/api/table/close-table/{close_floot}/', None),
+    ('table.plaque', 'GET', '/api/table/plaque/{plaque}/', None),
+    ('slot.halls', 'GET', '/api/slot/halls/', {'start_date': '{start_date}', 'end_date': '{end_date}'}),
+    ('slot.halls.async', 'GET', '/api/slot/async/halls/', {'start_date': '{start_date}', 'end_date': '{end_date}'}),
+    ('slot.machines', 'GET', '/api/slot/slot-machine/', None),
+    ('slot.machine', 'GET', '/api/slot/slot-machine/{slot_machine}/', None),
+    ('slot.game_days', 'GET', '/api/slot/close-game-day/', None),
+    ('slot.game_day', 'GET', '/api/slot/game-days/{slot_game_day}/', None),
+    ('slot.daily_amounts', 'GET', '/api/slot/daily-amounts/', None),
+    ('slot.daily_amount', 'GET', '/api/slot/daily-amounts/{daily_amount}/', None),
+    ('slot.current_day', 'GET', '/api/slot/game_date/', None),
+    ('slot.current_day.async', 'GET', '/api/slot/async/game_date/', None),
+    ('slot.halls_with_machines', 'GET', '/api/slot/halls-with-slot-machines/', None),
+    ('transactions.fill_credits', 'GET', '/api/transactions/fill-credit/', None),
+    ('transactions.fill_credit', 'GET', '/api/transactions/fill-credit/{fill_credit}/', None),
+    ('chip.list', 'GET', '/api/chip/', None),
+    ('chip.detail', 'GET', '/api/chip/{chip}/', None),
+    ('customer.list', 'GET', '/api/customers/create/', None),
+    ('reports.chip_movements', 'GET', '/api/reports/chip-movements/',
+     {'start_date': '{start_date}', 'end_date': '{end_date}'}),
+    ('reports.export', 'GET', '/api/reports/export/fill-credits/', {'format': 'ndjson'}),
+]
+
+WRITES = [
+    ('transactions.post', 'POST', '/api/transactions/fill-credit/',
+     lambda ids, iteration: {'table': ids['table'], 'game_day': ids['live_game_day'],
+                             'fill_credit': 25 if iteration % 2 else -25}),
+    ('transactions.batch', 'POST', '/api/transactions/fill-credit/batch/',
+     lambda ids, iteration: {'entries': [
+         {'table': table, 'game_day': ids['live_game_day'], 'fill_credit': 5 * (index % 4 + 1)}
+         for index, table in enumerate(ids['tables'][:20])
+     ]}),
+    ('table.close_update', 'PUT', '/api/table/close-table/{closed_floot}/',
+     lambda ids, iteration: {'close_flot': {**OPEN_FLOT, '5': 40 + iteration % 5}}),
+    ('table.plaque_update', 'PUT', '/api/table/plaque/{plaque}/',
+     lambda ids, iteration: {'plaques': {'500': iteration % 3}}),
+    ('table.reconcile', 'POST', '/api/table/reconcile/', {'game_day': '{live_game_day}'}),
+    ('slot.close_machine', 'PUT', '/api/slot/close-slot-machine/{slot_machine}/',
+     lambda ids, iteration: {'amount': 100 + iteration}),
+    ('slot.close_machines', 'PUT', '/api/slot/close-slot-machines/',
+     lambda ids, iteration: {str(machine): 50 + iteration for machine in ids['slot_machines'][:50]}),
+    ('customer.create', 'POST', '/api/customers/create/', {'quantity': 10}),
+]
+
+
+def populate(halls, tables, days, fills):
+    """Fill the database and return the ids the endpoint paths refer to."""
+    from chip import catalog as chip_catalog
+    from chip.models import ChipModel
+    from customer.models import Customer
+    from django_rest import game_days
+    from game_table.models import CloseFloot, GameDayLive, Hall, OpenFlotLine, Plaque, Table, TableResult
+    from slot_machine.models import DailyAmount, GameDay, HallDailySummary, SlotMachine, natural_sort_key
+    from slot_machine.models import Hall as SlotHall
+    from transactions.models import FillCredit
+
+    chips = ChipModel.objects.bulk_create([ChipModel(denomination=value) for value in DENOMINATIONS])
+    chip_catalog.invalidate()
+    open_total = sum(float(denomination) * quantity for denomination, quantity in OPEN_FLOT.items())
+
+    table_rows = []
+    for hall_index in range(halls):
+        hall = Hall.objects.create(name=f'Hall {hall_index}')
+        table_rows += Table.objects.bulk_create([
+            Table(name=f'H{hall_index} T{index}', hall=hall, open_flot=OPEN_FLOT, open_flot_total=open_total)
+            for index in range(tables)
+        ])
+    chip_ids = {str(chip.denomination).removesuffix('.0'): chip.id for chip in chips}
+    OpenFlotLine.objects.bulk_create([
+        OpenFlotLine(table=table, chip_id=chip_ids[denomination], quantity=quantity)
+        for table in table_rows for denomination, quantity in OPEN_FLOT.items()
+    ], batch_size=500)
+
+    first_day = date(2024, 1, 1)
+    live_days = GameDayLive.objects.bulk_create(
+        [GameDayLive(date=first_day + timedelta(days=offset)) for offset in range(days)])
+    for offset, game_day in enumerate(live_days):
+        current = offset == days - 1
+        amounts = [(-1) ** index * 25 * (index % 3 + 1) for index in range(fills)]
+        total_fill = sum(amount for amount in amounts if amount < 0)
+        total_credit = sum(amount for amount in amounts if amount > 0)
+        close_flot = {**OPEN_FLOT, '5': 40 + offset % 7}
+        close_part = (offset % 7) * 5
+        CloseFloot.objects.bulk_create([
+            CloseFloot(table=table, game_day=game_day, status=current, close_flot=OPEN_FLOT if current else close_flot,
+                       open_flot=OPEN_FLOT, open_flot_total=open_total,
+                       close_flot_total=open_total + (0 if current else close_part),
+                       total_fill=total_fill, total_credit=total_credit,
+                       result=total_fill + total_credit + (0 if current else close_part))
+            for table in table_rows
+        ], batch_size=500)
+        Plaque.objects.bulk_create([Plaque(table=table, game_day=game_day, status=current) for table in table_rows],
+                                   batch_size=500)
+        TableResult.objects.bulk_create([
+            TableResult(table=table, game_day=game_day,
+                        result=total_fill + total_credit + (0 if current else close_part))
+            for table in table_rows
+        ], batch_size=500)
+        FillCredit.objects.bulk_create([
+            FillCredit(table=table, game_day=game_day, fill_credit=amount)
+            for table in table_rows for amount in amounts
+        ], batch_size=500)
+    live_day = live_days[-1]
+
+    # One table of the current day closed, for the close-update endpoint
+    closed_floot = CloseFloot.objects.get(table=table_rows[-1], game_day=live_day)
+    CloseFloot.objects.filter(pk=closed_floot.pk).update(status=False)
+
+    slot_halls = SlotHall.objects.bulk_create([SlotHall(name=f'Slot hall {index}') for index in range(halls)])
+    slot_machines = SlotMachine.objects.bulk_create([
+        SlotMachine(name=f'{index}', sort_key=natural_sort_key(f'{index}'), brand=f'Brand {index % 5}',
+                    hall=slot_halls[index % halls])
+        for index in range(halls * tables)
+    ], batch_size=500)
+    slot_days = GameDay.objects.bulk_create([GameDay(date=first_day + timedelta(days=offset)) for offset in range(days)])
+    DailyAmount.objects.bulk_create([
+        DailyAmount(slot_machine=slot_machine, game_day=game_day, amount=(slot_machine.id * offset) % 500)
+        for offset, game_day in enumerate(slot_days) for slot_machine in slot_machines
+    ], batch_size=500)
+    HallDailySummary.objects.rebuild()
+
+    Customer.objects.bulk_create([Customer() for _ in range(100 * halls)])
+    game_days.invalidate()
+
+    return {
+        'table': table_rows[0].id,
+        'tables': [table.id for table in table_rows],
+        'close_floot': CloseFloot.objects.filter(game_day=live_day).values_list('id', flat=True).first(),
+        'closed_floot': closed_floot.id,
+        'plaque': Plaque.objects.filter(game_day=live_day).values_list('id', flat=True).first(),
+        'fill_credit': FillCredit.objects.values_list('id', flat=True).first(),
+        'live_game_day': live_day.id,
+        'chip': chips[0].id,
+        'slot_machine': slot_machines[0].id,
+        'slot_machines': [slot_machine.id for slot_machine in slot_machines],
+        'slot_game_day': slot_days[-1].id,
+        'daily_amount': DailyAmount.objects.values_list('id', flat=True).first(),
+        'start_date': str(first_day),
+        'end_date': str(slot_days[-1].date),
+    }
+
+
+def _format(value, ids):
+    if isinstance(value, str):
+        formatted = value.format(**ids)
+        return int(formatted) if formatted.isdigit() and value != formatted else formatted
+    if isinstance(value, dict):
+        return {key: _format(item, ids) for key, item in value.items()}
+    return value
+
+
+def measure(client, method, path, data, ids, requests):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    path = path.format(**ids)
+    latencies, queries, sizes, statuses = [], [], [], set()
+    # The first request warms the per-process caches (current game day, chip catalog)
+    for iteration in range(requests + 1):
+        payload = data(ids, iteration) if callable(data) else _format(data, ids)
+        if method == 'GET':
+            send = lambda: client.get(path, payload)  # noqa: E731
+        else:
+            send = lambda: getattr(client, method.lower())(path, payload, content_type='application/json')  # noqa: E731
+
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = send()
+            body = b''.join(response.streaming_content) if response.streaming else response.content
+            elapsed = (time.perf_counter() - started) * 1000
+        if iteration:
+            latencies.append(elapsed)
+            queries.append(len(captured))
+            sizes.append(len(body))
+            statuses.add(response.status_code)
+
+    return {
+        'method': method,
+        'path': path,
+        'status': sorted(statuses),
+        'queries': max(queries),
+        'response_bytes': max(sizes),
+        **summarize(latencies),
+    }
+
+
+def run(scales, requests, cached):
+    from django.test import Client, override_settings
+
+    caches = None if cached else {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}
+    report = {
+        'python': platform.python_version(),
+        'requests': requests,
+        'cached': cached,
+        'scales': {},
+    }
+
+    for scale in scales:
+        rows = SCALES[scale]
+        with benchmark_database() as connection, override_settings(**({'CACHES': caches} if caches else {})):
+            report['database'] = connection.vendor
+            ids = populate(**rows)
+            client = Client()
+            report['scales'][scale] = {
+                'rows': {**rows, 'slot_machines': rows['halls'] * rows['tables']},
+                'endpoints': {
+                    name: measure(client, method, path, data, ids, requests)
+                    for name, method, path, data in READS + WRITES
+                },
+            }
+
+    return report
+
+
+def compare(report, previous, tolerance):
+    """Endpoints that got worse since ``previous``: more queries, or p95 beyond ``tolerance``."""
+    regressions = []
+    for scale, results in report['scales'].items():
+        before_endpoints = previous.get('scales', {}).get(scale, {}).get('endpoints', {})
+        for name, after in results['endpoints'].items():
+            before = before_endpoints.get(name)
+            if before is None:
+                continue
+            if after['queries'] > before['queries']:
+                regressions.append({'scale': scale, 'endpoint': name, 'metric': 'queries',
+                                    'before': before['queries'], 'after': after['queries']})
+            if after['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+                regressions.append({'scale': scale, 'endpoint': name, 'metric': 'p95_ms',
+                                    'before': before['p95_ms'], 'after': after['p95_ms']})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scale', action='append', dest='scales', choices=sorted(SCALES),
+                        help="Data scale to measure. May be repeated; defaults to small and medium.")
+    parser.add_argument('--requests', type=int, default=20, help="Timed requests per endpoint.")
+    parser.add_argument('--cached', action='store_true', help="Keep the response cache enabled.")
+    parser.add_argument('--output', help="Write the report to this file instead of stdout.")
+    parser.add_argument('--compare', help="Previous report to compare against; exits 1 on a regression.")
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help="Allowed relative p95 growth before it counts as a regression.")
+    options = parser.parse_args()
+
+    setup_django()
+    report = run(options.scales or ['small', 'medium'], options.requests, options.cached)
+
+    regressions = None
+    if options.compare:
+        with open(options.compare) as previous:
+            regressions = report['regressions'] = compare(report, json.load(previous), options.tolerance)
+
+    output = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, 'w') as file:
+            file.write(output + '\n')
+    else:
+        print(output)
+
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
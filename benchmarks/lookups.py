@@ -0,0 +1,107 @@
+"""
+Lookup latency for the hot (table, game day) queries at a year's worth of rows.
+
+    python -m benchmarks.lookups --days 365 --tables 60 --fills 8
+"""
+import argparse
+import json
+import random
+from datetime import date, timedelta
+
+from benchmarks import benchmark_database, setup_django, summarize, timed
+
+
+def populate(days, tables, fills):
+    from game_table.models import Table, CloseFloot, Hall, GameDayLive, Plaque, TableResult
+    from slot_machine.models import GameDay
+    from transactions.models import FillCredit
+
+    hall = Hall.objects.create(name='Benchmark')
+    table_rows = Table.objects.bulk_create(
+        [Table(name=f'T{index}', hall=hall) for index in range(tables)], batch_size=500)
+
+    first_day = date(2024, 1, 1)
+    game_days = GameDayLive.objects.bulk_create(
+        [GameDayLive(date=first_day + timedelta(days=offset)) for offset in range(days)], batch_size=500)
+    GameDay.objects.bulk_create(
+        [GameDay(date=first_day + timedelta(days=offset)) for offset in range(days)], batch_size=500)
+
+    for game_day in game_days:
+        CloseFloot.objects.bulk_create(
+            [CloseFloot(table=table, game_day=game_day) for table in table_rows], batch_size=500)
+        Plaque.objects.bulk_create(
+            [Plaque(table=table, game_day=game_day) for table in table_rows], batch_size=500)
+        TableResult.objects.bulk_create(
+            [TableResult(table=table, game_day=game_day) for table in table_rows], batch_size=500)
+        FillCredit.objects.bulk_create(
+            [FillCredit(table=table, game_day=game_day, fill_credit=(-1) ** index * 100)
+             for table in table_rows for index in range(fills)], batch_size=500)
+
+    return table_rows, game_days
+
+
+def run(days, tables, fills, repeat):
+    from game_table.models import CloseFloot, GameDayLive, TableResult
+    from slot_machine.models import GameDay
+    from transactions.models import FillCredit
+
+    with benchmark_database() as connection:
+        table_rows, game_days = populate(days, tables, fills)
+        pick = random.Random(0)
+
+        def random_pair():
+            return pick.choice(table_rows).id, pick.choice(game_days).id
+
+        def fill_credit_range():
+            table_id, game_day_id = random_pair()
+            start = pick.choice(game_days).date
+            return list(FillCredit.objects.filter(
+                table_id=table_id, game_day__date__range=[start, start + timedelta(days=7)]))
+
+        lookups = {
+            'closefloot_by_table_day': lambda: CloseFloot.objects.get(
+                **dict(zip(('table_id', 'game_day_id'), random_pair()))),
+            'tableresult_by_table_day': lambda: TableResult.objects.get(
+                **dict(zip(('table_id', 'game_day_id'), random_pair()))),
+            'fillcredit_by_table_day': lambda: list(FillCredit.objects.filter(
+                **dict(zip(('table_id', 'game_day_id'), random_pair())))),
+            'fillcredit_by_table_week': fill_credit_range,
+            'gamedaylive_latest': lambda: GameDayLive.objects.latest('date'),
+            'slot_gameday_latest': lambda: GameDay.objects.latest('date'),
+        }
+
+        report = {
+            'rows': {
+                'game_days': days,
+                'tables': tables,
+                'closefloot': CloseFloot.objects.count(),
+                'fillcredit': FillCredit.objects.count(),
+            },
+            'lookups': {name: summarize(timed(lookup, repeat)) for name, lookup in lookups.items()},
+        }
+
+        if connection.vendor == 'sqlite':
+            table_id, game_day_id = random_pair()
+            query = CloseFloot.objects.filter(table_id=table_id, game_day_id=game_day_id).query
+            sql, params = query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                report['closefloot_plan'] = [row[-1] for row in cursor.fetchall()]
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--tables', type=int, default=60)
+    parser.add_argument('--fills', type=int, default=8, help="Fill/credit rows per table per day.")
+    parser.add_argument('--repeat', type=int, default=2000, help="Timed calls per lookup.")
+    options = parser.parse_args()
+
+    setup_django()
+    print(json.dumps(run(options.days, options.tables, options.fills, options.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Process-wide cache of the chip catalog (the ``ChipModel`` rows).
+
+Denominations change perhaps once a year, but every flot and plaque write
+validates against them. The catalog is loaded on first use and kept until a
+``ChipModel`` is written in this process (see ``chip.signals``);
+``CHIP_CATALOG_CACHE_TIMEOUT`` bounds how long other worker processes keep
+serving the previous catalog.
+
+Each invalidation moves ``version`` forward. A load that raced with an
+invalidation is returned to its caller but not kept, so a catalog read
+before a write can never outlive it.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+
+from django_rest import money
+from .counts import Denominations
+from .models import ChipModel
+
+_lock = threading.Lock()
+_version = 0
+_cached = None  # (Catalog, expires at)
+
+
+class Catalog:
+    def __init__(self, chips, version):
+        self.chips = tuple(chips)
+        self.version = version
+        self.denominations = Denominations(chip.denomination for chip in self.chips)
+        # ChipModel id of each position of a Denominations vector
+        ids = {money.to_minor_units(chip.denomination): chip.id for chip in self.chips}
+        self.chip_ids = tuple(ids[minor_units] for minor_units in self.denominations.minor_units)
+
+
+def get():
+    """The current ``Catalog``: the chips ordered by denomination, and their ``Denominations``."""
+    global _cached
+    now = time.monotonic()
+    entry = _cached
+    if entry is not None and entry[1] > now:
+        return entry[0]
+
+    version = _version
+    catalog = Catalog(ChipModel.objects.order_by('denomination'), version)
+
+    with _lock:
+        if _version == version:
+            _cached = (catalog, now + getattr(settings, 'CHIP_CATALOG_CACHE_TIMEOUT', 300))
+    return catalog
+
+
+def chips():
+    return get().chips
+
+
+def denominations():
+    return get().denominations
+
+
+def invalidate():
+    global _cached, _version
+    with _lock:
+        _version += 1
+        _cached = None
+
+
+def invalidate_on_write():
+    """Drop the catalog now and again once the surrounding transaction commits."""
+    invalidate()
+    transaction.on_commit(invalidate)
@@ -0,0 +1,122 @@
+"""
+Chip counts: the ``{denomination: quantity}`` maps of the open flot, close
+flot and plaques, as fixed-order integer vectors over the ``ChipModel``
+denominations.
+
+A ``Denominations`` catalog holds the denominations in ascending order, in
+minor units, so validating a map is one dict lookup per key, and totalling or
+diffing counts is integer arithmetic over two tuples::
+
+    catalog = denominations()
+    vector = catalog.vector({'5': 12, '25': 4})     # (0, 12, 4, 0, ...)
+    catalog.total(vector)                           # Decimal('160.00')
+"""
+from functools import lru_cache
+from operator import mul, sub
+
+from django_rest import money
+
+
+# Distinct map keys ('5', '5.0', '5.00'...) remembered per catalog
+MAX_CACHED_KEYS = 256
+
+
+class ChipCountError(ValueError):
+    """A chip count map that does not match the catalog."""
+
+
+def _label(minor_units):
+    # 500 -> '5', 250 -> '2.5', 10 -> '0.1': the keys the clients send
+    return format(money.from_minor_units(minor_units).normalize(), 'f')
+
+
+def label(key):
+    """Canonical spelling of a denomination key ('5.0' -> '5'); raises ChipCountError."""
+    try:
+        return _label(money.to_minor_units(key))
+    except (ArithmeticError, ValueError):
+        raise ChipCountError(f"Invalid chip denomination: {key}.") from None
+
+
+def _quantity(key, quantity):
+    if quantity is None:
+        return 0
+    if isinstance(quantity, float) and quantity.is_integer():
+        quantity = int(quantity)
+    if not isinstance(quantity, int) or isinstance(quantity, bool):
+        raise ChipCountError(f"Chip quantity for {key} must be a whole number.")
+    if quantity < 0:
+        raise ChipCountError(f"Chip quantity for {key} cannot be negative.")
+    return quantity
+
+
+class Denominations:
+    def __init__(self, denominations):
+        self.minor_units = tuple(sorted({money.to_minor_units(denomination) for denomination in denominations}))
+        self.labels = tuple(_label(minor_units) for minor_units in self.minor_units)
+        self._positions = {minor_units: position for position, minor_units in enumerate(self.minor_units)}
+        # Map key -> position; bounded, as the keys come from client input
+        self.position = lru_cache(maxsize=MAX_CACHED_KEYS)(self._position)
+
+    def __len__(self):
+        return len(self.minor_units)
+
+    def _position(self, key):
+        try:
+            position = self._positions.get(money.to_minor_units(key))
+        except (ArithmeticError, ValueError):
+            raise ChipCountError(f"Invalid chip denomination: {key}.") from None
+        if position is None:
+            raise ChipCountError(f"Unknown chip denomination: {key}.")
+        return position
+
+    def vector(self, counts):
+        """Validate a count map and return its quantities in catalog order."""
+        if not isinstance(counts, dict):
+            raise ChipCountError("Chip counts must be an object of denomination: quantity.")
+        vector = [0] * len(self.minor_units)
+        for key, quantity in counts.items():
+            vector[self.position(key)] += _quantity(key, quantity)
+        return tuple(vector)
+
+    def counts(self, vector):
+        """The non-zero quantities of a vector as a count map."""
+        return {label: quantity for label, quantity in zip(self.labels, vector) if quantity}
+
+    def total_minor_units(self, vector):
+        return sum(map(mul, vector, self.minor_units))
+
+    def total(self, vector):
+        return money.from_minor_units(self.total_minor_units(vector))
+
+    def diff(self, vector, other):
+        """Per-denomination change from ``other`` to ``vector``."""
+        return tuple(map(sub, vector, other))
+
+    def totals(self, count_maps):
+        """Totals of many count maps, e.g. every table of a report, in one pass."""
+        units = self.minor_units
+        vector = self.vector
+        return [money.from_minor_units(sum(map(mul, vector(counts), units))) for counts in count_maps]
+
+
+def denominations():
+    """``Denominations`` of the cached chip catalog (``chip.catalog``)."""
+    from . import catalog  # Imports this module
+    return catalog.denominations()
+
+
+def total(counts):
+    """Validated value of a count map."""
+    catalog = denominations()
+    return catalog.total(catalog.vector(counts))
+
+
+def totals(count_maps):
+    return denominations().totals(count_maps)
+
+
+def diff(counts, other):
+    """Per-denomination change from ``other`` to ``counts``, as a count map."""
+    catalog = denominations()
+    return catalog.counts(catalog.diff(catalog.vector(counts), catalog.vector(other)))
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import catalog
+from .models import ChipModel
+
+
+@receiver(post_save, sender=ChipModel)
+@receiver(post_delete, sender=ChipModel)
+def forget_chip_catalog(sender, **kwargs):
+    catalog.invalidate_on_write()
@@ -1,3 +1,92 @@
+from decimal import Decimal
+from unittest import mock
+
 from django.test import TestCase
 
-# Create your tests here.
+from . import catalog, counts
+from .models import ChipModel
+
+
+class ChipCountTests(TestCase):
+    def setUp(self):
+        ChipModel.objects.bulk_create([ChipModel(denomination=value) for value in (25, 0.5, 5, 100)])
+        catalog.invalidate()  # bulk_create sends no signals
+        self.catalog = counts.denominations()
+
+    def test_vector_is_in_denomination_order(self):
+        self.assertEqual(self.catalog.labels, ('0.5', '5', '25', '100'))
+        self.assertEqual(self.catalog.vector({'5.0': 12, '25': 4, '0.50': 3.0}), (3, 12, 4, 0))
+
+    def test_total_and_diff(self):
+        vector = self.catalog.vector({'0.5': 3, '100': 1})
+
+        self.assertEqual(self.catalog.total(vector), Decimal('101.50'))
+        self.assertEqual(counts.diff({'5': 10, '25': 2}, {'5': 12, '100': 1}), {'5': -2, '25': 2, '100': -1})
+
+    def test_invalid_counts_are_rejected(self):
+        for bad_counts, message in (
+            ({'7': 1}, "Unknown chip denomination: 7."),
+            ({'five': 1}, "Invalid chip denomination: five."),
+            ({'5': -1}, "Chip quantity for 5 cannot be negative."),
+            ({'5': 1.5}, "Chip quantity for 5 must be a whole number."),
+            ({'5': '2'}, "Chip quantity for 5 must be a whole number."),
+        ):
+            with self.assertRaisesMessage(counts.ChipCountError, message):
+                counts.total(bad_counts)
+
+    def test_remembered_keys_are_bounded(self):
+        for zeros in range(counts.MAX_CACHED_KEYS * 2):
+            self.catalog.vector({'5.' + '0' * zeros: 1})
+
+        self.assertEqual(self.catalog.position.cache_info().currsize, counts.MAX_CACHED_KEYS)
+        self.assertEqual(self.catalog.vector({'5.00': 2}), (0, 2, 0, 0))
+
+    def test_batch_totals(self):
+        tables = [{'5': index, '100': 1} for index in range(2000)]
+
+        totals = self.catalog.totals(tables)
+
+        self.assertEqual(len(totals), 2000)
+        self.assertEqual(totals[10], Decimal('150.00'))
+        self.assertEqual(sum(totals), sum(Decimal(5 * index + 100) for index in range(2000)))
+
+
+class ChipCatalogTests(TestCase):
+    url = '/api/chip/'
+
+    def setUp(self):
+        catalog.invalidate()
+        self.chip = ChipModel.objects.create(denomination=5)
+
+    def test_steady_state_costs_no_queries(self):
+        catalog.get()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(counts.total({'5': 3}), Decimal('15.00'))
+            response = self.client.get(self.url)
+
+        self.assertEqual([chip['denomination'] for chip in response.json()], [5.0])
+
+    def test_chip_writes_invalidate_the_catalog(self):
+        version = catalog.get().version
+
+        self.client.post(self.url, {'denomination': 25}, content_type='application/json')
+        self.assertEqual(catalog.denominations().labels, ('5', '25'))
+        self.assertGreater(catalog.get().version, version)
+
+        self.client.delete(f'{self.url}{self.chip.id}/')
+        self.assertEqual([chip['denomination'] for chip in self.client.get(self.url).json()], [25.0])
+
+    def test_load_racing_with_a_write_is_not_kept(self):
+        real_catalog = catalog.Catalog
+
+        def invalidate_while_loading(chips, version):
+            loaded = real_catalog(chips, version)
+            catalog.invalidate()
+            return loaded
+
+        with mock.patch.object(catalog, 'Catalog', invalidate_while_loading):
+            catalog.get()
+
+        with self.assertNumQueries(1):
+            catalog.get()
@@ -1,6 +1,8 @@
+from django.db.models import ProtectedError
 from rest_framework import generics
 from rest_framework import status
 from rest_framework.response import Response
+from . import catalog
 from .models import ChipModel
 from .serializers import ChipModelSerializer
 
@@ -9,6 +11,11 @@ class ChipListCreate(generics.ListCreateAPIView):
     queryset = ChipModel.objects.all().order_by('denomination')
     serializer_class = ChipModelSerializer
 
+    def list(self, request, *args, **kwargs):
+        # Served from the in-memory catalog; filters do not apply to the chip list
+        serializer = self.get_serializer(catalog.chips(), many=True)
+        return Response(serializer.data)
+
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
@@ -23,7 +30,11 @@ class ChipDetailUpdateDelete(generics.RetrieveUpdateDestroyAPIView):
 
     def delete(self, request, *args, **kwargs):
         instance = self.get_object()
-        self.perform_destroy(instance)
+        try:
+            self.perform_destroy(instance)
+        except ProtectedError:
+            return Response({"message": "Chip is used by a flot or plaque and cannot be deleted."},
+                            status=status.HTTP_400_BAD_REQUEST)
         return Response({"message": "Chip deleted successfully"}, status=status.HTTP_200_OK)
 
 
@@ -1,3 +1,17 @@
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Customer
+
+
+class CustomerListCreateViewTests(TestCase):
+    url = '/api/customers/create/'
+
+    def test_lists_customers_in_pages(self):
+        Customer.objects.bulk_create([Customer() for _ in range(5)])
+
+        first = self.client.get(self.url, {'page_size': 3}).json()
+        second = self.client.get(first['next']).json()
+
+        self.assertEqual(len(first['results']), 3)
+        self.assertEqual(len(second['results']), 2)
+        self.assertLess(first['results'][-1]['id'], second['results'][0]['id'])
@@ -5,14 +5,15 @@ from .models import Customer
 from rest_framework.views import APIView
 from .serializers import CustomerSerializer
 from rest_framework import generics
+from django_rest.pagination import KeysetPagination
 
 
 # Create your views here.
 
 class CustomerListCreateView(APIView):
+    pagination_class = KeysetPagination
 
     def post(self, request, *args, **kwargs):
-        print(request.data)
         try:
             customer_quantity = int(request.data.get('quantity', 0))
             if customer_quantity <= 0:
@@ -29,8 +30,9 @@ class CustomerListCreateView(APIView):
 
     def get(self, request, *args, **kwargs):
         try:
-            customers = Customer.objects.all().order_by('id')
+            paginator = self.pagination_class()
+            customers = paginator.paginate_queryset(Customer.objects.all(), request, view=self)
             serializer = CustomerSerializer(customers, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return paginator.get_paginated_response(serializer.data)
         except Exception:
             return Response({"message": "Error fetching customers."}, status=status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,152 @@
+"""
+Push feed of table and slot changes.
+
+Writers publish small delta events on a per-game-day channel once their
+transaction commits (``publish_on_commit``); the server-sent-events views in
+``game_table.views`` and ``slot_machine.views`` subscribe to a channel and
+stream whatever arrives, so floor clients subscribe once per game day instead
+of polling.
+
+The default ``InProcessBroker`` keeps one bounded asyncio queue per connection
+in this process, so an idle connection costs a coroutine and a queue, and an
+event only reaches clients connected to the same worker. Point
+``EVENT_BROKER`` at a class with the same ``publish``/``subscribe`` interface
+(e.g. one backed by Redis pub/sub) to fan out across workers.
+"""
+import asyncio
+import json
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils.module_loading import import_string
+from rest_framework.utils.encoders import JSONEncoder
+
+# Events a slow client may fall behind by before its backlog is replaced by
+# a single ``resync`` event telling it to reload the snapshot.
+SUBSCRIBER_QUEUE_SIZE = 256
+
+RESYNC = {'type': 'resync'}
+
+
+def live_channel(game_day_id):
+    return f'live:{game_day_id}'
+
+
+def slot_channel(game_day_id):
+    return f'slot:{game_day_id}'
+
+
+def _offer(queue, event):
+    if queue.full():
+        while not queue.empty():
+            queue.get_nowait()
+        event = RESYNC
+    queue.put_nowait(event)
+
+
+class Subscription:
+    def __init__(self, broker, channel):
+        self.broker = broker
+        self.channel = channel
+        self.loop = None
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.broker._add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.broker._remove(self)
+
+    async def get(self, timeout=None):
+        """Next event, or None when nothing arrived within ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBroker:
+    """Fan events out to the subscribers connected to this process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = defaultdict(set)
+
+    def subscribe(self, channel):
+        return Subscription(self, channel)
+
+    def publish(self, channel, event):
+        # Called from the sync request threads; hand the event to each
+        # subscriber's event loop.
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(_offer, subscription.queue, event)
+            except RuntimeError:  # The loop is closed, the connection is going away
+                self._remove(subscription)
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscriptions.get(channel, ()))
+
+    def _add(self, subscription):
+        with self._lock:
+            self._subscriptions[subscription.channel].add(subscription)
+
+    def _remove(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(getattr(settings, 'EVENT_BROKER', 'django_rest.events.InProcessBroker'))()
+    return _broker
+
+
+def publish_on_commit(channel, event):
+    """Publish ``event`` once the surrounding transaction commits."""
+    transaction.on_commit(lambda: get_broker().publish(channel, event))
+
+
+def format_event(event, name=None):
+    data = json.dumps(event, cls=JSONEncoder)
+    return f'event: {name or event["type"]}\ndata: {data}\n\n'
+
+
+async def _stream(channel, ready):
+    keepalive = getattr(settings, 'EVENT_KEEPALIVE_SECONDS', 15)
+    async with get_broker().subscribe(channel) as subscription:
+        yield 'retry: 3000\n' + format_event(ready, name='ready')
+        while True:
+            event = await subscription.get(timeout=keepalive)
+            # Comment lines keep proxies from closing an idle connection
+            yield ': keepalive\n\n' if event is None else format_event(event)
+
+
+def stream_response(channel, ready):
+    """
+    ``text/event-stream`` response for ``channel``. ``ready`` is sent first;
+    clients should reload their snapshot on ``ready`` and ``resync``.
+    """
+    response = StreamingHttpResponse(_stream(channel, ready), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,113 @@
+"""
+Process-wide cache of the current (latest) game day for the live tables
+(``game_table.GameDayLive``) and the slot floor (``slot_machine.GameDay``).
+
+Almost every request needs the current day, and it only changes when a new
+day is opened. The signal receivers in ``game_table.signals`` and
+``slot_machine.signals`` drop the cached day whenever a day is written in this
+process. ``GAME_DAY_CACHE_TIMEOUT`` bounds how long other worker processes can
+keep serving the previous day.
+
+Each day also carries a ``version`` counter in the database, bumped by
+``bump_version()`` on every write to the day's rows. Because the counter lives
+in the day row, every worker sees a write as soon as it commits, and the
+polled endpoints can compare versions without reading the row tables.
+"""
+import threading
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+LIVE = 'game_table.GameDayLive'
+SLOT = 'slot_machine.GameDay'
+
+_lock = threading.Lock()
+_cached = {}
+
+
+def _current(model_label):
+    now = time.monotonic()
+    entry = _cached.get(model_label)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+
+    model = apps.get_model(model_label)
+    game_day = model.objects.latest('date')  # Raises DoesNotExist, which is not cached
+
+    with _lock:
+        _cached[model_label] = (game_day, now + getattr(settings, 'GAME_DAY_CACHE_TIMEOUT', 30))
+    return game_day
+
+
+async def _acurrent(model_label):
+    now = time.monotonic()
+    entry = _cached.get(model_label)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+
+    model = apps.get_model(model_label)
+    game_day = await model.objects.alatest('date')
+
+    with _lock:
+        _cached[model_label] = (game_day, now + getattr(settings, 'GAME_DAY_CACHE_TIMEOUT', 30))
+    return game_day
+
+
+def current_live_game_day():
+    """Latest GameDayLive; raises GameDayLive.DoesNotExist when there is none."""
+    return _current(LIVE)
+
+
+def current_slot_game_day():
+    """Latest slot GameDay; raises GameDay.DoesNotExist when there is none."""
+    return _current(SLOT)
+
+
+async def acurrent_live_game_day():
+    return await _acurrent(LIVE)
+
+
+async def acurrent_slot_game_day():
+    return await _acurrent(SLOT)
+
+
+def invalidate(model_label=None):
+    """Forget the cached day for one model, or for both."""
+    with _lock:
+        if model_label is None:
+            _cached.clear()
+        else:
+            _cached.pop(model_label, None)
+
+
+def invalidate_on_write(model_label):
+    """
+    Drop the cached day now and again once the surrounding transaction
+    commits, so no request can re-cache the old day in between.
+    """
+    invalidate(model_label)
+    transaction.on_commit(lambda: invalidate(model_label))
+
+
+def bump_version(model_label, *game_day_ids):
+    """
+    Move the version of the given days forward. Call it inside the writer's
+    transaction, so the new version becomes visible together with the rows.
+    """
+    ids = {game_day_id for game_day_id in game_day_ids if game_day_id is not None}
+    if ids:
+        apps.get_model(model_label).objects.filter(pk__in=ids).update(version=F('version') + 1)
+
+
+def versions(model_label, **filters):
+    """``[(id, version), ...]`` of the days matching ``filters``, in id order."""
+    model = apps.get_model(model_label)
+    return list(model.objects.filter(**filters).order_by('id').values_list('id', 'version'))
+
+
+async def aversions(model_label, **filters):
+    model = apps.get_model(model_label)
+    return [row async for row in model.objects.filter(**filters).order_by('id').values_list('id', 'version')]
@@ -0,0 +1,87 @@
+"""
+Exact money amounts.
+
+Amounts are stored as integer minor units (cents) in ``MoneyField`` columns
+and surface in Python as ``Decimal`` with two places, so sums in the database
+are integer sums and nothing needs correcting afterwards. Expressions that mix
+a column with a Python amount must wrap the amount in ``value()``; a bare
+number would be added to the column as if it already were in cents.
+
+The API keeps rendering amounts as JSON numbers, as it did with the float
+columns.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from functools import cached_property
+
+from django.core import exceptions, validators
+from django.db import connection, models
+from rest_framework import serializers
+
+MINOR_UNITS = 100
+
+
+def to_minor_units(amount):
+    """``Decimal('12.50')``, ``12.5`` or ``'12.5'`` -> ``1250``, rounding half up."""
+    if isinstance(amount, int):
+        return amount * MINOR_UNITS
+    if not isinstance(amount, Decimal):
+        amount = Decimal(str(amount))
+    return int((amount * MINOR_UNITS).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_minor_units(minor_units):
+    return Decimal(int(minor_units)).scaleb(-2)
+
+
+def to_amount(value):
+    """Any accepted amount as a two-place ``Decimal``."""
+    return from_minor_units(to_minor_units(value))
+
+
+def value(amount):
+    """A Python amount usable in expressions over ``MoneyField`` columns."""
+    return models.Value(to_amount(amount), output_field=MoneyField())
+
+
+class MoneyField(models.BigIntegerField):
+    description = "Amount of money stored as integer minor units"
+
+    @cached_property
+    def validators(self):
+        # The column range, in amounts rather than minor units
+        min_value, max_value = connection.ops.integer_field_range(self.get_internal_type())
+        return [
+            validators.MinValueValidator(from_minor_units(min_value)),
+            validators.MaxValueValidator(from_minor_units(max_value)),
+            *self._validators,
+        ]
+
+    def from_db_value(self, value, expression, connection):
+        return None if value is None else from_minor_units(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, Decimal) and value.as_tuple().exponent == -2:
+            return value
+        try:
+            return to_amount(value)
+        except (ArithmeticError, ValueError):
+            raise exceptions.ValidationError(f"'{value}' is not a valid amount.", code='invalid') from None
+
+    def get_prep_value(self, value):
+        if value is None or hasattr(value, 'resolve_expression'):
+            return value
+        return to_minor_units(value)
+
+
+class MoneySerializerField(serializers.DecimalField):
+    """Amount in major units, rendered as a JSON number."""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('max_digits', None)
+        kwargs.setdefault('decimal_places', 2)
+        kwargs.setdefault('coerce_to_string', False)
+        super().__init__(**kwargs)
+
+
+# Let every ModelSerializer render MoneyField columns as amounts, not cents
+serializers.ModelSerializer.serializer_field_mapping[MoneyField] = MoneySerializerField
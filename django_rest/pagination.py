@@ -0,0 +1,21 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination for the large list endpoints. Pages are fetched with a
+    keyset condition on ``ordering`` rather than an OFFSET, so deep pages cost
+    the same as the first one and rows inserted meanwhile do not shift pages.
+    Clients pick the page size with ``?page_size=`` up to ``max_page_size``.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    ordering = 'id'
+
+
+def query_flag(request, name, default):
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    return value.lower() not in ('0', 'false', 'no', 'off')
@@ -0,0 +1,139 @@
+"""
+Response cache for the polled dashboard endpoints.
+
+A cached payload depends on two kinds of versions:
+
+* the ``version`` counters of the game days it covers (see
+  ``django_rest.game_days.bump_version``), read from the day rows on every
+  poll, so a write in any worker is seen as soon as it commits;
+* *tags* for data that is not per day (``live-floor``, ``slot-floor``...).
+  Each tag has a random version token in the cache, bumped by the signal
+  receivers of each app, which makes every dependent key unreachable at once
+  without having to know which keys exist.
+
+The cache key and ETag of a response are derived from the endpoint, its
+parameters and both kinds of versions. A poll therefore costs one small query
+on the game day table and one ``get_many`` for the tags, plus either a 304
+(when ``If-None-Match`` matches) or one ``get`` for the payload. The row tables
+are only read when the payload has to be rebuilt.
+"""
+import hashlib
+import json
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponseNotModified, JsonResponse
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+TAG_PREFIX = 'response-cache:tag:'
+BODY_PREFIX = 'response-cache:body:'
+
+LIVE_FLOOR = 'live-floor'
+SLOT_FLOOR = 'slot-floor'
+SLOT_AMOUNTS = 'slot-amounts'
+
+
+def tag_versions(tags):
+    """Current version token of each tag, creating tokens for new tags."""
+    keys = {TAG_PREFIX + tag: tag for tag in tags}
+    found = cache.get_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+async def atag_versions(tags):
+    keys = {TAG_PREFIX + tag: tag for tag in tags}
+    found = await cache.aget_many(keys)
+    missing = {key: uuid.uuid4().hex for key in keys if key not in found}
+    if missing:
+        await cache.aset_many(missing, timeout=None)
+        found.update(missing)
+    return {keys[key]: version for key, version in found.items()}
+
+
+def bump(*tags):
+    """Invalidate every cached response that depends on any of ``tags``."""
+    cache.set_many({TAG_PREFIX + tag: uuid.uuid4().hex for tag in tags}, timeout=None)
+
+
+def bump_on_write(*tags):
+    """
+    Bump now and again once the surrounding transaction commits, so a poll
+    that reads the old rows in between cannot stay cached.
+    """
+    bump(*tags)
+    transaction.on_commit(lambda: bump(*tags))
+
+
+def make_etag(endpoint, params, versions, day_versions=None):
+    payload = json.dumps([endpoint, params, sorted(versions.items()), day_versions], default=str)
+    return '"%s"' % hashlib.sha1(payload.encode()).hexdigest()
+
+
+def etag_matches(request, etag):
+    header = request.headers.get('If-None-Match')
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix('W/') for candidate in header.split(',')}
+    return etag in candidates or '*' in candidates
+
+
+def cached_response(request, endpoint, params, tags, build, day_versions=None):
+    """
+    Answer ``request`` from the cache: a 304 when the client already holds the
+    current version, the cached payload when there is one, otherwise the
+    payload returned by ``build()``, which is stored for the next poll.
+
+    ``day_versions`` is a callable returning the versions of the game days the
+    payload covers. It is called again after a rebuild: when a write committed
+    in between, the payload is returned without being cached or tagged, since
+    it may not match either version.
+    """
+    current_days = day_versions() if day_versions else None
+    etag = make_etag(endpoint, params, tag_versions(tags), current_days)
+
+    if etag_matches(request, etag):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+    body_key = BODY_PREFIX + etag.strip('"')
+    data = cache.get(body_key)
+    if data is None:
+        data = build()
+        if day_versions and day_versions() != current_days:
+            return Response(data, status=status.HTTP_200_OK)
+        cache.set(body_key, data, timeout=getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+
+    return Response(data, status=status.HTTP_200_OK, headers={'ETag': etag})
+
+
+async def acached_response(request, endpoint, params, tags, build, day_versions=None):
+    """
+    ``cached_response()`` for the async views: ``build`` and ``day_versions``
+    are coroutine functions, and the payload is rendered with DRF's JSON
+    encoder, so both variants share the cache entries and ETags.
+    """
+    current_days = await day_versions() if day_versions else None
+    etag = make_etag(endpoint, params, await atag_versions(tags), current_days)
+
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    body_key = BODY_PREFIX + etag.strip('"')
+    data = await cache.aget(body_key)
+    if data is None:
+        data = await build()
+        if day_versions and await day_versions() != current_days:
+            return JsonResponse(data, encoder=JSONEncoder, safe=False)
+        await cache.aset(body_key, data, timeout=getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+
+    return JsonResponse(data, encoder=JSONEncoder, safe=False, headers={'ETag': etag})
+
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     'slot_machine',
     'transactions',
     'customer',
+    'reports',
 ]
 
 MIDDLEWARE = [
@@ -90,6 +91,11 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # A file (not the shared-cache in-memory default) lets concurrency
+        # tests write from several threads.
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -140,6 +146,27 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Seconds a worker may serve a cached current game day that another worker replaced
+GAME_DAY_CACHE_TIMEOUT = 30
+
+# Seconds a worker may serve a cached chip catalog that another worker changed
+CHIP_CATALOG_CACHE_TIMEOUT = 300
+
+# Cached dashboard responses (django_rest.response_cache). With several worker
+# processes this has to be a shared backend (Redis/Memcached) so a write in
+# one worker invalidates the responses cached by the others.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+RESPONSE_CACHE_TIMEOUT = 300
+
+# Push feed (django_rest.events). The in-process broker only reaches clients
+# of the same worker; swap in a broker-backed class to fan out across workers.
+EVENT_BROKER = 'django_rest.events.InProcessBroker'
+EVENT_KEEPALIVE_SECONDS = 15
+
 
 REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
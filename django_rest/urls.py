@@ -28,6 +28,7 @@ urlpatterns = [
     path('api/slot/', include('slot_machine.urls')),
     path('api/transactions/', include('transactions.urls')),
     path('api/customers/', include('customer.urls')),
+    path('api/reports/', include('reports.urls')),
 ]
 
 urlpatterns += doc_urls
\ No newline at end of file
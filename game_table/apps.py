@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GameTableConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'game_table'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from game_table import reconciliation
+from game_table.models import GameDayLive
+
+
+class Command(BaseCommand):
+    help = "Recompute CloseFloot and TableResult totals from their source rows and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', action='append', dest='dates',
+                            help="Reconcile the game day of this date (YYYY-MM-DD). May be repeated.")
+        parser.add_argument('--all', action='store_true',
+                            help="Reconcile every game day, not only those written since their last run.")
+        parser.add_argument('--fix', action='store_true',
+                            help="Rewrite the drifted rows. Without it the drift is only reported.")
+
+    def handle(self, *args, **options):
+        fix = options['fix']
+
+        if options['dates']:
+            dates = [self.parse(value) for value in options['dates']]
+            game_days = GameDayLive.objects.filter(date__in=dates).order_by('date', 'id')
+        elif options['all']:
+            game_days = GameDayLive.objects.order_by('date', 'id')
+        else:
+            game_days = reconciliation.pending_game_days(fix=fix)
+
+        reports = [reconciliation.reconcile(game_day, fix=fix) for game_day in game_days]
+        for report in reports:
+            for row in report['drift']:
+                self.stdout.write(
+                    f"{report['date']} {row['table_name']}: {row['field']} "
+                    f"stored {row['stored']} expected {row['expected']}"
+                )
+
+        drift_count = reconciliation.summarize(reports)['drift_count']
+        action = "fixed" if fix else "found"
+        self.stdout.write(self.style.SUCCESS(
+            f"Reconciled {len(reports)} game days, {action} {drift_count} drifted values."
+        ))
+
+    def parse(self, value):
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError("--date must be a date in YYYY-MM-DD format.")
+        return parsed
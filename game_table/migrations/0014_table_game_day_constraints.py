@@ -0,0 +1,54 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+def dedupe_table_game_day_rows(apps, schema_editor):
+    """
+    Keep one CloseFloot, Plaque and TableResult per (table, game day): the
+    closed row if there is one, otherwise the oldest.
+    """
+    for model_name, ordering in [
+        ('CloseFloot', ['status', 'id']),
+        ('Plaque', ['status', 'id']),
+        ('TableResult', ['id']),
+    ]:
+        model = apps.get_model('game_table', model_name)
+        duplicated = (
+            model.objects.values('table_id', 'game_day_id')
+            .annotate(rows=models.Count('id'))
+            .filter(rows__gt=1)
+            .order_by()
+        )
+        for group in duplicated:
+            rows = model.objects.filter(table_id=group['table_id'], game_day_id=group['game_day_id'])
+            keep = rows.order_by(*ordering).values_list('id', flat=True).first()
+            rows.exclude(id=keep).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_table', '0013_remove_plaque_result'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gamedaylive',
+            name='date',
+            field=models.DateField(db_index=True),
+        ),
+        migrations.RunPython(dedupe_table_game_day_rows, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='closefloot',
+            constraint=models.UniqueConstraint(fields=('table', 'game_day'), name='unique_closefloot_table_game_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='plaque',
+            constraint=models.UniqueConstraint(fields=('table', 'game_day'), name='unique_plaque_table_game_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='tableresult',
+            constraint=models.UniqueConstraint(fields=('table', 'game_day'), name='unique_tableresult_table_game_day'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_table', '0014_table_game_day_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gamedaylive',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
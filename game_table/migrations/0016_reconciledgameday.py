@@ -0,0 +1,25 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:16
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_table', '0015_gamedaylive_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReconciledGameDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('drift', models.PositiveIntegerField(default=0)),
+                ('reconciled_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('game_day', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='reconciliation', to='game_table.gamedaylive')),
+            ],
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:19
+
+import django_rest.money
+from django.db import migrations
+from django.db.models import F
+from django.db.models.functions import Round
+
+MONEY_FIELDS = {
+    'Table': ['open_flot_total'],
+    'CloseFloot': ['close_flot_total', 'total_fill', 'total_credit', 'result'],
+    'Plaque': ['plaques_total'],
+    'TableResult': ['result'],
+}
+
+
+def to_minor_units(apps, schema_editor):
+    """Scale the float amounts to cents while the columns are still floats."""
+    for model_name, fields in MONEY_FIELDS.items():
+        model = apps.get_model('game_table', model_name)
+        model.objects.update(**{field: Round(F(field) * 100) for field in fields})
+
+
+def from_minor_units(apps, schema_editor):
+    for model_name, fields in MONEY_FIELDS.items():
+        model = apps.get_model('game_table', model_name)
+        model.objects.update(**{field: F(field) / 100.0 for field in fields})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_table', '0016_reconciledgameday'),
+    ]
+
+    operations = [
+        migrations.RunPython(to_minor_units, from_minor_units),
+        migrations.AlterField(
+            model_name='closefloot',
+            name='close_flot_total',
+            field=django_rest.money.MoneyField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='closefloot',
+            name='result',
+            field=django_rest.money.MoneyField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='closefloot',
+            name='total_credit',
+            field=django_rest.money.MoneyField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='closefloot',
+            name='total_fill',
+            field=django_rest.money.MoneyField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='plaque',
+            name='plaques_total',
+            field=django_rest.money.MoneyField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='table',
+            name='open_flot_total',
+            field=django_rest.money.MoneyField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='tableresult',
+            name='result',
+            field=django_rest.money.MoneyField(default=0),
+        ),
+    ]
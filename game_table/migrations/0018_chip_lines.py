@@ -0,0 +1,100 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:24
+
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+# (owner model, JSON field, line model, line owner field)
+SOURCES = [
+    ('Table', 'open_flot', 'OpenFlotLine', 'table'),
+    ('CloseFloot', 'close_flot', 'CloseFlotLine', 'close_floot'),
+    ('Plaque', 'plaques', 'PlaqueLine', 'plaque'),
+]
+
+
+def minor_units(denomination):
+    try:
+        return int((Decimal(str(denomination)) * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def backfill_chip_lines(apps, schema_editor):
+    """
+    One line per catalog denomination of each stored map. Keys missing from
+    the catalog and non-integer or negative quantities are left out.
+    """
+    ChipModel = apps.get_model('chip', 'ChipModel')
+    chip_ids = {minor_units(denomination): chip_id
+                for chip_id, denomination in ChipModel.objects.values_list('id', 'denomination')}
+
+    for owner_name, field, line_name, owner_field in SOURCES:
+        owner_model = apps.get_model('game_table', owner_name)
+        line_model = apps.get_model('game_table', line_name)
+        lines = []
+        for owner_id, counts in owner_model.objects.values_list('id', field).iterator(chunk_size=BATCH_SIZE):
+            quantities = {}
+            for denomination, quantity in (counts.items() if isinstance(counts, dict) else ()):
+                if isinstance(quantity, float) and quantity.is_integer():
+                    quantity = int(quantity)
+                chip_id = chip_ids.get(minor_units(denomination))
+                if chip_id is None or not isinstance(quantity, int) or isinstance(quantity, bool) or quantity <= 0:
+                    continue
+                quantities[chip_id] = quantities.get(chip_id, 0) + quantity
+            lines += [line_model(**{f'{owner_field}_id': owner_id}, chip_id=chip_id, quantity=quantity)
+                      for chip_id, quantity in quantities.items()]
+            if len(lines) >= BATCH_SIZE:
+                line_model.objects.bulk_create(lines)
+                lines = []
+        line_model.objects.bulk_create(lines)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('chip', '0009_alter_chipmodel_denomination'),
+        ('game_table', '0017_money_minor_units'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CloseFlotLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('chip', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='chip.chipmodel')),
+                ('close_floot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='close_flot_lines', to='game_table.closefloot')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('close_floot', 'chip'), name='unique_closeflotline_close_floot_chip')],
+            },
+        ),
+        migrations.CreateModel(
+            name='OpenFlotLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('chip', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='chip.chipmodel')),
+                ('table', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='open_flot_lines', to='game_table.table')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('table', 'chip'), name='unique_openflotline_table_chip')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlaqueLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField()),
+                ('chip', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='chip.chipmodel')),
+                ('plaque', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='plaque_lines', to='game_table.plaque')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('plaque', 'chip'), name='unique_plaqueline_plaque_chip')],
+            },
+        ),
+        migrations.RunPython(backfill_chip_lines, migrations.RunPython.noop),
+    ]
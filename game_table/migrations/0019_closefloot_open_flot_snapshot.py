@@ -0,0 +1,55 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:32
+
+import django_rest.money
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def backfill_open_flot(apps, schema_editor):
+    """
+    The days opened before the snapshot existed. A closed row keeps the open
+    total its stored result was computed with (close - result + fills), so
+    reconciliation does not re-judge it against later edits of the table; the
+    per-denomination map, and the total of a still open row, can only come
+    from the table as it is now.
+    """
+    CloseFloot = apps.get_model('game_table', 'CloseFloot')
+    rows = CloseFloot.objects.select_related('table').only(
+        'status', 'close_flot_total', 'total_fill', 'total_credit', 'result',
+        'table__open_flot', 'table__open_flot_total',
+    )
+    batch = []
+    for close_floot in rows.iterator(chunk_size=BATCH_SIZE):
+        close_floot.open_flot = close_floot.table.open_flot
+        if close_floot.status:
+            close_floot.open_flot_total = close_floot.table.open_flot_total
+        else:
+            close_floot.open_flot_total = (close_floot.close_flot_total - close_floot.result
+                                           + close_floot.total_fill + close_floot.total_credit)
+        batch.append(close_floot)
+        if len(batch) >= BATCH_SIZE:
+            CloseFloot.objects.bulk_update(batch, ['open_flot', 'open_flot_total'])
+            batch = []
+    CloseFloot.objects.bulk_update(batch, ['open_flot', 'open_flot_total'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_table', '0018_chip_lines'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='closefloot',
+            name='open_flot',
+            field=models.JSONField(default=dict),
+        ),
+        migrations.AddField(
+            model_name='closefloot',
+            name='open_flot_total',
+            field=django_rest.money.MoneyField(default=0),
+        ),
+        migrations.RunPython(backfill_open_flot, migrations.RunPython.noop),
+    ]
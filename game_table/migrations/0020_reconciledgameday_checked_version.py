@@ -0,0 +1,35 @@
+# Generated by Django 5.1.1 on 2026-10-18 23:05
+
+from django.db import migrations, models
+
+
+def backfill_checked_version(apps, schema_editor):
+    """Only fixing runs were recorded so far: what they fixed, they also checked."""
+    ReconciledGameDay = apps.get_model('game_table', 'ReconciledGameDay')
+    ReconciledGameDay.objects.update(checked_version=models.F('fixed_version'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_table', '0019_closefloot_open_flot_snapshot'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='reconciledgameday',
+            old_name='version',
+            new_name='fixed_version',
+        ),
+        migrations.AlterField(
+            model_name='reconciledgameday',
+            name='fixed_version',
+            field=models.PositiveBigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reconciledgameday',
+            name='checked_version',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_checked_version, migrations.RunPython.noop),
+    ]
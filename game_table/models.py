@@ -1,12 +1,15 @@
 from django.db import models
 from django.utils import timezone
 
+from chip import catalog as chip_catalog
+from django_rest.money import MoneyField
+
 
 # Create your models here.
 
 class Table(models.Model):
     name = models.CharField(max_length=200, unique=True)
-    open_flot_total = models.FloatField(default=0.0)
+    open_flot_total = MoneyField(default=0)
     hall = models.ForeignKey('Hall', on_delete=models.CASCADE, null=True, blank=True, related_name='tables')
     result = models.FloatField(default=0.0)  # Add this line if it's missing
     date_created = models.DateTimeField(default=timezone.now)
@@ -22,15 +25,23 @@ class CloseFloot(models.Model):
     table = models.ForeignKey(Table, on_delete=models.CASCADE)
     game_day = models.ForeignKey('GameDayLive', on_delete=models.CASCADE)
     status = models.BooleanField(default=True)
-    close_flot_total = models.FloatField(default=0.0)
-    total_fill = models.FloatField(default=0.0)
-    total_credit = models.FloatField(default=0.0)
-    result = models.FloatField(default=0.0)
+    close_flot_total = MoneyField(default=0)
+    total_fill = MoneyField(default=0)
+    total_credit = MoneyField(default=0)
+    result = MoneyField(default=0)
     close_date = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(null=True, blank=True)
     updated_at = models.DateTimeField(null=True, blank=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
     close_flot = models.JSONField(default=dict)
+    # The table's open flot when the game day was opened; later edits of the table do not change it
+    open_flot = models.JSONField(default=dict)
+    open_flot_total = MoneyField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['table', 'game_day'], name='unique_closefloot_table_game_day'),
+        ]
 
     def __str__(self):
         return f"Table: {self.table.name}"
@@ -40,12 +51,17 @@ class Plaque(models.Model):
     table = models.ForeignKey(Table, on_delete=models.CASCADE)
     game_day = models.ForeignKey('GameDayLive', on_delete=models.CASCADE)
     status = models.BooleanField(default=True)
-    plaques_total = models.FloatField(default=0.0)
+    plaques_total = MoneyField(default=0)
     created_at = models.DateTimeField(null=True, blank=True)
     updated_at = models.DateTimeField(null=True, blank=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
     plaques = models.JSONField(default=dict)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['table', 'game_day'], name='unique_plaque_table_game_day'),
+        ]
+
     def __str__(self):
         return f"Table: {self.table.name}"
 
@@ -63,20 +79,108 @@ class Hall(models.Model):
 class TableResult(models.Model):
     table = models.ForeignKey(Table, on_delete=models.CASCADE)
     game_day = models.ForeignKey('GameDayLive', on_delete=models.CASCADE)
-    result = models.FloatField(default=0.0)
+    result = MoneyField(default=0)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(null=True, blank=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['table', 'game_day'], name='unique_tableresult_table_game_day'),
+        ]
+
     def __str__(self):
         return f"Table: {self.table.name}"
 
 
 class GameDayLive(models.Model):
-    date = models.DateField()
+    date = models.DateField(db_index=True)
+    # Bumped on every write to the day's rows; feeds the ETag of the polled endpoints
+    version = models.PositiveBigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(null=True, blank=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
         return str(self.date)
+
+    def save(self, *args, **kwargs):
+        # ``version`` is only moved by game_days.bump_version(); never write back a stale copy
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'version'
+            ]
+        super().save(*args, **kwargs)
+
+
+class ReconciledGameDay(models.Model):
+    """Game day versions the reconciliation runs checked and fixed (see ``game_table.reconciliation``)."""
+    game_day = models.OneToOneField(GameDayLive, on_delete=models.CASCADE, related_name='reconciliation')
+    # Recorded by every run, report-only or fixing
+    checked_version = models.PositiveBigIntegerField(default=0)
+    # Only moved by fixing runs; null until the day is first fixed
+    fixed_version = models.PositiveBigIntegerField(null=True, blank=True)
+    drift = models.PositiveIntegerField(default=0)
+    reconciled_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Reconciled: {self.game_day.date}"
+
+
+class ChipLineQuerySet(models.QuerySet):
+    def replace(self, owner, counts):
+        """
+        Make the owner's lines match the ``{denomination: quantity}`` map
+        ``counts``, which must be valid for the chip catalog.
+        """
+        catalog = chip_catalog.get()
+        vector = catalog.denominations.vector(counts)
+        owner_field = self.model.owner_field
+        self.filter(**{owner_field: owner}).delete()
+        return self.bulk_create([
+            self.model(**{owner_field: owner}, chip_id=chip_id, quantity=quantity)
+            for chip_id, quantity in zip(catalog.chip_ids, vector)
+            if quantity
+        ])
+
+
+class ChipLine(models.Model):
+    """One denomination of a chip count map, kept alongside the JSON field."""
+    chip = models.ForeignKey('chip.ChipModel', on_delete=models.PROTECT, related_name='+')
+    quantity = models.PositiveIntegerField()
+
+    objects = ChipLineQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+
+class OpenFlotLine(ChipLine):
+    owner_field = 'table'
+    table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name='open_flot_lines')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['table', 'chip'], name='unique_openflotline_table_chip'),
+        ]
+
+
+class CloseFlotLine(ChipLine):
+    owner_field = 'close_floot'
+    close_floot = models.ForeignKey(CloseFloot, on_delete=models.CASCADE, related_name='close_flot_lines')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['close_floot', 'chip'], name='unique_closeflotline_close_floot_chip'),
+        ]
+
+
+class PlaqueLine(ChipLine):
+    owner_field = 'plaque'
+    plaque = models.ForeignKey(Plaque, on_delete=models.CASCADE, related_name='plaque_lines')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['plaque', 'chip'], name='unique_plaqueline_plaque_chip'),
+        ]
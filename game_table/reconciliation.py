@@ -0,0 +1,173 @@
+"""
+Recompute the running totals of the live tables from their source rows.
+
+``CloseFloot`` and ``TableResult`` are maintained incrementally by the
+serializers and ``transactions.ledger``. For a (table, game day) they must
+satisfy::
+
+    CloseFloot.total_fill    = sum of the negative FillCredit amounts
+    CloseFloot.total_credit  = sum of the positive FillCredit amounts
+    CloseFloot.result        = close_flot_total - open_flot_total (once closed)
+                               + total_fill + total_credit
+    TableResult.result       = CloseFloot.result + Plaque.plaques_total
+
+``CloseFloot.open_flot_total`` is the table's open flot as the day opened
+with it, so editing a table never changes what its past days should hold.
+
+Amounts are integer cents in the database, so the comparison is exact. A run
+compares the stored columns of a whole game day with the values recomputed in
+SQL (one SELECT per model, the expected values being correlated
+subqueries), then rewrites only the drifted rows with one UPDATE per model.
+
+A run only reports unless asked to fix. Both kinds of run are incremental:
+``ReconciledGameDay`` keeps the day ``version`` the last run checked and,
+separately, the one the last fixing run fixed. Every write to a day's rows
+bumps that version, so a report-only run checks only the days written since
+they were last checked, and a fixing run the days written since they were last
+fixed. A write racing with a run bumps the version past the recorded one and
+is picked up by the next run.
+"""
+from django.db import transaction
+from django.db.models import Case, ExpressionWrapper, F, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from django_rest import events, game_days, money
+from django_rest.money import MoneyField
+from transactions.models import FillCredit
+from .models import CloseFloot, GameDayLive, Plaque, ReconciledGameDay, TableResult
+
+
+def _same_table_day(queryset):
+    return queryset.filter(table_id=OuterRef('table_id'), game_day_id=OuterRef('game_day_id')).order_by()
+
+
+def _zero_if_null(subquery):
+    return Coalesce(Subquery(subquery), money.value(0), output_field=MoneyField())
+
+
+def _money(expression):
+    # Arithmetic over MoneyField columns resolves to a plain integer field
+    return ExpressionWrapper(expression, output_field=MoneyField())
+
+
+def _fill_sum(*conditions):
+    fills = _same_table_day(FillCredit.objects.filter(*conditions))
+    return _zero_if_null(fills.values('table_id').annotate(total=Sum('fill_credit')).values('total'))
+
+
+def close_floot_expressions():
+    """Expected CloseFloot columns, as expressions over the CloseFloot row."""
+    total_fill = _fill_sum(Q(fill_credit__lt=0))
+    total_credit = _fill_sum(Q(fill_credit__gt=0))
+    close_part = Case(When(status=False, then=F('close_flot_total') - F('open_flot_total')),
+                      default=money.value(0), output_field=MoneyField())
+    return {
+        'total_fill': total_fill,
+        'total_credit': total_credit,
+        'result': _money(close_part + _fill_sum()),
+    }
+
+
+def table_result_expressions():
+    """Expected TableResult columns, as expressions over the TableResult row."""
+    closed = _same_table_day(CloseFloot.objects.filter(status=False)).annotate(
+        part=_money(F('close_flot_total') - F('open_flot_total')),
+    )
+    plaques = _same_table_day(Plaque.objects.all())
+    return {
+        'result': _money(_zero_if_null(closed.values('part')[:1]) + _fill_sum()
+                         + _zero_if_null(plaques.values('plaques_total')[:1])),
+    }
+
+
+def _drift(queryset, owner, expressions):
+    expected = {f'expected_{field}': expression for field, expression in expressions.items()}
+    mismatch = Q()
+    for field in expressions:
+        mismatch |= ~Q(**{field: F(f'expected_{field}')})
+
+    rows = (queryset.annotate(**expected).filter(mismatch)
+            .values('id', 'table_id', 'table__name', *expressions, *expected).order_by('table__name'))
+
+    drift = []
+    for row in rows:
+        for field in expressions:
+            stored, should_be = row[field], row[f'expected_{field}']
+            if stored != should_be:
+                drift.append({
+                    'id': row['id'],
+                    'table': row['table_id'],
+                    'table_name': row['table__name'],
+                    'field': f'{owner}.{field}',
+                    'stored': stored,
+                    'expected': should_be,
+                })
+    return drift
+
+
+def reconcile(game_day, fix=False):
+    """
+    Check one game day and, only with ``fix``, rewrite its drifted rows. Returns the
+    report: ``{"game_day", "date", "tables", "drift": [...], "fixed"}``.
+    """
+    with transaction.atomic():
+        version = GameDayLive.objects.filter(pk=game_day.pk).values_list('version', flat=True).get()
+
+        close_floots = CloseFloot.objects.filter(game_day=game_day)
+        table_results = TableResult.objects.filter(game_day=game_day)
+        drift = (_drift(close_floots, 'close_floot', close_floot_expressions())
+                 + _drift(table_results, 'table_result', table_result_expressions()))
+
+        fixed = fix and bool(drift)
+        if fixed:
+            # The TableResult expressions read CloseFloot, so it is fixed first
+            close_floot_ids = {row['id'] for row in drift if row['field'].startswith('close_floot.')}
+            table_result_ids = {row['id'] for row in drift if row['field'].startswith('table_result.')}
+            if close_floot_ids:
+                CloseFloot.objects.filter(pk__in=close_floot_ids).update(**close_floot_expressions())
+            if table_result_ids:
+                TableResult.objects.filter(pk__in=table_result_ids).update(**table_result_expressions())
+
+            game_days.bump_version(game_days.LIVE, game_day.pk)
+            # Only our own bump since the check: the new version is known to be consistent
+            if GameDayLive.objects.filter(pk=game_day.pk, version=version + 1).exists():
+                version += 1
+            events.publish_on_commit(events.live_channel(game_day.pk), {
+                'type': 'tables.reconciled',
+                'game_day': game_day.pk,
+                'tables': sorted({row['table'] for row in drift}),
+            })
+
+        recorded = {'checked_version': version, 'drift': len(drift), 'reconciled_at': timezone.now()}
+        if fix:
+            recorded['fixed_version'] = version
+        ReconciledGameDay.objects.update_or_create(game_day=game_day, defaults=recorded)
+
+    return {
+        'game_day': game_day.pk,
+        'date': game_day.date,
+        'tables': table_results.count(),
+        'drift': drift,
+        'fixed': fixed,
+    }
+
+
+def pending_game_days(fix=False):
+    """Days never checked (or, with ``fix``, never fixed), or written since."""
+    recorded = 'reconciliation__fixed_version' if fix else 'reconciliation__checked_version'
+    return GameDayLive.objects.filter(
+        Q(**{f'{recorded}__isnull': True}) | Q(version__gt=F(recorded)),
+    ).order_by('date', 'id')
+
+
+def reconcile_pending(fix=False):
+    """Reconcile every pending day; returns one report per day."""
+    return [reconcile(game_day, fix=fix) for game_day in pending_game_days(fix=fix)]
+
+
+def summarize(reports):
+    return {
+        'game_days': reports,
+        'drift_count': sum(len(report['drift']) for report in reports),
+    }
@@ -1,7 +1,46 @@
 from rest_framework import serializers
+from django.db import transaction
+from django.db.models import F
 from django.utils import timezone
-from .models import Table, CloseFloot, Hall, GameDayLive, Plaque, TableResult
+from .models import (Table, CloseFloot, Hall, GameDayLive, Plaque, TableResult, OpenFlotLine, CloseFlotLine,
+                     PlaqueLine)
 from transactions.models import FillCredit
+from chip import counts as chip_counts
+from django_rest import events, money
+
+
+def publish_table_change(event_type, table_result, **fields):
+    """Push a table delta to the game day's event stream once the write commits."""
+    events.publish_on_commit(events.live_channel(table_result.game_day_id), {
+        'type': event_type,
+        'game_day': table_result.game_day_id,
+        'table': table_result.table_id,
+        'table_result': table_result.result,
+        **fields,
+    })
+
+
+def add_to_table_result(table_id, game_day_id, delta):
+    """
+    Add ``delta`` to the day's TableResult with an UPDATE ... SET result =
+    result + delta on the locked row, as ``transactions.ledger`` does, and
+    return the row. Call inside the transaction of the write that caused it.
+    """
+    try:
+        table_result = TableResult.objects.select_for_update().get(table_id=table_id, game_day_id=game_day_id)
+    except TableResult.DoesNotExist:
+        raise serializers.ValidationError({"message": "TableResult with this ID does not exist."})
+    TableResult.objects.filter(pk=table_result.pk).update(result=F('result') + money.value(delta))
+    table_result.refresh_from_db(fields=['result'])
+    return table_result
+
+
+def chip_total(counts, error_key='error'):
+    """Value of a chip count map, validated against the chip catalog."""
+    try:
+        return chip_counts.total(counts)
+    except chip_counts.ChipCountError as error:
+        raise serializers.ValidationError({error_key: str(error)})
 
 
 class CloseFlootSerializer(serializers.ModelSerializer):
@@ -22,8 +61,11 @@ class CloseFlootSerializer(serializers.ModelSerializer):
             'status',
             'created_at',
             'updated_at',
-            'deleted_at'
+            'deleted_at',
+            'open_flot',
+            'open_flot_total',
         ]
+        read_only_fields = ['open_flot', 'open_flot_total']
 
     def create(self, validated_data):
         table_id = validated_data.pop('table_id')
@@ -36,20 +78,10 @@ class CloseFlootSerializer(serializers.ModelSerializer):
         else:
             game_day_id = game_day_data
 
-        for denomination, quantity in close_flot.items():
-            if isinstance(quantity, (int, float)):
-                if quantity < 0:
-                    raise serializers.ValidationError({"message": "Close flot quantity cannot be negative."})
-
-        close_flot_total = sum(
-            float(denomination) * float(quantity)
-            for denomination, quantity in close_flot.items()
-            if isinstance(quantity, (int, float))
-        )
+        close_flot_total = chip_total(close_flot, error_key='message')
 
         try:
             table = Table.objects.get(id=table_id)
-            open_flot_total = table.open_flot_total
         except Table.DoesNotExist:
             raise serializers.ValidationError({"table_id": "Table with this ID does not exist."})
 
@@ -58,56 +90,49 @@ class CloseFlootSerializer(serializers.ModelSerializer):
         except GameDayLive.DoesNotExist:
             raise serializers.ValidationError({"game_day": "GameDay with this ID does not exist."})
 
-        close_floot_instance = CloseFloot.objects.get(table=table, game_day=game_day_instance)
-
-        close_floot_instance.close_flot = close_flot
-        close_floot_instance.close_flot_total = close_flot_total
-        close_floot_instance.result = close_flot_total - open_flot_total
-        close_floot_instance.status = False
-        close_floot_instance.close_date = timezone.now() + timezone.timedelta(hours=4)
-        close_floot_instance.save()
-
-        table_result = TableResult.objects.get(
-            table=table, game_day=game_day_instance
-        )
-        table_result.result += close_floot_instance.result
-        table_result.save()
+        with transaction.atomic():
+            # Locked so a fill/credit posted meanwhile cannot be overwritten by the save below
+            close_floot_instance = CloseFloot.objects.select_for_update().get(table=table, game_day=game_day_instance)
+
+            previous_result = close_floot_instance.result
+            close_floot_instance.close_flot = close_flot
+            close_floot_instance.close_flot_total = close_flot_total
+            # The fills and credits posted so far stay part of the close result
+            close_floot_instance.result = (close_flot_total - close_floot_instance.open_flot_total
+                                           + close_floot_instance.total_fill + close_floot_instance.total_credit)
+            close_floot_instance.status = False
+            close_floot_instance.close_date = timezone.now() + timezone.timedelta(hours=4)
+            close_floot_instance.save()
+            CloseFlotLine.objects.replace(close_floot_instance, close_flot)
+
+            table_result = add_to_table_result(table.id, game_day_instance.id,
+                                               close_floot_instance.result - previous_result)
+            publish_table_change('table.closed', table_result, close_flot_total=close_flot_total,
+                                 result=close_floot_instance.result)
 
         return close_floot_instance
 
     def update(self, instance, validated_data):
         close_flot = validated_data.pop('close_flot')
 
-        for denomination, quantity in close_flot.items():
-            if isinstance(quantity, (int, float)):
-                if quantity < 0:
-                    raise serializers.ValidationError({"error": "Close flot quantity cannot be negative."})
-
-        close_flot_total = sum(
-            float(denomination) * float(quantity)
-            for denomination, quantity in close_flot.items()
-            if isinstance(quantity, (int, float))
-        )
-
-        table = instance.table
-        game_day_instance = instance.game_day
-        open_flot_total = table.open_flot_total
-
-        try:
-            table_result = TableResult.objects.get(table=table, game_day=game_day_instance)
-        except TableResult.DoesNotExist:
-            raise serializers.ValidationError({"message": "TableResult with this ID does not exist."})
+        close_flot_total = chip_total(close_flot)
 
-        table_result.result -= instance.result
+        with transaction.atomic():
+            # Re-read under lock: a fill/credit may have moved the totals since the view loaded the row
+            instance.refresh_from_db(from_queryset=CloseFloot.objects.select_for_update())
+            previous_result = instance.result
 
-        instance.close_flot = close_flot
-        instance.result = close_flot_total - open_flot_total
-        instance.close_flot_total = close_flot_total
-        instance.updated_at = timezone.now() + timezone.timedelta(hours=4)
-        instance.save()
+            instance.close_flot = close_flot
+            instance.result = close_flot_total - instance.open_flot_total + instance.total_fill + instance.total_credit
+            instance.close_flot_total = close_flot_total
+            instance.updated_at = timezone.now() + timezone.timedelta(hours=4)
+            instance.save()
+            CloseFlotLine.objects.replace(instance, close_flot)
 
-        table_result.result += instance.result
-        table_result.save()
+            table_result = add_to_table_result(instance.table_id, instance.game_day_id,
+                                               instance.result - previous_result)
+            publish_table_change('table.closed', table_result, close_flot_total=close_flot_total,
+                                 result=instance.result)
 
         return instance
 
@@ -121,30 +146,28 @@ class TableSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         open_flot = validated_data.get('open_flot', {})
+        open_flot_total = chip_total(open_flot)
         sorted_open_flot = dict(sorted(open_flot.items(), key=lambda x: float(x[0])))
 
-        open_flot_total = sum(
-            float(denomination) * float(quantity) for denomination, quantity in sorted_open_flot.items() if
-            isinstance(quantity, (int, float)))
-
         validated_data['open_flot'] = sorted_open_flot
         validated_data['open_flot_total'] = open_flot_total
 
-        table = Table.objects.create(**validated_data)
+        with transaction.atomic():
+            table = Table.objects.create(**validated_data)
+            OpenFlotLine.objects.replace(table, sorted_open_flot)
         return table
 
     def update(self, instance, validated_data):
         open_flot = validated_data.get('open_flot', {})
+        open_flot_total = chip_total(open_flot)
         sorted_open_flot = dict(sorted(open_flot.items(), key=lambda x: float(x[0])))
 
-        open_flot_total = sum(
-            float(denomination) * float(quantity) for denomination, quantity in sorted_open_flot.items() if
-            isinstance(quantity, (int, float)))
-
         validated_data['open_flot'] = sorted_open_flot
         validated_data['open_flot_total'] = open_flot_total
 
-        table = super().update(instance, validated_data)
+        with transaction.atomic():
+            table = super().update(instance, validated_data)
+            OpenFlotLine.objects.replace(table, sorted_open_flot)
         return table
 
 
@@ -192,16 +215,7 @@ class PlaqueSerializer(serializers.ModelSerializer):
         else:
             game_day_id = game_day_data
 
-        for denomination, quantity in plaques.items():
-            if isinstance(quantity, (int, float)):
-                if quantity < 0:
-                    raise serializers.ValidationError({"error": "Plaques quantity cannot be negative."})
-
-        plaques_total = sum(
-            float(denomination) * float(quantity)
-            for denomination, quantity in plaques.items()
-            if isinstance(quantity, (int, float))
-        )
+        plaques_total = chip_total(plaques)
 
         try:
             table = Table.objects.get(id=table_id)
@@ -213,60 +227,39 @@ class PlaqueSerializer(serializers.ModelSerializer):
         except GameDayLive.DoesNotExist:
             raise serializers.ValidationError({"error": "GameDay with this ID does not exist."})
 
-        plaque_instance = Plaque.objects.get(table=table, game_day=game_day_instance)
+        with transaction.atomic():
+            plaque_instance = Plaque.objects.select_for_update().get(table=table, game_day=game_day_instance)
 
-        plaque_instance.plaques_total = plaques_total
-        plaque_instance.plaques = plaques
-        plaque_instance.created_at = timezone.now()
-        plaque_instance.status = False
-        plaque_instance.save()
+            previous_total = plaque_instance.plaques_total
+            plaque_instance.plaques_total = plaques_total
+            plaque_instance.plaques = plaques
+            plaque_instance.created_at = timezone.now()
+            plaque_instance.status = False
+            plaque_instance.save()
+            PlaqueLine.objects.replace(plaque_instance, plaques)
 
-
-        table_result = TableResult.objects.get(
-            table=table, game_day=game_day_instance
-        )
-
-        table_result.result += plaques_total
-        table_result.save()
+            table_result = add_to_table_result(table.id, game_day_instance.id, plaques_total - previous_total)
+            publish_table_change('plaque.posted', table_result, plaques_total=plaques_total)
 
         return plaque_instance
 
     def update(self, instance, validated_data):
         plaques = validated_data.pop('plaques')
 
-        for denomination, quantity in plaques.items():
-            if isinstance(quantity, (int, float)):
-                if quantity < 0:
-                    raise serializers.ValidationError({"error": "Plaques quantity cannot be negative."})
+        plaques_total = chip_total(plaques)
 
-        plaques_total = sum(
-            float(denomination) * float(quantity)
-            for denomination, quantity in plaques.items()
-            if isinstance(quantity, (int, float))
-        )
+        with transaction.atomic():
+            instance.refresh_from_db(from_queryset=Plaque.objects.select_for_update())
+            previous_total = instance.plaques_total
 
-        table = instance.table
-        game_day_instance = instance.game_day
+            instance.plaques_total = plaques_total
+            instance.plaques = plaques
+            instance.updated_at = timezone.now()
+            instance.save()
+            PlaqueLine.objects.replace(instance, plaques)
 
-        try:
-            table_result = TableResult.objects.get(
-                table=table, game_day=game_day_instance
-            )
-        except TableResult.DoesNotExist:
-            raise serializers.ValidationError({"message": "TableResult with this ID does not exist."})
-
-        table_result.result -= instance.plaques_total
-
-        instance.plaques_total = plaques_total
-        instance.plaques = plaques
-        instance.updated_at = timezone.now()
-        instance.save()
-
-        print(table_result.result)
-        print(instance.plaques_total)
-        table_result.result += instance.plaques_total
-        print(table_result.result)
-        table_result.save()
+            table_result = add_to_table_result(instance.table_id, instance.game_day_id, plaques_total - previous_total)
+            publish_table_change('plaque.posted', table_result, plaques_total=plaques_total)
 
         return instance
 
@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from django_rest import game_days, response_cache
+from .models import CloseFloot, GameDayLive, Hall, Plaque, Table, TableResult
+
+
+@receiver(post_save, sender=GameDayLive)
+@receiver(post_delete, sender=GameDayLive)
+def forget_current_live_game_day(sender, **kwargs):
+    game_days.invalidate_on_write(game_days.LIVE)
+
+
+@receiver(post_save, sender=CloseFloot)
+@receiver(post_delete, sender=CloseFloot)
+@receiver(post_save, sender=Plaque)
+@receiver(post_delete, sender=Plaque)
+@receiver(post_save, sender=TableResult)
+@receiver(post_delete, sender=TableResult)
+def bump_live_game_day_version(sender, instance, **kwargs):
+    game_days.bump_version(game_days.LIVE, instance.game_day_id)
+
+
+@receiver(post_save, sender=Table)
+@receiver(post_delete, sender=Table)
+@receiver(post_save, sender=Hall)
+@receiver(post_delete, sender=Hall)
+@receiver(post_save, sender=GameDayLive)
+@receiver(post_delete, sender=GameDayLive)
+def invalidate_live_floor_responses(sender, **kwargs):
+    response_cache.bump_on_write(response_cache.LIVE_FLOOR)
@@ -1,3 +1,543 @@
+import asyncio
+import importlib
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.apps import apps as django_apps
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from chip import catalog as chip_catalog
+from chip.models import ChipModel
+from django_rest import events, game_days
+from . import reconciliation
+from .models import Table, CloseFloot, Hall, GameDayLive, OpenFlotLine, Plaque, ReconciledGameDay, TableResult
+from .serializers import CloseFlootSerializer
+
+
+class HallListCreateTests(TestCase):
+    url = '/api/table/hall/'
+
+    def setUp(self):
+        cache.clear()
+        self.game_day = GameDayLive.objects.create(date=date(2024, 11, 1))
+
+    def add_floor(self, halls, tables_per_hall):
+        for hall_index in range(halls):
+            hall = Hall.objects.create(name=f'Hall {Hall.objects.count() + 1}')
+            for table_index in range(tables_per_hall):
+                table = Table.objects.create(
+                    name=f'{hall.name} / T{table_index}',
+                    hall=hall,
+                    open_flot={'5': 10},
+                    open_flot_total=50.0,
+                )
+                CloseFloot.objects.create(table=table, game_day=self.game_day, close_flot={'5': 10},
+                                          close_flot_total=50.0)
+                Plaque.objects.create(table=table, game_day=self.game_day)
+                TableResult.objects.create(table=table, game_day=self.game_day, result=table_index)
+
+    def test_returns_day_rows_for_each_table(self):
+        self.add_floor(halls=1, tables_per_hall=2)
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        tables = response.json()[0]['tables']
+        self.assertEqual([t['name'] for t in tables], ['Hall 1 / T0', 'Hall 1 / T1'])
+        self.assertEqual(tables[1]['table_result'], 1.0)
+        self.assertEqual(tables[0]['close_flot_total'], 50.0)
+        self.assertTrue(tables[0]['status'])
+
+    def test_ignores_rows_from_other_game_days(self):
+        self.add_floor(halls=1, tables_per_hall=1)
+        other_day = GameDayLive.objects.create(date=date(2024, 10, 31))
+        table = Table.objects.get()
+        TableResult.objects.filter(table=table).update(game_day=other_day)
+
+        response = self.client.get(self.url, {'date': '2024-11-01'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()[0]['tables'][0]['table_result'])
+
+    def test_query_count_does_not_grow_with_floor_size(self):
+        self.add_floor(halls=1, tables_per_hall=1)
+        self.client.get(self.url)  # Resolves and caches the current game day
+        cache.clear()
+        with self.assertNumQueries(7):
+            self.client.get(self.url)
+
+        self.add_floor(halls=4, tables_per_hall=10)
+        with self.assertNumQueries(7):
+            response = self.client.get(self.url)
+        self.assertEqual(sum(len(hall['tables']) for hall in response.json()), 41)
+
+    def test_repeated_polls_are_served_from_the_cache(self):
+        self.add_floor(halls=1, tables_per_hall=2)
+        first = self.client.get(self.url)
+
+        with self.assertNumQueries(1):  # The game day version only
+            second = self.client.get(self.url)
+
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_matching_etag_returns_not_modified(self):
+        self.add_floor(halls=1, tables_per_hall=1)
+        etag = self.client.get(self.url)['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"game_table_gamedaylive"', queries[0]['sql'])
+
+    def test_saving_the_game_day_keeps_its_version(self):
+        self.add_floor(halls=1, tables_per_hall=1)
+        stale = GameDayLive.objects.get()
+        TableResult.objects.get().save()
+
+        stale.updated_at = stale.created_at
+        stale.save()
+
+        self.assertEqual(GameDayLive.objects.get().version, 4)
+
+    def test_writing_a_day_row_invalidates_the_cached_dashboard(self):
+        self.add_floor(halls=1, tables_per_hall=1)
+        etag = self.client.get(self.url)['ETag']
+
+        table_result = TableResult.objects.get()
+        table_result.result = 42
+        table_result.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()[0]['tables'][0]['table_result'], 42.0)
+
+    def test_missing_game_day(self):
+        self.game_day.delete()
+
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_async_variant_returns_the_same_dashboard(self):
+        self.add_floor(halls=2, tables_per_hall=3)
+        sync_response = self.client.get(self.url)
+        cache.clear()
+
+        async_response = async_to_sync(self.async_client.get)('/api/table/async/hall/')
+
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.json(), sync_response.json())
+        self.assertEqual(async_response['ETag'], self.client.get(self.url)['ETag'])
+        not_modified = async_to_sync(self.async_client.get)('/api/table/async/hall/',
+                                                           headers={'If-None-Match': async_response['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_async_game_day_matches_sync(self):
+        async_response = async_to_sync(self.async_client.get)('/api/table/async/game-day/')
+
+        self.assertEqual(async_response.status_code, 200)
+        self.assertEqual(async_response.json(), self.client.get('/api/table/game-day/').json())
+
+
+class MoveTablesToHallTests(TestCase):
+    url = '/api/table/move-to-hall/'
+
+    def setUp(self):
+        cache.clear()
+        self.main, self.vip = Hall.objects.create(name='Main'), Hall.objects.create(name='VIP')
+        self.tables = [Table.objects.create(name=f'T{index}', hall=self.main) for index in range(3)]
+
+    def move(self, tables, hall):
+        return self.client.put(self.url, {'tables': tables, 'hall': hall}, content_type='application/json')
+
+    def test_moves_tables_with_one_update_and_reports_changes(self):
+        self.tables[2].hall = self.vip
+        self.tables[2].save()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.move([table.id for table in self.tables], self.vip.id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], 2)
+        self.assertEqual(set(Table.objects.values_list('hall', flat=True)), {self.vip.id})
+        self.assertEqual(sum(query['sql'].startswith('UPDATE') for query in queries), 1)
+
+    def test_null_hall_takes_tables_off_the_floor(self):
+        response = self.move([self.tables[0].id], None)
+
+        self.assertEqual(response.json()['updated'], 1)
+        self.assertIsNone(Table.objects.get(id=self.tables[0].id).hall)
+
+    def test_moving_invalidates_the_cached_dashboard(self):
+        GameDayLive.objects.create(date=date(2024, 11, 1))
+        etag = self.client.get('/api/table/hall/')['ETag']
+
+        self.move([self.tables[0].id], self.vip.id)
+
+        self.assertEqual(self.client.get('/api/table/hall/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_unknown_ids_move_nothing(self):
+        self.assertEqual(self.move([self.tables[0].id, 999], self.vip.id).json()['missing'], [999])
+        self.assertEqual(self.move([self.tables[0].id], 999).status_code, 404)
+        self.assertEqual(self.move([], self.vip.id).status_code, 400)
+        self.assertEqual(Table.objects.filter(hall=self.vip).count(), 0)
+
+    def test_hall_must_be_an_id_or_null(self):
+        for hall in ('abc', str(self.vip.id), True):
+            self.assertEqual(self.move([self.tables[0].id], hall).status_code, 400)
+        self.assertEqual(Table.objects.filter(hall=self.vip).count(), 0)
+
+
+class CreateGameDayViewTests(TestCase):
+    url = '/api/table/create-game-day/'
+
+    def add_tables(self, count):
+        hall, _ = Hall.objects.get_or_create(name='Main')
+        for _ in range(count):
+            Table.objects.create(name=f'T{Table.objects.count()}', hall=hall, open_flot={'5': 2},
+                                 open_flot_total=10.0)
+
+    def open_day(self, day):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'date': day}, content_type='application/json')
+        return response, len(queries)
+
+    def test_opens_rows_for_every_table_in_a_hall(self):
+        self.add_tables(3)
+        Table.objects.create(name='Unassigned')
+
+        response, _ = self.open_day('2024-11-01')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['close_flots_created'], 3)
+        game_day = GameDayLive.objects.get(date='2024-11-01')
+        self.assertEqual(CloseFloot.objects.filter(game_day=game_day).count(), 3)
+        self.assertEqual(Plaque.objects.filter(game_day=game_day).count(), 3)
+        self.assertEqual(TableResult.objects.filter(game_day=game_day).count(), 3)
+        close_floot = CloseFloot.objects.filter(game_day=game_day).first()
+        self.assertEqual(close_floot.close_flot, {'5': 2})
+        self.assertEqual(close_floot.close_flot_total, 10.0)
+
+    def test_query_count_does_not_grow_with_tables(self):
+        self.add_tables(2)
+        _, small = self.open_day('2024-11-01')
+
+        self.add_tables(60)
+        _, large = self.open_day('2024-11-02')
+
+        self.assertEqual(small, large)
+
+    def test_existing_day_is_rejected(self):
+        self.add_tables(1)
+        self.open_day('2024-11-01')
+
+        response, _ = self.open_day('2024-11-01')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(CloseFloot.objects.count(), 1)
+
+
+class CurrentGameDayResolverTests(TestCase):
+    def setUp(self):
+        game_days.invalidate()
+
+    def test_current_day_is_cached(self):
+        GameDayLive.objects.create(date=date(2024, 11, 1))
+        game_days.current_live_game_day()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(game_days.current_live_game_day().date, date(2024, 11, 1))
+
+    def test_opening_a_day_replaces_the_cached_one(self):
+        GameDayLive.objects.create(date=date(2024, 11, 1))
+        game_days.current_live_game_day()
+
+        self.client.post('/api/table/create-game-day/', {'date': '2024-11-02'}, content_type='application/json')
+
+        self.assertEqual(game_days.current_live_game_day().date, date(2024, 11, 2))
+
+    def test_deleting_the_day_forgets_it(self):
+        game_day = GameDayLive.objects.create(date=date(2024, 11, 1))
+        game_days.current_live_game_day()
+
+        game_day.delete()
+
+        with self.assertRaises(GameDayLive.DoesNotExist):
+            game_days.current_live_game_day()
+
+
+class TableEventStreamTests(TestCase):
+    url = '/api/table/events/'
+
+    def setUp(self):
+        game_days.invalidate()
+        ChipModel.objects.create(denomination=5)
+        self.game_day = GameDayLive.objects.create(date=date(2024, 11, 1))
+        self.table = Table.objects.create(name='T1', open_flot={'5': 10}, open_flot_total=50.0)
+        CloseFloot.objects.create(table=self.table, game_day=self.game_day, open_flot={'5': 10}, open_flot_total=50.0)
+        TableResult.objects.create(table=self.table, game_day=self.game_day)
+
+    def close_table(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/table/close-table/', {
+                'table_id': self.table.id,
+                'game_day': self.game_day.id,
+                'close_flot': {'5': 12},
+            }, content_type='application/json')
+
+    async def test_streams_table_closes_for_the_current_day(self):
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = response.streaming_content
+
+        ready = (await anext(stream)).decode()
+        self.assertIn('event: ready', ready)
+
+        self.assertEqual((await sync_to_async(self.close_table)()).status_code, 201)
+        closed = (await asyncio.wait_for(anext(stream), 5)).decode()
+        await stream.aclose()
+
+        self.assertTrue(closed.startswith('event: table.closed'))
+        payload = json.loads(closed.split('data: ', 1)[1])
+        self.assertEqual((payload['table'], payload['game_day']), (self.table.id, self.game_day.id))
+        self.assertEqual((payload['close_flot_total'], payload['result']), (60.0, 10.0))
+
+    async def test_unknown_game_day(self):
+        response = await self.async_client.get(self.url, {'game_day': 999})
+
+        self.assertEqual(response.status_code, 404)
+
+    async def test_slow_subscriber_is_told_to_resync(self):
+        broker = events.InProcessBroker()
+        async with broker.subscribe('live:1') as subscription:
+            for index in range(events.SUBSCRIBER_QUEUE_SIZE + 1):
+                broker.publish('live:1', {'type': 'fill_credit.posted', 'index': index})
+            await asyncio.sleep(0)
+
+            self.assertEqual(await subscription.get(timeout=1), events.RESYNC)
+            self.assertIsNone(await subscription.get(timeout=0.01))
+        self.assertEqual(broker.subscriber_count('live:1'), 0)
+
+
+
+class ReconciliationTests(TestCase):
+    url = '/api/table/reconcile/'
+
+    def setUp(self):
+        ChipModel.objects.bulk_create([ChipModel(denomination=value) for value in (0.1, 2.5, 5, 100)])
+        chip_catalog.invalidate()  # bulk_create sends no signals
+        self.game_day = GameDayLive.objects.create(date=date(2024, 11, 1))
+        self.table = Table.objects.create(name='T1', open_flot={'5': 10}, open_flot_total=50.0)
+        self.close_floot = CloseFloot.objects.create(table=self.table, game_day=self.game_day,
+                                                     open_flot={'5': 10}, open_flot_total=50.0)
+        Plaque.objects.create(table=self.table, game_day=self.game_day)
+        self.table_result = TableResult.objects.create(table=self.table, game_day=self.game_day)
+
+    def play_day(self):
+        for amount in (-20, 35):
+            response = self.client.post('/api/transactions/fill-credit/', {
+                'table': self.table.id, 'game_day': self.game_day.id, 'fill_credit': amount,
+            }, content_type='application/json')
+            self.assertEqual(response.status_code, 201)
+        self.client.post('/api/table/close-table/', {
+            'table_id': self.table.id, 'game_day': self.game_day.id, 'close_flot': {'5': 12},
+        }, content_type='application/json')
+        self.client.post('/api/table/plaque/', {
+            'table_id': self.table.id, 'game_day': self.game_day.id, 'plaques': {'100': 1},
+        }, content_type='application/json')
+
+    def test_totals_kept_by_the_write_paths_have_no_drift(self):
+        self.play_day()
+
+        response = self.client.post(self.url, {'game_day': self.game_day.id}, content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['drift_count'], 0)
+        self.close_floot.refresh_from_db()
+        self.table_result.refresh_from_db()
+        self.assertEqual((self.close_floot.total_fill, self.close_floot.total_credit, self.close_floot.result),
+                         (-20.0, 35.0, 25.0))
+        self.assertEqual(self.table_result.result, 125.0)
+
+    def test_fractional_denominations_total_exactly(self):
+        self.client.post('/api/table/close-table/', {
+            'table_id': self.table.id, 'game_day': self.game_day.id, 'close_flot': {'0.1': 7, '2.5': 3, '5': 10},
+        }, content_type='application/json')
+
+        self.close_floot.refresh_from_db()
+        self.assertEqual((self.close_floot.close_flot_total, self.close_floot.result),
+                         (Decimal('58.20'), Decimal('8.20')))
+
+    def test_close_flot_must_use_catalog_denominations(self):
+        response = self.client.post('/api/table/close-table/', {
+            'table_id': self.table.id, 'game_day': self.game_day.id, 'close_flot': {'5': 10, '7': 1},
+        }, content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'message': 'Unknown chip denomination: 7.'})
+        self.close_floot.refresh_from_db()
+        self.assertTrue(self.close_floot.status)
+
+    def test_a_failed_close_writes_nothing(self):
+        self.table_result.delete()
+
+        response = self.client.post('/api/table/close-table/', {
+            'table_id': self.table.id, 'game_day': self.game_day.id, 'close_flot': {'5': 12},
+        }, content_type='application/json')
+
+        self.assertEqual(response.status_code, 400)
+        self.close_floot.refresh_from_db()
+        self.assertEqual((self.close_floot.status, self.close_floot.close_flot), (True, {}))
+        self.assertFalse(self.close_floot.close_flot_lines.exists())
+
+    def test_close_update_keeps_a_fill_posted_after_the_row_was_read(self):
+        self.play_day()
+        stale = CloseFloot.objects.get(pk=self.close_floot.pk)
+        self.client.post('/api/transactions/fill-credit/', {
+            'table': self.table.id, 'game_day': self.game_day.id, 'fill_credit': -5,
+        }, content_type='application/json')
+
+        serializer = CloseFlootSerializer(stale, data={'close_flot': {'5': 12}}, partial=True)
+        self.assertTrue(serializer.is_valid())
+        serializer.save()
+
+        self.close_floot.refresh_from_db()
+        self.table_result.refresh_from_db()
+        self.assertEqual((self.close_floot.total_fill, self.close_floot.result), (-25, 20))
+        self.assertEqual(self.table_result.result, 120)
+        self.assertEqual(self.client.post(self.url, {}, content_type='application/json').data['drift_count'], 0)
+
+    def test_fixes_and_reports_drifted_rows(self):
+        self.play_day()
+        CloseFloot.objects.filter(pk=self.close_floot.pk).update(total_fill=0.0)
+        TableResult.objects.filter(pk=self.table_result.pk).update(result=90.0)
+        version = GameDayLive.objects.get(pk=self.game_day.pk).version
+
+        response = self.client.post(self.url, {'fix': True}, content_type='application/json')
+
+        drift = {row['field']: (row['stored'], row['expected']) for row in response.data['game_days'][0]['drift']}
+        self.assertEqual(drift, {'close_floot.total_fill': (0.0, -20.0), 'table_result.result': (90.0, 125.0)})
+        self.close_floot.refresh_from_db()
+        self.table_result.refresh_from_db()
+        self.assertEqual((self.close_floot.total_fill, self.table_result.result), (-20.0, 125.0))
+        self.assertEqual(GameDayLive.objects.get(pk=self.game_day.pk).version, version + 1)
+
+        # Nothing was written since: the next incremental run has no day to check
+        self.assertEqual(self.client.post(self.url, {}, content_type='application/json').data['game_days'], [])
+
+    def test_only_reports_by_default(self):
+        TableResult.objects.filter(pk=self.table_result.pk).update(result=10.0)
+
+        response = self.client.post(self.url, {}, content_type='application/json')
+
+        self.assertEqual(response.data['drift_count'], 1)
+        self.table_result.refresh_from_db()
+        self.assertEqual(self.table_result.result, 10.0)
+        self.assertIsNone(ReconciledGameDay.objects.get(game_day=self.game_day).fixed_version)
+
+    def test_report_only_runs_are_incremental(self):
+        self.assertEqual(len(self.client.post(self.url, {}, content_type='application/json').data['game_days']), 1)
+        self.assertEqual(self.client.post(self.url, {}, content_type='application/json').data['game_days'], [])
+
+        # A report-only run does not count as a fix
+        self.assertEqual(list(reconciliation.pending_game_days(fix=True)), [self.game_day])
+
+        self.play_day()
+        self.assertEqual(len(self.client.post(self.url, {}, content_type='application/json').data['game_days']), 1)
+
+    def test_days_written_since_the_last_run_are_checked_again(self):
+        other_day = GameDayLive.objects.create(date=date(2024, 11, 2))
+        call_command('reconcile_tables', '--fix', stdout=io.StringIO())
+
+        self.play_day()
+        out = io.StringIO()
+        call_command('reconcile_tables', '--fix', stdout=out)
+
+        self.assertIn("Reconciled 1 game days, fixed 0 drifted values.", out.getvalue())
+        self.assertEqual(list(reconciliation.pending_game_days(fix=True)), [])
+        self.assertEqual(ReconciledGameDay.objects.get(game_day=other_day).fixed_version, other_day.version)
+
+    def test_editing_the_table_keeps_past_days(self):
+        self.play_day()
+        self.client.put(f'/api/table/delete/{self.table.id}/', {'name': 'T1', 'open_flot': {'5': 20}},
+                        content_type='application/json')
+        self.assertEqual(Table.objects.get(pk=self.table.pk).open_flot_total, 100)
+
+        response = self.client.post(self.url, {'fix': True}, content_type='application/json')
+
+        self.assertEqual(response.data['drift_count'], 0)
+        self.close_floot.refresh_from_db()
+        self.assertEqual((self.close_floot.open_flot_total, self.close_floot.result), (50, 25))
+
+    def test_unknown_game_day(self):
+        response = self.client.post(self.url, {'game_day': 999}, content_type='application/json')
+
+        self.assertEqual(response.status_code, 404)
+
+
+class ChipLineTests(TestCase):
+    def setUp(self):
+        self.chips = {value: ChipModel.objects.create(denomination=value) for value in (5, 25, 100)}
+        self.hall = Hall.objects.create(name='Main')
+
+    def lines(self, queryset):
+        return {(line.chip.denomination, line.quantity) for line in queryset.select_related('chip')}
+
+    def test_writes_keep_the_lines_in_sync(self):
+        response = self.client.post('/api/table/create/', {
+            'name': 'T1', 'open_flot': {'5': 10, '25': 4},
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        table = Table.objects.get(name='T1')
+        self.client.put(f'/api/table/add-to-hall/{table.id}/{self.hall.id}/')
+        self.assertEqual(self.lines(table.open_flot_lines.all()), {(5.0, 10), (25.0, 4)})
+
+        self.client.post('/api/table/create-game-day/', {'date': '2024-11-01'}, content_type='application/json')
+        close_floot = CloseFloot.objects.get(table=table)
+        self.assertEqual(self.lines(close_floot.close_flot_lines.all()), {(5.0, 10), (25.0, 4)})
+
+        for close_flot in ({'5': 12, '25': 0, '100': 1}, {'25': 2}):
+            if close_floot.status:
+                self.client.post('/api/table/close-table/', {
+                    'table_id': table.id, 'game_day': close_floot.game_day_id, 'close_flot': close_flot,
+                }, content_type='application/json')
+            else:
+                self.client.put(f'/api/table/close-table/{close_floot.id}/', {'close_flot': close_flot},
+                                content_type='application/json')
+            close_floot.refresh_from_db()
+        self.assertEqual(self.lines(close_floot.close_flot_lines.all()), {(25.0, 2)})
+
+        self.client.post('/api/table/plaque/', {
+            'table_id': table.id, 'game_day': close_floot.game_day_id, 'plaques': {'100': 3},
+        }, content_type='application/json')
+        self.assertEqual(self.lines(Plaque.objects.get(table=table).plaque_lines.all()), {(100.0, 3)})
+
+    def test_used_chips_cannot_be_deleted(self):
+        table = Table.objects.create(name='T1', hall=self.hall)
+        OpenFlotLine.objects.replace(table, {'25': 1})
+
+        response = self.client.delete(f'/api/chip/{self.chips[25].id}/')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(ChipModel.objects.filter(pk=self.chips[25].pk).exists())
+
+    def test_migration_backfills_catalog_denominations(self):
+        backfill = importlib.import_module('game_table.migrations.0018_chip_lines').backfill_chip_lines
+        table = Table.objects.create(name='T1', hall=self.hall,
+                                     open_flot={'5': 2, '5.0': 1, '7': 3, '25': -1, '100': 'x'})
+
+        backfill(django_apps, None)
 
-# Create your tests here.
+        self.assertEqual(self.lines(table.open_flot_lines.all()), {(5.0, 3)})
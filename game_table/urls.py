@@ -7,10 +7,15 @@ from .views import (
     HallListCreate,
     AddTableToHall,
     RemoveTableFromHall,
+    MoveTablesToHall,
     CreateGameDayView,
+    ReconcileTablesView,
     GameDayListView,
     PlaqueCreateView,
     PlaqueRetrieveUpdateDestroy,
+    TableEventStreamView,
+    AsyncHallListView,
+    AsyncGameDayListView,
 )
 
 urlpatterns = [
@@ -23,6 +28,11 @@ urlpatterns = [
     path('hall/', HallListCreate.as_view(), name='hall-list-create'),
     path('add-to-hall/<int:table_id>/<int:hall_id>/', AddTableToHall.as_view(), name='add-table-to-hall'),
     path('remove-from-hall/<int:pk>/', RemoveTableFromHall.as_view(), name='remove-table-from-hall'),
+    path('move-to-hall/', MoveTablesToHall.as_view(), name='move-tables-to-hall'),
     path('create-game-day/', CreateGameDayView.as_view(), name='create-game-day'),
+    path('reconcile/', ReconcileTablesView.as_view(), name='reconcile-tables'),
     path('game-day/', GameDayListView.as_view(), name='game-day-list'),
+    path('events/', TableEventStreamView.as_view(), name='table-events'),
+    path('async/hall/', AsyncHallListView.as_view(), name='hall-list-async'),
+    path('async/game-day/', AsyncGameDayListView.as_view(), name='game-day-list-async'),
 ]
@@ -2,11 +2,24 @@ from rest_framework import status, viewsets, generics, mixins
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.exceptions import NotFound
-from .models import Table, CloseFloot, Hall, GameDayLive, Plaque, TableResult
+from rest_framework.utils.encoders import JSONEncoder
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Prefetch
+from django.http import JsonResponse
+from django.views import View
+from .models import Table, CloseFloot, Hall, GameDayLive, Plaque, TableResult, OpenFlotLine, CloseFlotLine
 from .serializers import TableSerializer, CloseFlootSerializer, HallSerializer, GameDayLiveSerializer, PlaqueSerializer, TableResultSerializer, TableResultSerializer
 from rest_framework.status import HTTP_404_NOT_FOUND, HTTP_200_OK, HTTP_201_CREATED
 from django.utils.dateparse import parse_date
 from django.utils.timezone import datetime
+from django_rest import events, game_days, response_cache
+from django_rest.game_days import current_live_game_day
+from . import reconciliation
+
+
+# Rows per INSERT when opening a game day for every live table.
+GAME_DAY_BATCH_SIZE = 500
 
 
 class TableListCreate(generics.ListCreateAPIView):
@@ -72,6 +85,37 @@ class RemoveTableFromHall(generics.UpdateAPIView):
         return Response({"message": "Table has been removed from Hall."}, status=status.HTTP_200_OK)
 
 
+class MoveTablesToHall(APIView):
+    """
+    Moves many tables at once: ``{"tables": [ids], "hall": id or null}``,
+    with a single UPDATE. Reports how many tables actually changed hall.
+    """
+    def put(self, request, *args, **kwargs):
+        table_ids = request.data.get('tables')
+        if not isinstance(table_ids, list) or not table_ids or not all(
+                isinstance(table_id, int) and not isinstance(table_id, bool) for table_id in table_ids):
+            return Response({"message": "tables must be a non-empty list of table ids."}, status=status.HTTP_400_BAD_REQUEST)
+
+        hall_id = request.data.get('hall')
+        if hall_id is not None and (not isinstance(hall_id, int) or isinstance(hall_id, bool)):
+            return Response({"message": "hall must be a hall id or null."}, status=status.HTTP_400_BAD_REQUEST)
+        if hall_id is not None and not Hall.objects.filter(pk=hall_id).exists():
+            return Response({"message": "Hall does not exist."}, status=status.HTTP_404_NOT_FOUND)
+
+        table_ids = set(table_ids)
+        missing = table_ids - set(Table.objects.filter(id__in=table_ids).values_list('id', flat=True))
+        if missing:
+            return Response({"message": "Table does not exist.", "missing": sorted(missing)}, status=status.HTTP_404_NOT_FOUND)
+
+        with transaction.atomic():
+            updated = Table.objects.filter(id__in=table_ids).exclude(hall_id=hall_id).update(hall_id=hall_id)
+            if updated:
+                # update() sends no signals
+                response_cache.bump_on_write(response_cache.LIVE_FLOOR)
+
+        return Response({"message": "Tables have been moved.", "updated": updated}, status=status.HTTP_200_OK)
+
+
 class HallListCreate(APIView):
     def get(self, request):
         date_str = request.query_params.get('date')
@@ -82,30 +126,57 @@ class HallListCreate(APIView):
                 game_day = GameDayLive.objects.get(date=date_str)
                 if not game_day:
                     return Response({"message": "Game Day does not exist."}, status=status.HTTP_404_NOT_FOUND)
-            except GameDayLive.DoesNotExist:
+            except (GameDayLive.DoesNotExist, ValueError):
                 return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_404_NOT_FOUND)
         else:
-            game_day = GameDayLive.objects.latest('date')
+            try:
+                game_day = current_live_game_day()
+            except GameDayLive.DoesNotExist:
+                return Response({"message": "Game Day does not exist."}, status=status.HTTP_404_NOT_FOUND)
 
         if not game_day:
             return Response({"message": "Game Day does not exist."}, status=status.HTTP_404_NOT_FOUND)
 
-        halls = Hall.objects.prefetch_related('tables').all().order_by('name')
+        return response_cache.cached_response(
+            request, 'table-halls', [game_day.id], [response_cache.LIVE_FLOOR],
+            lambda: self.dashboard(game_day),
+            day_versions=lambda: game_days.versions(game_days.LIVE, pk=game_day.id),
+        )
+
+    def dashboard(self, game_day):
+        return self.dashboard_data(self.dashboard_halls(game_day))
+
+    @staticmethod
+    def dashboard_halls(game_day):
+        # Load the whole hall -> table -> close flot / plaque / result tree for
+        # the game day up front, so the query count does not grow with tables.
+        day_tables = Table.objects.order_by('name').prefetch_related(
+            Prefetch('closefloot_set', queryset=CloseFloot.objects.filter(game_day=game_day).order_by('id'),
+                     to_attr='day_close_flots'),
+            Prefetch('plaque_set', queryset=Plaque.objects.filter(game_day=game_day).order_by('id'),
+                     to_attr='day_plaques'),
+            Prefetch('tableresult_set', queryset=TableResult.objects.filter(game_day=game_day).order_by('id'),
+                     to_attr='day_results'),
+        )
+        return Hall.objects.prefetch_related(Prefetch('tables', queryset=day_tables)).order_by('name')
+
+    @staticmethod
+    def dashboard_data(halls):
         data = []
 
         for hall in halls:
             tables = []
-            for table in hall.tables.all().order_by('name'):
-                close_flot = table.closefloot_set.filter(game_day=game_day).first()
-                plaques = table.plaque_set.filter(game_day=game_day).first()
-                table_result = table.tableresult_set.filter(game_day=game_day).first()
+            for table in hall.tables.all():
+                close_flot = table.day_close_flots[0] if table.day_close_flots else None
+                plaques = table.day_plaques[0] if table.day_plaques else None
+                table_result = table.day_results[0] if table.day_results else None
 
                 tables.append({
                     'id': table.id,
                     'name': table.name,
                     'open_flot_total': table.open_flot_total,
                     'open_flot': table.open_flot,
-                    'status': close_flot.status,
+                    'status': close_flot.status if close_flot else None,
                     'close_flot_id': close_flot.id if close_flot else None,
                     'close_flot': close_flot.close_flot if close_flot else None,
                     'close_flot_total': close_flot.close_flot_total if close_flot else None,
@@ -128,7 +199,7 @@ class HallListCreate(APIView):
                 'tables': tables
             })
 
-        return Response(data, status=status.HTTP_200_OK)
+        return data
 
 class CloseFlootCreateView(generics.CreateAPIView):
     queryset = CloseFloot.objects.all()
@@ -221,42 +292,87 @@ class CreateGameDayView(APIView):
         if not date:
             return Response({'message': 'Date is required'}, status=status.HTTP_400_BAD_REQUEST)
 
-        game_day, created = GameDayLive.objects.get_or_create(date=date)
+        with transaction.atomic():
+            game_day, created = GameDayLive.objects.get_or_create(date=date)
 
-        if not created:
-            return Response({'message': 'GameDay already exists for this date.'}, status=status.HTTP_400_BAD_REQUEST)
+            if not created:
+                return Response({'message': 'GameDay already exists for this date.'},
+                                status=status.HTTP_400_BAD_REQUEST)
 
-        halls = Hall.objects.all()
-        for hall in halls:
-            tables = Table.objects.filter(hall=hall)
-            for table in tables:
-                open_flot = table.open_flot
-                open_flot_total = table.open_flot_total
+            tables = list(Table.objects.filter(hall__isnull=False).only('id', 'open_flot', 'open_flot_total'))
 
-                CloseFloot.objects.create(
+            close_floots = CloseFloot.objects.bulk_create([
+                CloseFloot(
                     table=table,
                     status=True,
                     game_day=game_day,
-                    close_flot=open_flot,
-                    close_flot_total=open_flot_total,
+                    close_flot=table.open_flot,
+                    close_flot_total=table.open_flot_total,
+                    open_flot=table.open_flot,
+                    open_flot_total=table.open_flot_total,
                     result=0.0
                 )
+                for table in tables
+            ], batch_size=GAME_DAY_BATCH_SIZE)
+
+            plaques = Plaque.objects.bulk_create([
+                Plaque(table=table, status=True, game_day=game_day, plaques_total=0.0, plaques={})
+                for table in tables
+            ], batch_size=GAME_DAY_BATCH_SIZE)
+
+            # The close flot starts as a copy of the open flot, lines included
+            close_floot_ids = {close_floot.table_id: close_floot.id for close_floot in close_floots}
+            CloseFlotLine.objects.bulk_create([
+                CloseFlotLine(close_floot_id=close_floot_ids[table_id], chip_id=chip_id, quantity=quantity)
+                for table_id, chip_id, quantity in OpenFlotLine.objects.filter(table_id__in=close_floot_ids)
+                .values_list('table_id', 'chip_id', 'quantity')
+            ], batch_size=GAME_DAY_BATCH_SIZE)
+
+            table_results = TableResult.objects.bulk_create([
+                TableResult(table=table, game_day=game_day, result=0.0)
+                for table in tables
+            ], batch_size=GAME_DAY_BATCH_SIZE)
+
+            # bulk_create sends no signals
+            game_days.bump_version(game_days.LIVE, game_day.id)
+
+        return Response({
+            'message': 'GameDay created and CloseFloot entries added.',
+            'game_day': game_day.id,
+            'date': str(game_day.date),
+            'tables': len(tables),
+            'close_flots_created': len(close_floots),
+            'plaques_created': len(plaques),
+            'table_results_created': len(table_results),
+        }, status=status.HTTP_201_CREATED)
+
+
+class ReconcileTablesView(APIView):
+    """
+    Recomputes the CloseFloot and TableResult totals from their source rows
+    and reports the drift. ``{"game_day": id}`` checks one day, otherwise every
+    day written since its last check (or, when fixing, its last fix) is
+    checked. Nothing is fixed unless the request asks for it with
+    ``{"fix": true}``.
+    """
+    def post(self, request, *args, **kwargs):
+        fix = request.data.get('fix', False)
+        if not isinstance(fix, bool):
+            return Response({"message": "fix must be true or false."}, status=status.HTTP_400_BAD_REQUEST)
 
-                Plaque.objects.create(
-                    table=table,
-                    status=True,
-                    game_day=game_day,
-                    plaques_total=0.0,
-                    plaques={},
-                )
-
-                TableResult.objects.create(
-                    table=table,
-                    game_day=game_day,
-                    result=0.0
-                )
+        game_day_id = request.data.get('game_day')
+        if game_day_id is None:
+            reports = reconciliation.reconcile_pending(fix=fix)
+        else:
+            if not isinstance(game_day_id, int) or isinstance(game_day_id, bool):
+                return Response({"message": "game_day must be a game day id."}, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                game_day = GameDayLive.objects.get(pk=game_day_id)
+            except GameDayLive.DoesNotExist:
+                return Response({"message": "GameDay does not exist."}, status=status.HTTP_404_NOT_FOUND)
+            reports = [reconciliation.reconcile(game_day, fix=fix)]
 
-        return Response({'message': 'GameDay created and CloseFloot entries added.'}, status=status.HTTP_201_CREATED)
+        return Response(reconciliation.summarize(reports), status=status.HTTP_200_OK)
 
 
 class GameDayListView(generics.RetrieveAPIView):
@@ -280,3 +396,61 @@ class GameDayListView(generics.RetrieveAPIView):
                 {"error": "No game day found"},
                 status=status.HTTP_404_NOT_FOUND
             )
+
+
+class AsyncHallListView(View):
+    """
+    Async variant of ``HallListCreate.get`` for ASGI workers; same payload,
+    cache entries and ETag.
+    """
+    async def get(self, request, *args, **kwargs):
+        date_str = request.GET.get('date')
+
+        if date_str:
+            try:
+                datetime.strptime(date_str, "%Y-%m-%d")
+                game_day = await GameDayLive.objects.aget(date=date_str)
+            except (GameDayLive.DoesNotExist, ValueError):
+                return JsonResponse({"error": "Invalid date format. Use YYYY-MM-DD."}, status=HTTP_404_NOT_FOUND)
+        else:
+            try:
+                game_day = await game_days.acurrent_live_game_day()
+            except GameDayLive.DoesNotExist:
+                return JsonResponse({"message": "Game Day does not exist."}, status=HTTP_404_NOT_FOUND)
+
+        async def build():
+            halls = [hall async for hall in HallListCreate.dashboard_halls(game_day)]
+            return HallListCreate.dashboard_data(halls)
+
+        return await response_cache.acached_response(
+            request, 'table-halls', [game_day.id], [response_cache.LIVE_FLOOR], build,
+            day_versions=lambda: game_days.aversions(game_days.LIVE, pk=game_day.id),
+        )
+
+
+class AsyncGameDayListView(View):
+    """Async variant of ``GameDayListView``."""
+    async def get(self, request, *args, **kwargs):
+        try:
+            game_day = await GameDayLive.objects.alatest('created_at')
+        except GameDayLive.DoesNotExist:
+            return JsonResponse({"error": "No game day found"}, status=HTTP_404_NOT_FOUND)
+        return JsonResponse(GameDayLiveSerializer(game_day).data, encoder=JSONEncoder)
+
+
+class TableEventStreamView(View):
+    """
+    Server-sent events for the live tables of a game day (``?game_day=<id>``,
+    the current day by default): closes, plaques and fill/credit postings.
+    """
+    async def get(self, request, *args, **kwargs):
+        try:
+            game_day_id = request.GET.get('game_day') or (await sync_to_async(current_live_game_day)()).id
+            game_day = await GameDayLive.objects.aget(id=game_day_id)
+        except (GameDayLive.DoesNotExist, ValueError):
+            return JsonResponse({"message": "Game Day does not exist."}, status=HTTP_404_NOT_FOUND)
+
+        return events.stream_response(
+            events.live_channel(game_day.id),
+            {'type': 'ready', 'game_day': game_day.id, 'version': game_day.version},
+        )
@@ -0,0 +1,205 @@
+"""
+Chip movements: per hall, table and denomination, how many chips were in the
+open flot, the close flot and the posted plaques of the closed table days in a
+date range. The open flot is the one each day opened with
+(``CloseFloot.open_flot``), not the table's current one.
+
+The quantities are summed inside the database by expanding the JSON maps
+with the backend's JSON table function (``json_each`` on SQLite,
+``jsonb_each`` on PostgreSQL), so only one row per (source, table,
+denomination) comes back. Other backends, or a SQLite build without JSON1,
+use a streaming fallback that reads the maps with ``iterator()`` and sums
+them as it goes.
+
+Only numeric quantities are counted, and keys are folded to their canonical
+spelling (``'5.0'`` and ``'5'`` are the same denomination).
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection
+
+from chip import counts as chip_counts
+from game_table.models import CloseFloot, GameDayLive, Hall, Plaque, Table
+
+CHUNK_SIZE = 2000
+
+SOURCES = ('open', 'close', 'plaques')
+
+# Per vendor: the JSON table function, the summed value, and the numeric-value test
+JSON_EACH = {
+    'sqlite': ("json_each({column}) AS j", "j.value", "j.type IN ('integer', 'real')"),
+    'postgresql': ("jsonb_each({column}) AS j", "(j.value)::numeric", "jsonb_typeof(j.value) = 'number'"),
+}
+
+
+def supports_sql():
+    if connection.vendor == 'sqlite':
+        return connection.features.supports_json_field
+    return connection.vendor in JSON_EACH
+
+
+def _filters(start_date, end_date, hall, day_alias, table_alias):
+    clauses, params = [], []
+    if start_date:
+        clauses.append(f'{day_alias}.date >= %s')
+        params.append(start_date)
+    if end_date:
+        clauses.append(f'{day_alias}.date <= %s')
+        params.append(end_date)
+    if hall is not None:
+        clauses.append(f'{table_alias}.hall_id = %s')
+        params.append(hall)
+    return clauses, params
+
+
+def _sql(start_date, end_date, hall):
+    each, value, numeric = JSON_EACH[connection.vendor]
+    tables = {
+        'table': Table._meta.db_table,
+        'hall': Hall._meta.db_table,
+        'day': GameDayLive._meta.db_table,
+        'close': CloseFloot._meta.db_table,
+        'plaque': Plaque._meta.db_table,
+    }
+
+    selects, params = [], []
+    for source, owner, column in (
+        ('open', 'close', 'o.open_flot'),
+        ('close', 'close', 'o.close_flot'),
+        ('plaques', 'plaque', 'o.plaques'),
+    ):
+        clauses, filter_params = _filters(start_date, end_date, hall, 'd', 't')
+        where = ' AND '.join(['o.status = %s', numeric, *clauses])
+        selects.append(
+            f"SELECT '{source}' AS source, o.table_id AS table_id, j.key AS denomination, {value} AS quantity "
+            f"FROM {tables[owner]} o "
+            f"JOIN {tables['table']} t ON t.id = o.table_id "
+            f"JOIN {tables['day']} d ON d.id = o.game_day_id "
+            f"CROSS JOIN {each.format(column=column)} "
+            f"WHERE {where}"
+        )
+        params += [False, *filter_params]
+
+    sql = (
+        "SELECT m.source, t.hall_id, h.name, m.table_id, t.name, m.denomination, SUM(m.quantity) "
+        f"FROM ({' UNION ALL '.join(selects)}) m "
+        f"JOIN {tables['table']} t ON t.id = m.table_id "
+        f"LEFT JOIN {tables['hall']} h ON h.id = t.hall_id "
+        "GROUP BY m.source, t.hall_id, h.name, m.table_id, t.name, m.denomination"
+    )
+    return sql, params
+
+
+def sql_rows(start_date=None, end_date=None, hall=None):
+    """``(source, hall id, hall, table id, table, denomination, quantity)`` summed in SQL."""
+    sql, params = _sql(start_date, end_date, hall)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        yield from cursor
+
+
+def streamed_rows(start_date=None, end_date=None, hall=None):
+    """The rows of ``sql_rows()``, summed in Python over streamed JSON maps."""
+    filters = {'status': False}
+    if start_date:
+        filters['game_day__date__gte'] = start_date
+    if end_date:
+        filters['game_day__date__lte'] = end_date
+    if hall is not None:
+        filters['table__hall'] = hall
+    owner = ('table__hall_id', 'table__hall__name', 'table_id', 'table__name')
+
+    totals = defaultdict(int)
+    close_floots = CloseFloot.objects.filter(**filters).values_list(*owner, 'open_flot', 'close_flot')
+    for *table, open_flot, close_flot in close_floots.iterator(chunk_size=CHUNK_SIZE):
+        _add(totals, 'open', table, open_flot)
+        _add(totals, 'close', table, close_flot)
+    plaques = Plaque.objects.filter(**filters).values_list(*owner, 'plaques')
+    for *table, chip_counts_map in plaques.iterator(chunk_size=CHUNK_SIZE):
+        _add(totals, 'plaques', table, chip_counts_map)
+
+    for (source, *table, denomination), quantity in totals.items():
+        yield (source, *table, denomination, quantity)
+
+
+def _add(totals, source, table, counts):
+    if not isinstance(counts, dict):
+        return
+    for denomination, quantity in counts.items():
+        if isinstance(quantity, (int, float)) and not isinstance(quantity, bool):
+            totals[(source, *table, denomination)] += quantity
+
+
+def _quantity(value):
+    if isinstance(value, (float, Decimal)) and value == int(value):
+        return int(value)
+    return value
+
+
+def _denomination(key):
+    try:
+        return chip_counts.label(key)
+    except chip_counts.ChipCountError:
+        return str(key)
+
+
+def _sort_key(denomination):
+    try:
+        return 0, float(denomination)
+    except ValueError:
+        return 1, denomination
+
+
+def _sorted(movements):
+    result = {}
+    for denomination in sorted(movements, key=_sort_key):
+        quantities = {source: movements[denomination][source] for source in SOURCES}
+        quantities['change'] = quantities['close'] - quantities['open']
+        result[denomination] = quantities
+    return result
+
+
+def chip_movements(start_date=None, end_date=None, hall=None, use_sql=None):
+    """
+    Per-denomination ``open``/``close``/``plaques`` quantities and the
+    ``change`` (close - open), for the whole range, each hall and each table.
+    """
+    if use_sql is None:
+        use_sql = supports_sql()
+    rows = (sql_rows if use_sql else streamed_rows)(start_date, end_date, hall)
+
+    overall = defaultdict(lambda: defaultdict(int))
+    halls = {}
+    for source, hall_id, hall_name, table_id, table_name, denomination, quantity in rows:
+        denomination, quantity = _denomination(denomination), _quantity(quantity)
+        hall_entry = halls.setdefault(hall_id, {
+            'hall': hall_id, 'hall_name': hall_name, 'totals': defaultdict(lambda: defaultdict(int)), 'tables': {},
+        })
+        table_entry = hall_entry['tables'].setdefault(table_id, {
+            'table': table_id, 'table_name': table_name, 'totals': defaultdict(lambda: defaultdict(int)),
+        })
+        for totals in (overall, hall_entry['totals'], table_entry['totals']):
+            totals[denomination][source] += quantity
+
+    return {
+        'start_date': start_date,
+        'end_date': end_date,
+        'denominations': _sorted(overall),
+        'halls': [
+            {
+                'hall': hall_entry['hall'],
+                'hall_name': hall_entry['hall_name'],
+                'denominations': _sorted(hall_entry['totals']),
+                'tables': [
+                    {
+                        'table': table_entry['table'],
+                        'table_name': table_entry['table_name'],
+                        'denominations': _sorted(table_entry['totals']),
+                    }
+                    for table_entry in sorted(hall_entry['tables'].values(), key=lambda entry: entry['table_name'])
+                ],
+            }
+            for hall_entry in sorted(halls.values(), key=lambda entry: (entry['hall_name'] is None, entry['hall_name'] or ''))
+        ],
+    }
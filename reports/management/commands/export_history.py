@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from reports import exports
+
+
+class Command(BaseCommand):
+    help = "Stream game-day history as CSV or NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(exports.EXPORTS))
+        parser.add_argument('--format', choices=sorted(exports.FORMATS), default='csv')
+        parser.add_argument('--start-date', help="First game day to export (YYYY-MM-DD).")
+        parser.add_argument('--end-date', help="Last game day to export (YYYY-MM-DD).")
+        parser.add_argument('--hall', type=int, help="Only export this hall id.")
+        parser.add_argument('--output', help="File to write; standard output by default.")
+
+    def handle(self, *args, **options):
+        start_date = self.parse(options['start_date'], '--start-date')
+        end_date = self.parse(options['end_date'], '--end-date')
+        lines = exports.lines(exports.EXPORTS[options['dataset']], options['format'],
+                              start_date, end_date, options['hall'])
+
+        if not options['output']:
+            self.write(self.stdout, lines)
+            return
+
+        with open(options['output'], 'w', newline='', encoding='utf-8') as output:
+            written = self.write(output, lines)
+        self.stderr.write(self.style.SUCCESS(f"Exported {written} lines to {options['output']}."))
+
+    def write(self, output, lines):
+        written = 0
+        for line in lines:
+            output.write(line)
+            written += 1
+        return written
+
+    def parse(self, value, option):
+        if value is None:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f"{option} must be a date in YYYY-MM-DD format.")
+        return parsed
@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+import os
+import tempfile
+from datetime import date
+
+from asgiref.sync import async_to_sync
+from django.core.management import call_command
+from django.test import TestCase
+
+from . import chip_movements
+
+from game_table.models import CloseFloot, GameDayLive, Hall, Plaque, Table
+from slot_machine.models import DailyAmount, GameDay, SlotMachine
+from slot_machine.models import Hall as SlotHall
+
+
+class ExportTests(TestCase):
+    url = '/api/reports/export/'
+
+    def setUp(self):
+        self.main, self.vip = Hall.objects.create(name='Main'), Hall.objects.create(name='VIP')
+        self.days = [GameDayLive.objects.create(date=date(2024, 11, day)) for day in (1, 2, 3)]
+        for hall in (self.main, self.vip):
+            table = Table.objects.create(name=f'{hall.name} T1', hall=hall)
+            for game_day in self.days:
+                CloseFloot.objects.create(table=table, game_day=game_day, close_flot={'5': 2}, result=10)
+
+    def read_csv(self, response):
+        return list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+
+    def test_csv_is_streamed_and_filtered_by_range_and_hall(self):
+        response = self.client.get(f'{self.url}close-floots/', {
+            'start_date': '2024-11-02', 'end_date': '2024-11-03', 'hall': self.vip.id,
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('close-floots_2024-11-02_2024-11-03.csv', response['Content-Disposition'])
+        rows = self.read_csv(response)
+        self.assertEqual([(row['date'], row['hall']) for row in rows], [('2024-11-02', 'VIP'), ('2024-11-03', 'VIP')])
+        self.assertEqual(json.loads(rows[0]['close_flot']), {'5': 2})
+
+    def test_ndjson_slot_amounts(self):
+        slot_machine = SlotMachine.objects.create(name='7', brand='EGT', hall=SlotHall.objects.create(name='Slots'))
+        DailyAmount.objects.create(slot_machine=slot_machine, game_day=GameDay.objects.create(date=date(2024, 11, 1)),
+                                   amount='12.50')
+
+        response = self.client.get(f'{self.url}daily-amounts/', {'format': 'ndjson'})
+
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['amount'] for line in lines], ['12.50'])
+        self.assertEqual(json.loads(lines[0])['hall'], 'Slots')
+
+    def test_asgi_requests_get_an_async_stream(self):
+        async def export():
+            response = await self.async_client.get(f'{self.url}close-floots/')
+            return b''.join([chunk async for chunk in response.streaming_content])
+
+        content = async_to_sync(export)().decode()
+
+        self.assertEqual(len(content.splitlines()), 1 + 6)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get(f'{self.url}tables/').status_code, 404)
+        self.assertEqual(self.client.get(f'{self.url}plaques/', {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(f'{self.url}plaques/', {'start_date': '2024-02-30'}).status_code, 400)
+        self.assertEqual(self.client.get(f'{self.url}plaques/', {'hall': 'main'}).status_code, 400)
+
+    def test_command_writes_the_export(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'close-floots.csv')
+            call_command('export_history', 'close-floots', '--hall', str(self.main.id), '--output', path,
+                         stderr=io.StringIO())
+            with open(path, newline='') as output:
+                rows = list(csv.DictReader(output))
+
+        self.assertEqual([row['date'] for row in rows], ['2024-11-01', '2024-11-02', '2024-11-03'])
+
+
+class ChipMovementsTests(TestCase):
+    url = '/api/reports/chip-movements/'
+
+    def setUp(self):
+        self.main, self.vip = Hall.objects.create(name='Main'), Hall.objects.create(name='VIP')
+        self.days = [GameDayLive.objects.create(date=date(2024, 11, day)) for day in (1, 2, 3)]
+        self.t1 = Table.objects.create(name='T1', hall=self.main, open_flot={'5': 10, '25': 4})
+        self.t2 = Table.objects.create(name='T2', hall=self.vip, open_flot={'100': 2})
+        for game_day in self.days:
+            CloseFloot.objects.create(table=self.t1, game_day=game_day, status=False, open_flot=self.t1.open_flot,
+                                      close_flot={'5.0': 12, '25': 3, 'note': 'x'})
+            Plaque.objects.create(table=self.t1, game_day=game_day, status=False, plaques={'500': 1})
+        CloseFloot.objects.create(table=self.t2, game_day=self.days[0], status=False, open_flot=self.t2.open_flot,
+                                  close_flot={'100': 1})
+        # Still open: neither counted
+        CloseFloot.objects.create(table=self.t2, game_day=self.days[1], close_flot={'100': 9})
+        Plaque.objects.create(table=self.t2, game_day=self.days[1], plaques={'500': 9})
+
+    def test_totals_per_hall_table_and_denomination(self):
+        response = self.client.get(self.url, {'start_date': '2024-11-01', 'end_date': '2024-11-02'})
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['denominations']['5'], {'open': 20, 'close': 24, 'plaques': 0, 'change': 4})
+        self.assertEqual(data['denominations']['500'], {'open': 0, 'close': 0, 'plaques': 2, 'change': 0})
+        self.assertEqual([hall['hall_name'] for hall in data['halls']], ['Main', 'VIP'])
+        vip_table = data['halls'][1]['tables'][0]
+        self.assertEqual((vip_table['table_name'], vip_table['denominations']),
+                         ('T2', {'100': {'open': 2, 'close': 1, 'plaques': 0, 'change': -1}}))
+        self.assertEqual(list(data['halls'][0]['denominations']), ['5', '25', '500'])
+
+    def test_open_counts_are_the_days_own(self):
+        before = self.client.get(self.url).json()
+        Table.objects.filter(pk=self.t1.pk).update(open_flot={'5': 99})
+
+        for use_sql in (True, False):
+            self.assertEqual(chip_movements.chip_movements(use_sql=use_sql)['denominations'], before['denominations'])
+
+    def test_sql_and_streaming_paths_agree(self):
+        self.assertTrue(chip_movements.supports_sql())
+
+        for filters in ({}, {'hall': self.vip.id}, {'start_date': date(2024, 11, 3)}):
+            with self.assertNumQueries(1):
+                in_sql = chip_movements.chip_movements(**filters, use_sql=True)
+            self.assertEqual(in_sql, chip_movements.chip_movements(**filters, use_sql=False))
+
+    def test_bad_filters(self):
+        self.assertEqual(self.client.get(self.url, {'end_date': '2024-13-01'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'hall': 'vip'}).status_code, 400)
@@ -0,0 +1,7 @@
+from django.urls import path
+from .views import ChipMovementsView, ExportView
+
+urlpatterns = [
+    path('export/<slug:dataset>/', ExportView.as_view(), name='export'),
+    path('chip-movements/', ChipMovementsView.as_view(), name='chip-movements'),
+]
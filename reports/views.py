@@ -0,0 +1,79 @@
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_date
+from django.views import View
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import chip_movements, exports
+
+
+def parse_filters(params):
+    """
+    ``(start_date, end_date, hall)`` from the query parameters; raises
+    ValueError with a message for the client on bad input.
+    """
+    dates = []
+    for name in ('start_date', 'end_date'):
+        value = params.get(name)
+        try:
+            parsed = parse_date(value) if value else None
+        except ValueError:
+            parsed = None
+        if value and parsed is None:
+            raise ValueError("Invalid date format. Use YYYY-MM-DD.")
+        dates.append(parsed)
+
+    hall = params.get('hall')
+    if hall:
+        try:
+            hall = int(hall)
+        except ValueError:
+            raise ValueError("Hall must be an integer id.")
+    return dates[0], dates[1], hall or None
+
+
+class ExportView(View):
+    """
+    Streams an export (``close-floots``, ``plaques``, ``fill-credits`` or
+    ``daily-amounts``) as ``?format=csv`` (default) or ``ndjson``, optionally
+    filtered by ``start_date``, ``end_date`` and ``hall``.
+    """
+    def get(self, request, dataset):
+        export = exports.EXPORTS.get(dataset)
+        if export is None:
+            return JsonResponse({"error": "Unknown export."}, status=status.HTTP_404_NOT_FOUND)
+
+        file_format = request.GET.get('format', 'csv')
+        if file_format not in exports.FORMATS:
+            return JsonResponse({"error": "Format must be csv or ndjson."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            start_date, end_date, hall = parse_filters(request.GET)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        content = exports.lines(export, file_format, start_date, end_date, hall)
+        if isinstance(request, ASGIRequest):
+            content = exports.aiterate(content)
+
+        filename = '_'.join([dataset, *(str(day) for day in (start_date, end_date) if day)])
+        response = StreamingHttpResponse(content, content_type=exports.FORMATS[file_format])
+        response['Content-Disposition'] = f'attachment; filename="{filename}.{file_format}"'
+        return response
+
+
+class ChipMovementsView(APIView):
+    """
+    Per-hall, per-table and per-denomination chip quantities of the open
+    flot, close flot and plaques, optionally filtered by ``start_date``,
+    ``end_date`` and ``hall``.
+    """
+    def get(self, request):
+        try:
+            start_date, end_date, hall = parse_filters(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(chip_movements.chip_movements(start_date, end_date, hall), status=status.HTTP_200_OK)
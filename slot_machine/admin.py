@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import SlotMachine, Hall, GameDay, DailyAmount
+from .models import SlotMachine, Hall, GameDay, DailyAmount, HallDailySummary
 
 # Register your models here.
 
@@ -8,4 +8,4 @@ admin.site.register(SlotMachine)
 admin.site.register(Hall)
 admin.site.register(GameDay)
 admin.site.register(DailyAmount)
-
+admin.site.register(HallDailySummary)
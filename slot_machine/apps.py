@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SlotMachineConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'slot_machine'
+
+    def ready(self):
+        from . import signals  # noqa: F401
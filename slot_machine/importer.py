@@ -0,0 +1,196 @@
+"""
+Bulk import of historical DailyAmount readings from CSV or NDJSON.
+
+Each record names a slot machine, a game day date and an amount::
+
+    slot_machine,date,amount
+    A-17,2023-04-01,1520.00
+
+    {"slot_machine": "A-17", "date": "2023-04-01", "amount": "1520.00"}
+
+Machine names and dates are resolved through in-memory maps loaded once, and
+the readings are written with ``bulk_create`` one transaction per chunk, so a
+failed chunk never leaves half its rows behind. An existing reading for the
+same (machine, day) is overwritten, or kept with ``overwrite=False`` and
+counted as ``skipped``. Records that cannot be resolved are reported as
+errors, not fatal. Input must be UTF-8.
+"""
+import codecs
+import csv
+import json
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils.dateparse import parse_date
+
+from django_rest import response_cache
+from .models import DailyAmount, GameDay, HallDailySummary, SlotMachine
+
+CHUNK_SIZE = 1000
+
+# Errors kept in the report; the rest are only counted
+MAX_REPORTED_ERRORS = 100
+
+FORMATS = ('csv', 'ndjson')
+
+
+def read_records(lines, file_format):
+    """``(line number, record dict)`` pairs from an iterable of text lines."""
+    if file_format == 'csv':
+        reader = csv.DictReader(lines)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_number, line in enumerate(lines, start=1):
+        if line.strip():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            yield line_number, record if isinstance(record, dict) else None
+
+
+def is_utf8(chunks):
+    """Whether the byte chunks decode as UTF-8 (a BOM allowed), checked before anything is written."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    try:
+        for chunk in chunks:
+            decoder.decode(chunk)
+        decoder.decode(b'', final=True)
+    except UnicodeDecodeError:
+        return False
+    return True
+
+
+def format_for(filename, default=None):
+    """``csv``/``ndjson`` from a file name, or ``default`` when it says neither."""
+    suffix = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if suffix in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    if suffix == 'csv':
+        return 'csv'
+    return default
+
+
+class DailyAmountImport:
+    def __init__(self, chunk_size=CHUNK_SIZE, overwrite=True, create_game_days=False):
+        self.chunk_size = chunk_size
+        self.overwrite = overwrite
+        self.create_game_days = create_game_days
+        self.slot_machines = dict(SlotMachine.objects.values_list('name', 'id'))
+        self.game_days = {}
+        for game_day_id, day in GameDay.objects.order_by('-id').values_list('id', 'date'):
+            self.game_days[day] = game_day_id  # The oldest day wins when a date is duplicated
+        amount_field = DailyAmount._meta.get_field('amount')
+        # Amounts must fit the column: max_digits - decimal_places digits before the point
+        self.amount_limit = Decimal(10) ** (amount_field.max_digits - amount_field.decimal_places)
+        self.amount_places = amount_field.decimal_places
+        self.amount_step = Decimal(10) ** -amount_field.decimal_places
+        self.touched_game_days = set()
+        self.rows = 0
+        self.written = 0
+        self.skipped = 0
+        self.errors = []
+        self.error_count = 0
+
+    def error(self, line_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line_number, 'error': message})
+
+    def resolve(self, line_number, record):
+        if record is None:
+            return self.error(line_number, "Not a JSON object.")
+
+        slot_machine_id = self.slot_machines.get(str(record.get('slot_machine') or '').strip())
+        if slot_machine_id is None:
+            return self.error(line_number, f"Unknown slot machine {record.get('slot_machine')!r}.")
+
+        try:
+            day = parse_date(str(record.get('date') or '').strip())
+        except ValueError:
+            day = None
+        if day is None:
+            return self.error(line_number, "Invalid date format. Use YYYY-MM-DD.")
+
+        try:
+            amount = Decimal(str(record.get('amount')).strip())
+        except InvalidOperation:
+            return self.error(line_number, "Invalid amount.")
+        if not amount.is_finite():
+            return self.error(line_number, "Invalid amount.")
+        if amount < 0:
+            return self.error(line_number, "Amount cannot be negative.")
+        # Checked before quantizing, which cannot represent huge values
+        if amount >= self.amount_limit:
+            return self.error(line_number, f"Amount must be less than {self.amount_limit}.")
+        if amount.quantize(self.amount_step) != amount:
+            return self.error(line_number, f"Ensure that there are no more than {self.amount_places} decimal places.")
+
+        game_day_id = self.game_days.get(day)
+        if game_day_id is None:
+            if not self.create_game_days:
+                return self.error(line_number, f"No GameDay for {day}.")
+            game_day_id = self.game_days[day] = GameDay.objects.create(date=day).id
+
+        return DailyAmount(slot_machine_id=slot_machine_id, game_day_id=game_day_id, amount=amount)
+
+    def write(self, chunk):
+        # Later readings in the file win over earlier ones for the same key
+        readings = list({(row.slot_machine_id, row.game_day_id): row for row in chunk}.values())
+        options = (
+            {'update_conflicts': True, 'unique_fields': ['slot_machine', 'game_day'], 'update_fields': ['amount']}
+            if self.overwrite else {'ignore_conflicts': True}
+        )
+        with transaction.atomic():
+            if not self.overwrite:
+                # ignore_conflicts does not say which rows it skipped, so the existing keys are read first
+                existing = set(DailyAmount.objects.filter(
+                    slot_machine_id__in={row.slot_machine_id for row in readings},
+                    game_day_id__in={row.game_day_id for row in readings},
+                ).values_list('slot_machine_id', 'game_day_id'))
+                new_readings = [row for row in readings if (row.slot_machine_id, row.game_day_id) not in existing]
+                self.skipped += len(readings) - len(new_readings)
+                readings = new_readings
+            DailyAmount.objects.bulk_create(readings, **options)
+        self.written += len(readings)
+        self.touched_game_days.update(row.game_day_id for row in readings)
+
+    def run(self, records):
+        started = time.perf_counter()
+        chunk = []
+        for line_number, record in records:
+            self.rows += 1
+            reading = self.resolve(line_number, record)
+            if reading is not None:
+                chunk.append(reading)
+            if len(chunk) >= self.chunk_size:
+                self.write(chunk)
+                chunk = []
+        if chunk:
+            self.write(chunk)
+
+        if self.touched_game_days:
+            # bulk_create sends no signals
+            HallDailySummary.objects.rebuild(game_days=sorted(self.touched_game_days))
+            response_cache.bump_on_write(response_cache.SLOT_AMOUNTS)
+
+        seconds = time.perf_counter() - started
+        return {
+            'rows': self.rows,
+            'written': self.written,
+            'skipped': self.skipped,
+            'error_count': self.error_count,
+            'errors': self.errors,
+            'game_days': len(self.touched_game_days),
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(self.rows / seconds, 1) if seconds else None,
+            'written_per_second': round(self.written / seconds, 1) if seconds else None,
+        }
+
+
+def import_daily_amounts(lines, file_format, **options):
+    """Import the readings in ``lines`` and return the summary report."""
+    return DailyAmountImport(**options).run(read_records(lines, file_format))
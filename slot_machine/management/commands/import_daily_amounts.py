@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from slot_machine import importer
+
+
+class Command(BaseCommand):
+    help = "Bulk import DailyAmount readings from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV (slot_machine,date,amount) or NDJSON file.")
+        parser.add_argument('--format', choices=importer.FORMATS,
+                            help="File format; taken from the file extension by default.")
+        parser.add_argument('--chunk-size', type=int, default=importer.CHUNK_SIZE,
+                            help="Readings written per transaction.")
+        parser.add_argument('--keep-existing', action='store_true',
+                            help="Keep readings that already exist instead of overwriting them.")
+        parser.add_argument('--create-game-days', action='store_true',
+                            help="Create missing GameDay rows instead of skipping their readings.")
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or importer.format_for(options['path'])
+        if file_format is None:
+            raise CommandError("Cannot tell the file format from the extension; pass --format.")
+
+        with open(options['path'], 'rb') as raw:
+            if not importer.is_utf8(iter(lambda: raw.read(64 * 1024), b'')):
+                raise CommandError("The file must be UTF-8 encoded.")
+
+        with open(options['path'], newline='', encoding='utf-8-sig') as lines:
+            report = importer.import_daily_amounts(
+                lines,
+                file_format,
+                chunk_size=options['chunk_size'],
+                overwrite=not options['keep_existing'],
+                create_game_days=options['create_game_days'],
+            )
+
+        for error in report['errors']:
+            self.stderr.write(f"line {error['line']}: {error['error']}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {report['written']} of {report['rows']} rows ({report['skipped']} kept existing, "
+            f"{report['error_count']} rejected) "
+            f"in {report['seconds']}s, {report['rows_per_second']} rows/s."
+        ))
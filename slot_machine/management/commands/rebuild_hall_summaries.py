@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from slot_machine.models import GameDay, HallDailySummary
+
+
+class Command(BaseCommand):
+    help = "Rebuild the HallDailySummary rollup from DailyAmount rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', help="First game day to rebuild (YYYY-MM-DD).")
+        parser.add_argument('--end-date', help="Last game day to rebuild (YYYY-MM-DD).")
+        parser.add_argument('--hall', type=int, action='append', dest='halls',
+                            help="Only rebuild this hall id. May be repeated.")
+
+    def handle(self, *args, **options):
+        start_date = self.parse(options['start_date'], '--start-date')
+        end_date = self.parse(options['end_date'], '--end-date')
+
+        game_days = None
+        if start_date or end_date:
+            game_days = GameDay.objects.all()
+            if start_date:
+                game_days = game_days.filter(date__gte=start_date)
+            if end_date:
+                game_days = game_days.filter(date__lte=end_date)
+
+        written = HallDailySummary.objects.rebuild(game_days=game_days, halls=options['halls'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} hall summary rows."))
+
+    def parse(self, value, option):
+        if value is None:
+            return None
+        parsed = parse_date(value)
+        if parsed is None:
+            raise CommandError(f"{option} must be a date in YYYY-MM-DD format.")
+        return parsed
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_hall_daily_summaries(apps, schema_editor):
+    DailyAmount = apps.get_model('slot_machine', 'DailyAmount')
+    HallDailySummary = apps.get_model('slot_machine', 'HallDailySummary')
+
+    rows = (
+        DailyAmount.objects.filter(slot_machine__hall__isnull=False)
+        .values('slot_machine__hall_id', 'game_day_id', 'slot_machine__brand')
+        .annotate(machine_count=models.Count('slot_machine_id', distinct=True), total_amount=models.Sum('amount'))
+        .order_by()
+    )
+    HallDailySummary.objects.bulk_create([
+        HallDailySummary(
+            hall_id=row['slot_machine__hall_id'],
+            game_day_id=row['game_day_id'],
+            brand=row['slot_machine__brand'],
+            machine_count=row['machine_count'],
+            total_amount=row['total_amount'] or 0,
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot_machine', '0005_remove_dailyamount_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HallDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('brand', models.CharField(max_length=100)),
+                ('machine_count', models.PositiveIntegerField(default=0)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=0.0, max_digits=14)),
+                ('game_day', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='hall_summaries', to='slot_machine.gameday')),
+                ('hall', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to='slot_machine.hall')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('hall', 'game_day', 'brand'), name='unique_hall_daily_summary')],
+            },
+        ),
+        migrations.RunPython(backfill_hall_daily_summaries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:53
+
+import re
+
+from django.db import migrations, models
+
+
+def natural_sort_key(name):
+    # Frozen copy of slot_machine.models.natural_sort_key as of this migration
+    return re.sub(r'\d+', lambda match: match.group().zfill(10), name.lower())
+
+
+def backfill_sort_keys(apps, schema_editor):
+    SlotMachine = apps.get_model('slot_machine', 'SlotMachine')
+    slot_machines = list(SlotMachine.objects.only('id', 'name'))
+    for slot_machine in slot_machines:
+        slot_machine.sort_key = natural_sort_key(slot_machine.name)
+    SlotMachine.objects.bulk_update(slot_machines, ['sort_key'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot_machine', '0006_halldailysummary'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='slotmachine',
+            options={'ordering': ['sort_key', 'id']},
+        ),
+        migrations.AddField(
+            model_name='slotmachine',
+            name='sort_key',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=1000),
+        ),
+        migrations.RunPython(backfill_sort_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot_machine', '0007_slotmachine_sort_key'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='gameday',
+            name='date',
+            field=models.DateField(db_index=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot_machine', '0008_gameday_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gameday',
+            name='version',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+    ]
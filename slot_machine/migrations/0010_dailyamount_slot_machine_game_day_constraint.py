@@ -0,0 +1,61 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:12
+
+from django.db import migrations, models
+
+
+def dedupe_daily_amounts(apps, schema_editor):
+    """
+    Keep the oldest DailyAmount per (slot machine, game day), and rebuild the
+    HallDailySummary rows 0006 built from the deleted duplicates.
+    """
+    DailyAmount = apps.get_model('slot_machine', 'DailyAmount')
+    HallDailySummary = apps.get_model('slot_machine', 'HallDailySummary')
+    GameDay = apps.get_model('slot_machine', 'GameDay')
+    duplicated = (
+        DailyAmount.objects.values('slot_machine_id', 'slot_machine__hall_id', 'game_day_id')
+        .annotate(rows=models.Count('id'))
+        .filter(rows__gt=1)
+        .order_by()
+    )
+    buckets = set()
+    for group in duplicated:
+        rows = DailyAmount.objects.filter(slot_machine_id=group['slot_machine_id'], game_day_id=group['game_day_id'])
+        keep = rows.order_by('id').values_list('id', flat=True).first()
+        rows.exclude(id=keep).delete()
+        if group['slot_machine__hall_id'] is not None:
+            buckets.add((group['slot_machine__hall_id'], group['game_day_id']))
+
+    for hall_id, game_day_id in buckets:
+        HallDailySummary.objects.filter(hall_id=hall_id, game_day_id=game_day_id).delete()
+        rows = (
+            DailyAmount.objects.filter(slot_machine__hall_id=hall_id, game_day_id=game_day_id)
+            .values('slot_machine__brand')
+            .annotate(machine_count=models.Count('slot_machine_id', distinct=True), total_amount=models.Sum('amount'))
+            .order_by()
+        )
+        HallDailySummary.objects.bulk_create([
+            HallDailySummary(
+                hall_id=hall_id,
+                game_day_id=game_day_id,
+                brand=row['slot_machine__brand'],
+                machine_count=row['machine_count'],
+                total_amount=row['total_amount'] or 0,
+            )
+            for row in rows
+        ])
+    GameDay.objects.filter(pk__in={game_day_id for _, game_day_id in buckets}).update(version=models.F('version') + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('slot_machine', '0009_gameday_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_daily_amounts, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailyamount',
+            constraint=models.UniqueConstraint(fields=('slot_machine', 'game_day'), name='unique_dailyamount_slot_machine_game_day'),
+        ),
+    ]
@@ -1,8 +1,18 @@
-from django.db import models
+import re
+
+from django.db import IntegrityError, models, transaction
 from django.utils import timezone
 
+
+def natural_sort_key(name):
+    """Case-insensitive key that orders digit runs numerically: '2' < '10', 'A9' < 'A10'."""
+    return re.sub(r'\d+', lambda match: match.group().zfill(10), name.lower())
+
+
 class GameDay(models.Model):
-    date = models.DateField()
+    date = models.DateField(db_index=True)
+    # Bumped on every write to the day's rows; feeds the ETag of the polled endpoints
+    version = models.PositiveBigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(null=True, blank=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
@@ -10,28 +20,109 @@ class GameDay(models.Model):
     def __str__(self):
         return str(self.date)
 
+    def save(self, *args, **kwargs):
+        # ``version`` is only moved by game_days.bump_version(); never write back a stale copy
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'version'
+            ]
+        super().save(*args, **kwargs)
+
 class SlotMachine(models.Model):
     name = models.CharField(max_length=100, unique=True)
+    # natural_sort_key() widens a character to at most 10 (a lone digit), so 10x the name always fits
+    sort_key = models.CharField(max_length=1000, db_index=True, editable=False, default='')
     brand = models.CharField(max_length=100)
     hall = models.ForeignKey('Hall', related_name='slot_machines', on_delete=models.CASCADE, null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(null=True, blank=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        ordering = ['sort_key', 'id']
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.sort_key = natural_sort_key(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'sort_key'}
+        super().save(*args, **kwargs)
+
+class HallQuerySet(models.QuerySet):
+    def money_totals(self, start_date, end_date):
+        """
+        Per-hall money sum and per-brand machine count / money total for the
+        halls in this queryset, aggregated in the database.
+        """
+        machine_counts, money = self._money_totals_queries(start_date, end_date)
+        return self._fold_money_totals(machine_counts, money if money is not None else [])
+
+    async def amoney_totals(self, start_date, end_date):
+        machine_counts, money = self._money_totals_queries(start_date, end_date)
+        return self._fold_money_totals(
+            [row async for row in machine_counts],
+            [row async for row in money] if money is not None else [],
+        )
+
+    def _money_totals_queries(self, start_date, end_date):
+        halls = self.values('id')
+        machine_counts = (
+            SlotMachine.objects.filter(hall__in=halls)
+            .values('hall_id', 'brand')
+            .annotate(count=models.Count('id'))
+            .order_by()
+        )
+        if start_date is None or end_date is None:
+            return machine_counts, None
+
+        money = (
+            HallDailySummary.objects.filter(hall__in=halls, game_day__date__range=[start_date, end_date])
+            .values('hall_id', 'brand')
+            .annotate(total=models.Sum('total_amount'))
+            .order_by()
+        )
+        return machine_counts, money
+
+    @staticmethod
+    def _fold_money_totals(machine_counts, money):
+        totals = {}
+
+        def hall_totals(hall_id):
+            return totals.setdefault(hall_id, {'daily_money_sum': 0, 'slot_machines_by_brand': {}})
+
+        for row in machine_counts:
+            hall_totals(row['hall_id'])['slot_machines_by_brand'][row['brand']] = {
+                'count': row['count'],
+                'total_money': 0,
+            }
+
+        for row in money:
+            totals_for_hall = hall_totals(row['hall_id'])
+            totals_for_hall['daily_money_sum'] += row['total']
+            brand_totals = totals_for_hall['slot_machines_by_brand'].setdefault(
+                row['brand'], {'count': 0, 'total_money': 0})
+            brand_totals['total_money'] = row['total']
+
+        return totals
+
+
 class Hall(models.Model):
     name = models.CharField(max_length=100, unique=True)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(null=True, blank=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    objects = HallQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
     def total_daily_amounts(self):
-            total_amount = DailyAmount.objects.filter(slot_machine__hall=self).aggregate(total=models.Sum('amount'))['total']
+            total_amount = self.daily_summaries.aggregate(total=models.Sum('total_amount'))['total']
             return total_amount or 0
 
 class DailyAmount(models.Model):
@@ -39,5 +130,118 @@ class DailyAmount(models.Model):
     slot_machine = models.ForeignKey(SlotMachine, related_name='daily_amounts', on_delete=models.CASCADE)
     game_day = models.ForeignKey(GameDay, related_name='daily_amounts_by_game_day', on_delete=models.CASCADE)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['slot_machine', 'game_day'], name='unique_dailyamount_slot_machine_game_day'),
+        ]
+
     def __str__(self):
         return f"{self.amount} on {self.slot_machine} for {self.game_day}"
+
+
+class HallDailySummaryQuerySet(models.QuerySet):
+    def rebuild(self, game_days=None, halls=None):
+        """
+        Recompute the summary rows for the given game days and halls (every
+        one when omitted) from DailyAmount. Bumps the version of the given game
+        days or, without them, of the days whose rows were rewritten. Returns
+        the number of rows written.
+        """
+        amounts = DailyAmount.objects.filter(slot_machine__hall__isnull=False)
+        stale = self.model.objects.all()
+
+        if game_days is not None:
+            if not isinstance(game_days, models.QuerySet):
+                game_days = [getattr(game_day, 'pk', game_day) for game_day in game_days]
+            amounts = amounts.filter(game_day__in=game_days)
+            stale = stale.filter(game_day__in=game_days)
+        if halls is not None:
+            halls = [hall for hall in halls if hall is not None]
+            amounts = amounts.filter(slot_machine__hall__in=halls)
+            stale = stale.filter(hall__in=halls)
+
+        rows = (
+            amounts.values('slot_machine__hall_id', 'game_day_id', 'slot_machine__brand')
+            .annotate(machine_count=models.Count('slot_machine_id', distinct=True), total_amount=models.Sum('amount'))
+            .order_by()
+        )
+
+        with transaction.atomic():
+            rows = list(rows)
+            if game_days is None:
+                game_days = {row['game_day_id'] for row in rows}
+                game_days.update(stale.values_list('game_day_id', flat=True).distinct())
+            stale.delete()
+            created = self.model.objects.bulk_create([
+                self.model(
+                    hall_id=row['slot_machine__hall_id'],
+                    game_day_id=row['game_day_id'],
+                    brand=row['slot_machine__brand'],
+                    machine_count=row['machine_count'],
+                    total_amount=row['total_amount'] or 0,
+                )
+                for row in rows
+            ], batch_size=1000)
+            # bulk_create sends no signals
+            GameDay.objects.filter(pk__in=game_days).update(version=models.F('version') + 1)
+
+        return len(created)
+
+    def refresh_machines(self, slot_machines, halls):
+        """
+        Recompute the buckets of ``halls`` on the days the machines have a
+        DailyAmount for, after their hall or brand changed.
+        """
+        game_days = set(DailyAmount.objects.filter(slot_machine__in=slot_machines)
+                        .values_list('game_day_id', flat=True).order_by().distinct())
+        if not game_days:
+            return 0
+        return self.rebuild(game_days=game_days, halls=halls)
+
+    def apply(self, slot_machine, game_day, amount=0, machines=0):
+        """
+        Add ``amount`` and ``machines`` to the (hall, game day, brand) bucket a
+        DailyAmount write touched, with F() updates so concurrent writes to the
+        same bucket add up instead of overwriting each other. A missing bucket
+        is created; an emptied one is dropped, as rebuild() would.
+        """
+        if slot_machine.hall_id is None or (not amount and not machines):
+            return
+        game_day_id = getattr(game_day, 'pk', game_day)
+        bucket = self.model.objects.filter(hall_id=slot_machine.hall_id, game_day_id=game_day_id,
+                                           brand=slot_machine.brand)
+        changes = {
+            'total_amount': models.F('total_amount') + amount,
+            'machine_count': models.F('machine_count') + machines,
+        }
+
+        with transaction.atomic():
+            if not bucket.update(**changes):
+                try:
+                    with transaction.atomic():
+                        self.model.objects.create(hall_id=slot_machine.hall_id, game_day_id=game_day_id,
+                                                  brand=slot_machine.brand, total_amount=amount,
+                                                  machine_count=machines)
+                except IntegrityError:
+                    # Another write created the bucket after our update found none
+                    bucket.update(**changes)
+            bucket.filter(machine_count=0).delete()
+
+
+class HallDailySummary(models.Model):
+    """Per (hall, game day, brand) rollup of DailyAmount, maintained on write."""
+    hall = models.ForeignKey(Hall, related_name='daily_summaries', on_delete=models.CASCADE)
+    game_day = models.ForeignKey(GameDay, related_name='hall_summaries', on_delete=models.CASCADE)
+    brand = models.CharField(max_length=100)
+    machine_count = models.PositiveIntegerField(default=0)
+    total_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0.00)
+
+    objects = HallDailySummaryQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['hall', 'game_day', 'brand'], name='unique_hall_daily_summary'),
+        ]
+
+    def __str__(self):
+        return f"{self.hall} / {self.brand} on {self.game_day}: {self.total_amount}"
@@ -20,8 +20,13 @@ class SlotMachineSerializer(serializers.ModelSerializer):
     daily_amounts = DailyAmountSerializer(many=True, read_only=True)
     class Meta:
         model = SlotMachine
-        fields = '__all__'
+        exclude = ['sort_key']
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Listings can leave out the nested DailyAmount history
+        if not self.context.get('include_history', True):
+            self.fields.pop('daily_amounts')
 
     def create(self, validated_data):
         # Create the SlotMachine object
@@ -70,45 +75,19 @@ class HallSerializer(serializers.ModelSerializer):
         model = Hall
         fields = '__all__'
 
-    def get_slot_machines_by_brand(self, obj):
-        brand_data  = {}
-        start_date = self.context.get('start_date')
-        end_date = self.context.get('end_date')
-
-        for slot_machine in obj.slot_machines.all():
-            brand = slot_machine.brand
-
-            daily_total = sum(
-                daily.amount for daily in slot_machine.daily_amounts.filter(
-                    game_day__date__range=[start_date, end_date])
-            )
+    def get_hall_totals(self, obj):
+        # Views pass totals computed for every hall in one aggregation; fall
+        # back to computing them here once for the whole serializer.
+        if 'hall_totals' not in self.context:
+            self.context['hall_totals'] = Hall.objects.all().money_totals(
+                self.context.get('start_date'), self.context.get('end_date'))
+        return self.context['hall_totals'].get(obj.id, {'daily_money_sum': 0, 'slot_machines_by_brand': {}})
 
-            if brand in brand_data:
-                brand_data[brand]['count'] += 1
-                brand_data[brand]['total_money'] += daily_total
-            else:
-                brand_data[brand] = {
-                    'count': 1,
-                    'total_money': daily_total
-                }
-
-        return brand_data
+    def get_slot_machines_by_brand(self, obj):
+        return self.get_hall_totals(obj)['slot_machines_by_brand']
 
     def get_daily_money_sum(self, obj):
-            # Get the current game day or filtered days
-        current_game_day = self.context.get('current_game_day')
-        start_date = self.context.get('start_date')
-        end_date = self.context.get('end_date')
-
-        # Calculate total daily amount for each slot machine in the hall
-        total_daily_amount = 0
-        for slot_machine in obj.slot_machines.all():
-            daily_amounts = slot_machine.daily_amounts.filter(
-                game_day__date__range=[start_date, end_date]
-            )
-            total_daily_amount += sum(daily.amount for daily in daily_amounts)
-
-        return total_daily_amount
+        return self.get_hall_totals(obj)['daily_money_sum']
 
 
 class GameDaySerializer(serializers.ModelSerializer):
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from django_rest import game_days, response_cache
+from .models import DailyAmount, GameDay, Hall, SlotMachine
+
+
+@receiver(post_save, sender=GameDay)
+@receiver(post_delete, sender=GameDay)
+def forget_current_slot_game_day(sender, **kwargs):
+    game_days.invalidate_on_write(game_days.SLOT)
+
+
+@receiver(post_save, sender=DailyAmount)
+@receiver(post_delete, sender=DailyAmount)
+def bump_slot_game_day_version(sender, instance, **kwargs):
+    game_days.bump_version(game_days.SLOT, instance.game_day_id)
+    response_cache.bump_on_write(response_cache.SLOT_AMOUNTS)
+
+
+@receiver(post_save, sender=SlotMachine)
+@receiver(post_delete, sender=SlotMachine)
+@receiver(post_save, sender=Hall)
+@receiver(post_delete, sender=Hall)
+@receiver(post_save, sender=GameDay)
+@receiver(post_delete, sender=GameDay)
+def invalidate_slot_floor_responses(sender, **kwargs):
+    response_cache.bump_on_write(response_cache.SLOT_FLOOR)
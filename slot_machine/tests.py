@@ -1,3 +1,528 @@
+import asyncio
+from datetime import date
+from decimal import Decimal
+import os
+import tempfile
+from io import StringIO
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from django_rest import events, game_days
+from .models import SlotMachine, Hall, GameDay, DailyAmount, HallDailySummary, natural_sort_key
+
+
+class HallListViewTests(TestCase):
+    url = '/api/slot/halls/'
+
+    def setUp(self):
+        cache.clear()
+        self.day_one = GameDay.objects.create(date=date(2024, 11, 1))
+        self.day_two = GameDay.objects.create(date=date(2024, 11, 2))
+        self.hall = Hall.objects.create(name='Main')
+
+    def add_machine(self, name, brand, amounts, hall=None):
+        slot_machine = SlotMachine.objects.create(name=name, brand=brand, hall=hall or self.hall)
+        for game_day, amount in zip((self.day_one, self.day_two), amounts):
+            DailyAmount.objects.create(slot_machine=slot_machine, game_day=game_day, amount=amount)
+            HallDailySummary.objects.apply(slot_machine, game_day, amount=Decimal(amount), machines=1)
+        return slot_machine
+
+    def test_totals_by_hall_and_brand_for_range(self):
+        self.add_machine('1', 'Novomatic', ['10.50', '1.00'])
+        self.add_machine('2', 'Novomatic', ['4.00', '2.00'])
+        self.add_machine('3', 'EGT', ['7.25', '3.00'])
+
+        response = self.client.get(self.url, {'start_date': '2024-11-01', 'end_date': '2024-11-02'})
+
+        self.assertEqual(response.status_code, 200)
+        hall = response.json()[0]
+        self.assertEqual(Decimal(str(hall['daily_money_sum'])), Decimal('27.75'))
+        self.assertEqual(hall['slot_machines_by_brand']['Novomatic']['count'], 2)
+        self.assertEqual(Decimal(str(hall['slot_machines_by_brand']['Novomatic']['total_money'])), Decimal('17.50'))
+        self.assertEqual(Decimal(str(hall['slot_machines_by_brand']['EGT']['total_money'])), Decimal('10.25'))
+
+    def test_defaults_to_latest_game_day(self):
+        self.add_machine('1', 'EGT', ['7.25', '3.00'])
+
+        hall = self.client.get(self.url).json()[0]
+
+        self.assertEqual(Decimal(str(hall['daily_money_sum'])), Decimal('3.00'))
+
+    def test_query_count_does_not_grow_with_machines(self):
+        self.add_machine('1', 'EGT', ['1.00', '1.00'])
+        with self.assertNumQueries(7):
+            self.client.get(self.url, {'start_date': '2024-11-01', 'end_date': '2024-11-02'})
+
+        other_hall = Hall.objects.create(name='Second')
+        for index in range(30):
+            self.add_machine(f'{index + 10}', f'Brand {index % 3}', ['1.00', '2.00'], hall=other_hall)
+        with self.assertNumQueries(7):
+            self.client.get(self.url, {'start_date': '2024-11-01', 'end_date': '2024-11-02'})
+
+    def test_daily_amount_write_invalidates_only_ranges_covering_its_date(self):
+        slot_machine = self.add_machine('1', 'EGT', ['1.00', '2.00'])
+        day_one_range = {'start_date': '2024-11-01', 'end_date': '2024-11-01'}
+        day_two_range = {'start_date': '2024-11-02', 'end_date': '2024-11-02'}
+        day_one_etag = self.client.get(self.url, day_one_range)['ETag']
+        day_two_etag = self.client.get(self.url, day_two_range)['ETag']
+
+        DailyAmount.objects.filter(slot_machine=slot_machine, game_day=self.day_two).get().delete()
+
+        self.assertEqual(self.client.get(self.url, day_one_range, HTTP_IF_NONE_MATCH=day_one_etag).status_code, 304)
+        self.assertEqual(self.client.get(self.url, day_two_range, HTTP_IF_NONE_MATCH=day_two_etag).status_code, 200)
+
+    def test_async_variants_return_the_same_payloads(self):
+        self.add_machine('10', 'EGT', ['7.25', '3.00'])
+        self.add_machine('9', 'Novomatic', ['1.00', '2.00'])
+        for sync_url, async_url, params in [
+            (self.url, '/api/slot/async/halls/', {'start_date': '2024-11-01', 'end_date': '2024-11-02'}),
+            (self.url, '/api/slot/async/halls/', {}),
+            ('/api/slot/game_date/', '/api/slot/async/game_date/', {}),
+        ]:
+            cache.clear()
+            sync_response = self.client.get(sync_url, params)
+            cache.clear()
+            async_response = async_to_sync(self.async_client.get)(async_url, params)
+
+            self.assertEqual(async_response.status_code, 200)
+            self.assertEqual(async_response.json(), sync_response.json())
+
+    def test_invalid_dates_are_rejected(self):
+        response = self.client.get(self.url, {'start_date': '2024-13-01', 'end_date': '2024-11-02'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class HallsWithSlotMachinesViewTests(TestCase):
+    def test_counts_brands_without_date_range(self):
+        hall = Hall.objects.create(name='Main')
+        SlotMachine.objects.create(name='1', brand='EGT', hall=hall)
+        SlotMachine.objects.create(name='2', brand='EGT', hall=hall)
+
+        response = self.client.get('/api/slot/halls-with-slot-machines/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['slot_machines_by_brand'], {'EGT': {'count': 2, 'total_money': 0}})
+        self.assertEqual(response.json()[0]['daily_money_sum'], 0)
+
+
+class HallDailySummaryTests(TestCase):
+    def setUp(self):
+        self.game_day = GameDay.objects.create(date=date(2024, 11, 1))
+        self.hall = Hall.objects.create(name='Main')
+        self.slot_machine = SlotMachine.objects.create(name='1', brand='EGT', hall=self.hall)
+        self.daily_amount = DailyAmount.objects.create(slot_machine=self.slot_machine, game_day=self.game_day)
+        SlotMachine.objects.create(name='2', brand='EGT', hall=self.hall)
+        DailyAmount.objects.create(slot_machine_id=2, game_day=self.game_day, amount='5.00')
+        HallDailySummary.objects.rebuild()
+
+    def summary(self):
+        return HallDailySummary.objects.get(hall=self.hall, game_day=self.game_day, brand='EGT')
+
+    def test_closing_a_machine_updates_the_summary(self):
+        response = self.client.put(f'/api/slot/close-slot-machine/{self.slot_machine.id}/', {'amount': '12.50'},
+                                   content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.summary().total_amount, Decimal('17.50'))
+        self.assertEqual(self.summary().machine_count, 2)
+        self.assertEqual(self.hall.total_daily_amounts(), Decimal('17.50'))
+
+    def test_daily_amount_crud_updates_the_summary(self):
+        self.client.patch(f'/api/slot/daily-amounts/{self.daily_amount.id}/', {'amount': '1.25'},
+                          content_type='application/json')
+        self.assertEqual(self.summary().total_amount, Decimal('6.25'))
+
+        self.client.delete(f'/api/slot/daily-amounts/{self.daily_amount.id}/')
+        self.assertEqual(self.summary().total_amount, Decimal('5.00'))
+        self.assertEqual(self.summary().machine_count, 1)
+
+    def test_closing_a_machine_updates_the_bucket_in_place(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.put(f'/api/slot/close-slot-machine/{self.slot_machine.id}/', {'amount': '12.50'},
+                            content_type='application/json')
+
+        summary_queries = [query['sql'] for query in queries if 'halldailysummary' in query['sql'].lower()]
+        self.assertTrue(summary_queries[0].startswith('UPDATE'))
+        self.assertFalse([sql for sql in summary_queries if sql.startswith(('INSERT', 'SELECT'))])
+
+    def test_moving_an_amount_to_another_day_moves_it_between_buckets(self):
+        other_day = GameDay.objects.create(date=date(2024, 11, 2))
+        daily_amount = DailyAmount.objects.get(slot_machine_id=2)
+
+        self.client.patch(f'/api/slot/daily-amounts/{daily_amount.id}/', {'game_day': other_day.id},
+                          content_type='application/json')
+
+        self.assertEqual(self.summary().total_amount, Decimal('0.00'))
+        self.assertEqual(self.summary().machine_count, 1)
+        moved = HallDailySummary.objects.get(hall=self.hall, game_day=other_day, brand='EGT')
+        self.assertEqual((moved.total_amount, moved.machine_count), (Decimal('5.00'), 1))
+
+    def test_moving_a_machine_moves_its_history(self):
+        other_hall = Hall.objects.create(name='Second')
+
+        self.client.put(f'/api/slot/add-slot-to-hall/2/{other_hall.id}/')
+
+        self.assertEqual(self.summary().total_amount, Decimal('0.00'))
+        self.assertEqual(other_hall.total_daily_amounts(), Decimal('5.00'))
+
+    def test_name_edit_leaves_the_summary_alone(self):
+        version = GameDay.objects.get(pk=self.game_day.pk).version
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.patch(f'/api/slot/slot-machine/{self.slot_machine.id}/', {'name': '1A'},
+                              content_type='application/json')
+
+        self.assertFalse([query for query in queries if 'halldailysummary' in query['sql'].lower()])
+        self.assertEqual(GameDay.objects.get(pk=self.game_day.pk).version, version)
+
+    def test_brand_edit_only_bumps_the_machines_days(self):
+        other_day = GameDay.objects.create(date=date(2024, 11, 2))
+        DailyAmount.objects.create(slot_machine_id=2, game_day=other_day, amount='3.00')
+        version, other_version = (GameDay.objects.get(pk=day.pk).version for day in (self.game_day, other_day))
+
+        self.client.patch(f'/api/slot/slot-machine/{self.slot_machine.id}/', {'brand': 'Novomatic'},
+                          content_type='application/json')
+
+        self.assertEqual(self.summary().machine_count, 1)
+        self.assertEqual(GameDay.objects.get(pk=self.game_day.pk).version, version + 1)
+        self.assertEqual(GameDay.objects.get(pk=other_day.pk).version, other_version)
+
+    def test_rebuild_command(self):
+        HallDailySummary.objects.all().delete()
+
+        call_command('rebuild_hall_summaries', '--start-date', '2024-11-01', stdout=StringIO())
+
+        self.assertEqual(self.summary().total_amount, Decimal('5.00'))
+
+
+class SlotMachineListCreateViewTests(TestCase):
+    url = '/api/slot/slot-machine/'
+
+    def setUp(self):
+        game_day = GameDay.objects.create(date=date(2024, 11, 1))
+        for name in ['10', '9', 'A2']:
+            slot_machine = SlotMachine.objects.create(name=name, brand='EGT')
+            DailyAmount.objects.create(slot_machine=slot_machine, game_day=game_day)
+
+    def test_pages_follow_the_cursor(self):
+        first = self.client.get(self.url, {'page_size': 2}).json()
+        second = self.client.get(first['next']).json()
+
+        self.assertEqual([m['name'] for m in first['results']], ['9', '10'])
+        self.assertEqual([m['name'] for m in second['results']], ['A2'])
+        self.assertIsNone(second['next'])
+
+    def test_machines_with_the_same_sort_key_page_in_id_order(self):
+        SlotMachine.objects.create(name='a2', brand='EGT')
+        SlotMachine.objects.create(name='09', brand='EGT')
+
+        names, url, params = [], self.url, {'page_size': 1}
+        while url:
+            page = self.client.get(url, params).json()
+            names += [m['name'] for m in page['results']]
+            url, params = page['next'], None
+
+        self.assertEqual(names, ['9', '09', '10', 'A2', 'a2'])
+
+    def test_history_can_be_left_out(self):
+        with_history = self.client.get(self.url).json()['results'][0]
+        without_history = self.client.get(self.url, {'history': 'false'}).json()['results'][0]
+
+        self.assertEqual(len(with_history['daily_amounts']), 1)
+        self.assertNotIn('daily_amounts', without_history)
+
+
+class NaturalSortTests(TestCase):
+    def test_sort_key_orders_digit_runs_numerically(self):
+        names = ['A10', 'a9', '100', '20', 'B1']
+
+        self.assertEqual(sorted(names, key=natural_sort_key), ['20', '100', 'a9', 'A10', 'B1'])
+
+    def test_sort_key_fits_the_longest_name(self):
+        name = '1-' * 50
+
+        slot_machine = SlotMachine.objects.create(name=name, brand='EGT')
+
+        self.assertEqual(len(slot_machine.sort_key), 550)
+        self.assertLessEqual(len(slot_machine.sort_key), SlotMachine._meta.get_field('sort_key').max_length)
+
+    def test_sort_key_is_kept_in_sync_on_save(self):
+        slot_machine = SlotMachine.objects.create(name='7', brand='EGT')
+        slot_machine.name = '12'
+        slot_machine.save(update_fields=['name'])
+
+        slot_machine.refresh_from_db()
+        self.assertEqual(slot_machine.sort_key, natural_sort_key('12'))
+
+
+class CurrentGameDayViewTests(TestCase):
+    def test_lists_machines_in_natural_order_per_hall(self):
+        game_day = GameDay.objects.create(date=date(2024, 11, 1))
+        hall = Hall.objects.create(name='Main')
+        for name, amount in [('10', '1.00'), ('VIP-1', '2.00'), ('9', '3.00')]:
+            slot_machine = SlotMachine.objects.create(name=name, brand='EGT', hall=hall)
+            DailyAmount.objects.create(slot_machine=slot_machine, game_day=game_day, amount=amount)
+
+        response = self.client.get('/api/slot/game_date/')
+
+        self.assertEqual(response.status_code, 200)
+        hall_data = response.json()['halls'][0]
+        self.assertEqual([m['name'] for m in hall_data['slot_machines']], ['9', '10', 'VIP-1'])
+        self.assertEqual(hall_data['daily_money_sum'], 6.0)
+        self.assertEqual(response.json()['total_daily_amount'], 6.0)
+
+
+class SlotEventStreamTests(TestCase):
+    def setUp(self):
+        game_days.invalidate()
+        self.game_day = GameDay.objects.create(date=date(2024, 11, 1))
+        self.slot_machine = SlotMachine.objects.create(name='1', brand='EGT', hall=Hall.objects.create(name='Main'))
+        DailyAmount.objects.create(slot_machine=self.slot_machine, game_day=self.game_day, amount=0)
+
+    def close_slot(self, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.put(f'/api/slot/close-slot-machine/{self.slot_machine.id}/', {'amount': amount},
+                                   content_type='application/json')
+
+    async def test_amount_changes_are_pushed_to_the_day_channel(self):
+        async with events.get_broker().subscribe(events.slot_channel(self.game_day.id)) as subscription:
+            response = await sync_to_async(self.close_slot)('12.50')
+            event = await subscription.get(timeout=5)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(event['type'], 'slot.amount_changed')
+        self.assertEqual((event['slot_machine'], event['amount']), (self.slot_machine.id, 12.5))
+
+    async def test_stream_starts_with_the_day_version(self):
+        response = await self.async_client.get('/api/slot/events/')
+        stream = response.streaming_content
+
+        ready = (await asyncio.wait_for(anext(stream), 5)).decode()
+        await stream.aclose()
+
+        self.assertIn('event: ready', ready)
+        self.assertIn(f'"game_day": {self.game_day.id}', ready)
+
+
+class DailyAmountImportTests(TestCase):
+    url = '/api/slot/daily-amounts/import/'
+
+    def setUp(self):
+        self.hall = Hall.objects.create(name='Main')
+        self.game_day = GameDay.objects.create(date=date(2024, 11, 1))
+        self.machines = [SlotMachine.objects.create(name=name, brand='EGT', hall=self.hall) for name in ('A1', 'A2')]
+
+    def upload(self, name, content, **params):
+        return self.client.post(f'{self.url}?{"&".join(f"{k}={v}" for k, v in params.items())}',
+                                {'file': SimpleUploadedFile(name, content.encode())})
+
+    def test_csv_upload_creates_and_overwrites_readings(self):
+        DailyAmount.objects.create(slot_machine=self.machines[0], game_day=self.game_day, amount='1.00')
+
+        response = self.upload('readings.csv', 'slot_machine,date,amount\n'
+                                               'A1,2024-11-01,10.50\n'
+                                               'A2,2024-11-01,4.25\n'
+                                               'B9,2024-11-01,3.00\n'
+                                               'A2,2024-11-01,-1\n')
+
+        self.assertEqual(response.status_code, 201)
+        report = response.json()
+        self.assertEqual((report['rows'], report['written'], report['error_count']), (4, 2, 2))
+        self.assertEqual([error['line'] for error in report['errors']], [4, 5])
+        self.assertIsNotNone(report['rows_per_second'])
+        self.assertEqual(
+            sorted(DailyAmount.objects.values_list('slot_machine__name', 'amount')),
+            [('A1', Decimal('10.50')), ('A2', Decimal('4.25'))],
+        )
+        self.assertEqual(HallDailySummary.objects.get().total_amount, Decimal('14.75'))
+
+    def test_ndjson_upload_can_create_game_days(self):
+        content = '\n'.join([
+            '{"slot_machine": "A1", "date": "2024-10-30", "amount": 2}',
+            '{"slot_machine": "A1", "date": "2024-10-31", "amount": "3.10"}',
+        ])
+
+        rejected = self.upload('readings.ndjson', content)
+        response = self.upload('readings.ndjson', content, create_game_days='true')
+
+        self.assertEqual(rejected.status_code, 400)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(
+            list(DailyAmount.objects.order_by('game_day__date').values_list('game_day__date', 'amount')),
+            [(date(2024, 10, 30), Decimal('2.00')), (date(2024, 10, 31), Decimal('3.10'))],
+        )
+
+    def test_unknown_file_format(self):
+        response = self.upload('readings.xlsx', 'x')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_non_utf8_upload_is_rejected(self):
+        response = self.client.post(self.url, {
+            'file': SimpleUploadedFile('readings.csv', 'slot_machine,date,amount\nA1,2024-11-01,1\nÄ'.encode('latin-1')),
+        })
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'The file must be UTF-8 encoded.'})
+        self.assertFalse(DailyAmount.objects.exists())
+
+    def test_kept_readings_and_oversized_amounts_are_not_written(self):
+        DailyAmount.objects.create(slot_machine=self.machines[0], game_day=self.game_day, amount='1.00')
+
+        response = self.upload('readings.csv', 'slot_machine,date,amount\n'
+                                               'A1,2024-11-01,10.50\n'
+                                               'A2,2024-11-01,100000000\n', overwrite='false')
+
+        report = response.json()
+        self.assertEqual((report['written'], report['skipped'], report['error_count']), (0, 1, 1))
+        self.assertEqual(report['errors'], [{'line': 3, 'error': 'Amount must be less than 100000000.'}])
+        self.assertEqual(list(DailyAmount.objects.values_list('amount', flat=True)), [Decimal('1.00')])
+
+    def test_huge_and_over_precise_amounts_are_row_errors(self):
+        SlotMachine.objects.create(name='A3', brand='EGT', hall=self.hall)
+
+        response = self.upload('readings.csv', 'slot_machine,date,amount\n'
+                                               'A1,2024-11-01,1e30\n'
+                                               'A2,2024-11-01,12.345\n'
+                                               'A3,2024-11-01,12.340\n')
+
+        report = response.json()
+        self.assertEqual(report['written'], 1)
+        self.assertEqual(report['errors'], [
+            {'line': 2, 'error': 'Amount must be less than 100000000.'},
+            {'line': 3, 'error': 'Ensure that there are no more than 2 decimal places.'},
+        ])
+        self.assertEqual(list(DailyAmount.objects.values_list('amount', flat=True)), [Decimal('12.34')])
+
+    def test_command_imports_in_chunks_and_can_keep_existing_readings(self):
+        DailyAmount.objects.create(slot_machine=self.machines[0], game_day=self.game_day, amount='1.00')
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'readings.csv')
+            with open(path, 'w') as readings:
+                readings.write('slot_machine,date,amount\nA1,2024-11-01,9.00\nA2,2024-11-01,5.00\n')
+            out = StringIO()
+            call_command('import_daily_amounts', path, '--chunk-size', '1', '--keep-existing', stdout=out)
+
+        self.assertIn('Imported 1 of 2 rows (1 kept existing, 0 rejected)', out.getvalue())
+        self.assertEqual(
+            sorted(DailyAmount.objects.values_list('slot_machine__name', 'amount')),
+            [('A1', Decimal('1.00')), ('A2', Decimal('5.00'))],
+        )
+
+
+class SlotMachineBulkCloseViewTests(TestCase):
+    url = '/api/slot/close-slot-machines/'
+
+    def setUp(self):
+        game_days.invalidate()
+        self.hall = Hall.objects.create(name='Main')
+        self.game_day = GameDay.objects.create(date=date(2024, 11, 1))
+
+    def add_machines(self, count):
+        machines = []
+        for _ in range(count):
+            slot_machine = SlotMachine.objects.create(name=f'{SlotMachine.objects.count() + 1}', brand='EGT',
+                                                      hall=self.hall)
+            DailyAmount.objects.create(slot_machine=slot_machine, game_day=self.game_day, amount=0)
+            machines.append(slot_machine)
+        return machines
+
+    def close(self, amounts):
+        return self.client.put(self.url, amounts, content_type='application/json')
+
+    def test_sets_every_amount_and_the_summary(self):
+        first, second = self.add_machines(2)
+
+        response = self.close({first.id: '10.50', second.id: 4})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], 2)
+        self.assertEqual(DailyAmount.objects.get(slot_machine=first).amount, Decimal('10.50'))
+        self.assertEqual(DailyAmount.objects.get(slot_machine=second).amount, Decimal('4.00'))
+        self.assertEqual(HallDailySummary.objects.get().total_amount, Decimal('14.50'))
+
+    def test_one_bad_amount_rejects_the_whole_close(self):
+        first, second = self.add_machines(2)
+
+        response = self.close({first.id: '10.50', second.id: 'ten', 999: 1})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()['errors']), {str(second.id), '999'})
+        self.assertEqual(DailyAmount.objects.get(slot_machine=first).amount, 0)
+
+    def test_amounts_follow_the_single_close_rules(self):
+        first, second, third = self.add_machines(3)
+
+        response = self.close({first.id: -1, second.id: '123456789.00', third.id: '1.005'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['errors'], {
+            str(first.id): 'Amount cannot be negative.',
+            str(second.id): 'Ensure that there are no more than 10 digits in total.',
+            str(third.id): 'Ensure that there are no more than 2 decimal places.',
+        })
+        self.assertFalse(DailyAmount.objects.exclude(amount=0).exists())
+
+    def test_query_count_does_not_grow_with_machines(self):
+        machines = self.add_machines(40)
+        self.close({machines[0].id: 1})  # Resolves and caches the current game day
+
+        with CaptureQueriesContext(connection) as few:
+            self.close({slot_machine.id: 1 for slot_machine in machines[:2]})
+        with CaptureQueriesContext(connection) as many:
+            self.close({slot_machine.id: 2 for slot_machine in machines})
+
+        self.assertEqual(len(many), len(few))
+
+
+class SlotMachinesMoveToHallTests(TestCase):
+    url = '/api/slot/move-slots-to-hall/'
+
+    def setUp(self):
+        self.main, self.vip = Hall.objects.create(name='Main'), Hall.objects.create(name='VIP')
+        game_day = GameDay.objects.create(date=date(2024, 11, 1))
+        self.machines = []
+        for index in range(3):
+            slot_machine = SlotMachine.objects.create(name=f'{index}', brand='EGT', hall=self.main)
+            DailyAmount.objects.create(slot_machine=slot_machine, game_day=game_day, amount=10)
+            self.machines.append(slot_machine)
+        HallDailySummary.objects.rebuild()
+
+    def move(self, slot_machines, hall):
+        return self.client.put(self.url, {'slot_machines': slot_machines, 'hall': hall},
+                               content_type='application/json')
+
+    def test_moves_machines_and_their_history(self):
+        response = self.move([self.machines[0].id, self.machines[1].id], self.vip.id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['updated'], 2)
+        self.assertEqual(
+            dict(HallDailySummary.objects.values_list('hall__name', 'total_amount')),
+            {'Main': Decimal('10.00'), 'VIP': Decimal('20.00')},
+        )
+
+    def test_removing_from_the_floor_and_repeated_moves(self):
+        self.assertEqual(self.move([self.machines[0].id], None).json()['updated'], 1)
+        self.assertEqual(self.move([self.machines[0].id], None).json()['updated'], 0)
+        self.assertEqual(HallDailySummary.objects.get().total_amount, Decimal('20.00'))
+
+    def test_unknown_ids_move_nothing(self):
+        response = self.move([self.machines[0].id, 999], self.vip.id)
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['missing'], [999])
+        self.assertFalse(SlotMachine.objects.filter(hall=self.vip).exists())
+
+    def test_hall_must_be_an_id_or_null(self):
+        for hall in ('abc', str(self.main.id), True):
+            self.assertEqual(self.move([self.machines[0].id], hall).status_code, 400)
+        self.assertFalse(SlotMachine.objects.filter(hall=self.vip).exists())
 
-# Create your tests here.
@@ -13,7 +13,13 @@ from .views import (
     SlotMachineAddToHallView,
     SlotMachineRemoveFromHallView,
     SlotMachineDetailUpdateDeleteView,
-    SlotMachineChangeAmountMoneyView
+    SlotMachineChangeAmountMoneyView,
+    DailyAmountImportView,
+    SlotMachineBulkCloseView,
+    SlotMachinesMoveToHallView,
+    SlotEventStreamView,
+    AsyncHallListView,
+    AsyncCurrentGameDayView,
 )
 
 urlpatterns = [
@@ -29,13 +35,19 @@ urlpatterns = [
     path('game_date/', CurrentGameDayView.as_view(), name='full-database'),
     path('halls-with-slot-machines/', HallsWithSlotMachinesView.as_view(), name='halls-with-slot-machines'),
     path('daily-amounts/', DailyAmountListCreateView.as_view(), name='daily-amount-list-create'),
+    path('daily-amounts/import/', DailyAmountImportView.as_view(), name='daily-amount-import'),
     path('daily-amounts/<int:id>/', DailyAmountRetrieveUpdateDestroyView.as_view(), name='daily-amount-retrieve-update-destroy'),
     path('add-slot-to-hall/<int:slot_machine_id>/<int:hall_id>/', SlotMachineAddToHallView.as_view(), name='add-slot-machine-to-hall'),
     #+
     path('remove-slot-from-hall/<int:slot_machine_id>/', SlotMachineRemoveFromHallView.as_view(), name='remove-slot-machine-from-hall'),
+    path('move-slots-to-hall/', SlotMachinesMoveToHallView.as_view(), name='move-slot-machines-to-hall'),
     #+
     path('slot-machine/<int:pk>/', SlotMachineDetailUpdateDeleteView.as_view(), name='delete-slot-machine'),
     #+
     path('close-slot-machine/<int:slot_machine_id>/', SlotMachineChangeAmountMoneyView.as_view(), name='change-amount-money'),
+    path('close-slot-machines/', SlotMachineBulkCloseView.as_view(), name='bulk-change-amount-money'),
+    path('events/', SlotEventStreamView.as_view(), name='slot-events'),
+    path('async/halls/', AsyncHallListView.as_view(), name='hall-list-async'),
+    path('async/game_date/', AsyncCurrentGameDayView.as_view(), name='full-database-async'),
 
 ]
@@ -1,11 +1,25 @@
-import re
+from asgiref.sync import sync_to_async
+from django.db import transaction
 from django.db.models import Prefetch
+from django.http import JsonResponse
+from django.views import View
 from datetime import datetime, timedelta
+from decimal import Decimal
+import codecs
+import logging
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import generics, status
-from .models import SlotMachine, Hall, GameDay, DailyAmount
+from rest_framework import generics, serializers, status
+from .models import SlotMachine, Hall, GameDay, DailyAmount, HallDailySummary
 from .serializers import SlotMachineSerializer, HallSerializer, GameDaySerializer, DailyAmountSerializer
+from django.utils.dateparse import parse_date
+from django_rest import events, game_days, response_cache
+from django_rest.game_days import current_slot_game_day
+from django_rest.pagination import KeysetPagination, query_flag
+from . import importer
+
+logger = logging.getLogger(__name__)
 
 # Create your views here.
 
@@ -20,21 +34,44 @@ class HallListView(APIView):
         if not start_date or not end_date:
             try:
                 # Fetch the most recent GameDay
-                latest_game_day = GameDay.objects.latest('date')
+                latest_game_day = current_slot_game_day()
                 start_date = end_date = latest_game_day.date.isoformat()
             except GameDay.DoesNotExist:
                 return Response({"error": "No GameDay record exists."}, status=status.HTTP_404_NOT_FOUND)
 
+        try:
+            start, end = parse_date(start_date), parse_date(end_date)
+        except ValueError:
+            start = end = None
+        if start is None or end is None:
+            return Response({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+
+        return response_cache.cached_response(
+            request, 'slot-halls', [start_date, end_date], [response_cache.SLOT_FLOOR],
+            lambda: self.halls(start_date, end_date),
+            day_versions=lambda: game_days.versions(game_days.SLOT, date__range=[start, end]),
+        )
+
+    def halls(self, start_date, end_date):
+        return self.hall_data(self.hall_queryset(start_date, end_date), start_date, end_date,
+                              Hall.objects.all().money_totals(start_date, end_date))
+
+    @staticmethod
+    def hall_queryset(start_date, end_date):
         # Prefetch related slot machines and daily amounts, filter by the specified or latest date range
-        halls = Hall.objects.prefetch_related(
+        return Hall.objects.prefetch_related(
             Prefetch('slot_machines__daily_amounts', queryset=DailyAmount.objects.filter(game_day__date__range=[start_date, end_date]))
         ).distinct()
-        # Pass the context with the date range
+
+    @staticmethod
+    def hall_data(halls, start_date, end_date, hall_totals):
+        # Pass the context with the date range and the per-hall money totals
         serializer = HallSerializer(halls, many=True, context={
                 'start_date': start_date,
-                'end_date': end_date
+                'end_date': end_date,
+                'hall_totals': hall_totals,
             })
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return serializer.data
 
 
 class CurrentGameDayView(APIView):
@@ -42,44 +79,57 @@ class CurrentGameDayView(APIView):
     def get(self, request, *args, **kwargs):
         # Get the most recent GameDay
         try:
-            current_game_day = GameDay.objects.latest('date')
+            current_game_day = current_slot_game_day()
         except GameDay.DoesNotExist:
             return Response({"error": "No GameDay record exists."}, status=status.HTTP_404_NOT_FOUND)
 
-        halls = Hall.objects.all()
-
+        return response_cache.cached_response(
+            request, 'slot-game-date', [current_game_day.id], [response_cache.SLOT_FLOOR],
+            lambda: self.floor(current_game_day),
+            day_versions=lambda: game_days.versions(game_days.SLOT, pk=current_game_day.id),
+        )
+
+    def floor(self, current_game_day):
+        daily_amounts, halls = self.floor_queries(current_game_day)
+        return self.floor_data(current_game_day, daily_amounts.iterator(), halls)
+
+    @staticmethod
+    def floor_queries(current_game_day):
+        # One row per machine for the day, already in natural name order
+        daily_amounts = (
+            DailyAmount.objects.filter(game_day=current_game_day, slot_machine__hall__isnull=False)
+            .order_by('slot_machine__sort_key', 'id')
+            .values('id', 'amount', 'slot_machine_id', 'slot_machine__name', 'slot_machine__brand',
+                    'slot_machine__hall_id')
+        )
+        return daily_amounts, Hall.objects.order_by('id')
+
+    @staticmethod
+    def floor_data(current_game_day, daily_amounts, halls):
+        halls = {
+            hall.id: {'id': hall.id, 'name': hall.name, 'daily_money_sum': 0, 'slot_machines': []}
+            for hall in halls
+        }
+        seen_slot_machines = set()
         total_daily_amount = 0
-        hall_data = []
-
-        # Iterate through halls and slot machines
-        for hall in halls:
-            slot_machines = []
-
-            for slot_machine in hall.slot_machines.all():
-                # Filter to get only the daily amount for the current game day
-                daily_amount = slot_machine.daily_amounts.filter(game_day=current_game_day).first()
-
-                if daily_amount:
-                    total_daily_amount += daily_amount.amount
-
-                    slot_machine_data = {
-                        'id': slot_machine.id,
-                        'name': slot_machine.name,
-                        'brand': slot_machine.brand,
-                        'daily_amounts': [{'id': daily_amount.id, 'amount': daily_amount.amount}]
-                    }
-                    slot_machines.append(slot_machine_data)
-
-            # Sort slot machines by name (converted to integer for numerical sorting)
-            slot_machines.sort(key=lambda x: int(x['name']))
-
-            hall_data.append({
-                'id': hall.id,
-                'name': hall.name,
-                'daily_money_sum': sum(slot['daily_amounts'][0]['amount'] for slot in slot_machines),
-                'slot_machines': slot_machines
+
+        for daily_amount in daily_amounts:
+            if daily_amount['slot_machine_id'] in seen_slot_machines:
+                continue
+            seen_slot_machines.add(daily_amount['slot_machine_id'])
+
+            hall = halls[daily_amount['slot_machine__hall_id']]
+            hall['daily_money_sum'] += daily_amount['amount']
+            total_daily_amount += daily_amount['amount']
+            hall['slot_machines'].append({
+                'id': daily_amount['slot_machine_id'],
+                'name': daily_amount['slot_machine__name'],
+                'brand': daily_amount['slot_machine__brand'],
+                'daily_amounts': [{'id': daily_amount['id'], 'amount': daily_amount['amount']}]
             })
 
+        hall_data = list(halls.values())
+
         # Serialize the current game day
         game_day_serializer = GameDaySerializer(current_game_day)
 
@@ -90,22 +140,29 @@ class CurrentGameDayView(APIView):
             'total_daily_amount': total_daily_amount
         }
 
-        return Response(data, status=status.HTTP_200_OK)
+        return data
+
+
+class SlotMachinePagination(KeysetPagination):
+    ordering = ('sort_key', 'id')
 
 
 class SlotMachineListCreateView(APIView):
+    pagination_class = SlotMachinePagination
+
     def get(self, request, *args, **kwargs):
-        slot_machines = SlotMachine.objects.all()
+        # ?history=false leaves out every machine's nested DailyAmount rows
+        include_history = query_flag(request, 'history', True)
 
-        # Custom sorting function to sort by numeric value in name
-        def natural_sort_key(s):
-            return [int(text) if text.isdigit() else text.lower() for text in re.split('(\d+)', s)]
+        slot_machines = SlotMachine.objects.select_related('hall')
+        if include_history:
+            slot_machines = slot_machines.prefetch_related('daily_amounts')
 
-        # Sort the slot machines by name using the custom sort function
-        sorted_slot_machines = sorted(slot_machines, key=lambda x: natural_sort_key(x.name))
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(slot_machines, request, view=self)
 
-        serializer = SlotMachineSerializer(sorted_slot_machines, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        serializer = SlotMachineSerializer(page, many=True, context={'include_history': include_history})
+        return paginator.get_paginated_response(serializer.data)
 
     def post(self, request, *args, **kwargs):
         serializer = SlotMachineSerializer(data=request.data)
@@ -131,16 +188,18 @@ class SlotMachineListCreateView(APIView):
 
             # Fetch the most recent GameDay from the database
             try:
-                recent_game_day = GameDay.objects.latest('date')
+                recent_game_day = current_slot_game_day()
             except GameDay.DoesNotExist:
                 return Response({"error": "No GameDay record exists. Please create a GameDay first."}, status=status.HTTP_400_BAD_REQUEST)
 
             # Automatically create DailyAmount object for the new SlotMachine
-            DailyAmount.objects.create(
-                slot_machine=slot_machine,
-                game_day=recent_game_day,
-                amount=0.00  # Default amount is 0
-            )
+            with transaction.atomic():
+                DailyAmount.objects.create(
+                    slot_machine=slot_machine,
+                    game_day=recent_game_day,
+                    amount=0.00  # Default amount is 0
+                )
+                HallDailySummary.objects.apply(slot_machine, recent_game_day, machines=1)
 
             return Response({"message": "Slot Machine and DailyAmount have been created."}, status=status.HTTP_201_CREATED)
 
@@ -166,21 +225,32 @@ class SlotMachineChangeAmountMoneyView(APIView):
             return Response({"error": "Slot Machine not found."}, status=status.HTTP_404_NOT_FOUND)
 
         try:
-            recent_game_day = GameDay.objects.latest('date')
+            recent_game_day = current_slot_game_day()
         except GameDay.DoesNotExist:
             return Response({"error": "No GameDay record exists. Please create a GameDay first."}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            daily_amount = DailyAmount.objects.get(
-                slot_machine=slot_machine,
-                game_day=recent_game_day
-            )
-        except DailyAmount.DoesNotExist:
-            return Response({"error": "DailyAmount record not found."}, status=status.HTTP_404_NOT_FOUND)
-
         # Update the amount and save it
-        daily_amount.amount = amount
-        daily_amount.save()
+        with transaction.atomic():
+            try:
+                daily_amount = DailyAmount.objects.select_for_update().get(
+                    slot_machine=slot_machine,
+                    game_day=recent_game_day
+                )
+            except DailyAmount.DoesNotExist:
+                return Response({"error": "DailyAmount record not found."}, status=status.HTTP_404_NOT_FOUND)
+
+            previous_amount = daily_amount.amount
+            daily_amount.amount = amount
+            daily_amount.save()
+            HallDailySummary.objects.apply(
+                slot_machine, recent_game_day, amount=Decimal(str(amount)).quantize(Decimal('0.01')) - previous_amount)
+            events.publish_on_commit(events.slot_channel(recent_game_day.id), {
+                'type': 'slot.amount_changed',
+                'game_day': recent_game_day.id,
+                'slot_machine': slot_machine.id,
+                'hall': slot_machine.hall_id,
+                'amount': amount,
+            })
 
         return Response({"message": "Slot closed successfully."}, status=status.HTTP_200_OK)
 
@@ -193,9 +263,14 @@ class SlotMachineDetailUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
 
     def update(self, request, *args, **kwargs):
         instance = self.get_object()  # Get the instance to be updated
+        previous = (instance.hall_id, instance.brand)
         serializer = self.get_serializer(instance, data=request.data, partial=True)  # Use partial=True for partial updates
         serializer.is_valid(raise_exception=True)
-        self.perform_update(serializer)
+        with transaction.atomic():
+            self.perform_update(serializer)
+            # A hall or brand change moves this machine's history between summary buckets
+            if (instance.hall_id, instance.brand) != previous:
+                HallDailySummary.objects.refresh_machines([instance.id], halls=[previous[0], instance.hall_id])
 
         return Response({
             "message": "Slot Machine updated successfully."
@@ -203,11 +278,83 @@ class SlotMachineDetailUpdateDeleteView(generics.RetrieveUpdateDestroyAPIView):
 
     def delete(self, request, *args, **kwargs):
             instance = self.get_object()
-            self.perform_destroy(instance)
+            with transaction.atomic():
+                # The machine's DailyAmounts go with it
+                day_ids = set(instance.daily_amounts.values_list('game_day_id', flat=True))
+                self.perform_destroy(instance)
+                if day_ids:
+                    HallDailySummary.objects.rebuild(game_days=day_ids, halls=[instance.hall_id])
             return Response({"message": "Slot deleted successfully"}, status=status.HTTP_200_OK)
 
 
 
+class SlotMachineBulkCloseView(APIView):
+    """
+    End-of-day close of many machines at once: takes ``{slot_machine_id: amount}``
+    and sets the current game day's DailyAmount of each machine in one
+    transaction, after every amount has been validated.
+    """
+    def put(self, request, *args, **kwargs):
+        if not isinstance(request.data, dict) or not request.data:
+            return Response({"error": "Send an object of {slot_machine_id: amount}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Each amount is held to the same rules as a single DailyAmount write
+        amount_serializer = DailyAmountSerializer()
+        amount_field = amount_serializer.fields['amount']
+
+        amounts = {}
+        errors = {}
+        for key, amount in request.data.items():
+            try:
+                slot_machine_id = int(key)
+            except ValueError:
+                errors[key] = "Invalid slot machine id."
+                continue
+            if amount is None or amount == "":
+                errors[key] = "Amount cannot be null or empty."
+                continue
+            try:
+                amounts[slot_machine_id] = amount_serializer.validate_amount(amount_field.run_validation(amount))
+            except serializers.ValidationError as error:
+                errors[key] = error.detail[0]
+
+        try:
+            recent_game_day = current_slot_game_day()
+        except GameDay.DoesNotExist:
+            return Response({"error": "No GameDay record exists. Please create a GameDay first."}, status=status.HTTP_400_BAD_REQUEST)
+
+        daily_amounts = list(
+            DailyAmount.objects.filter(game_day=recent_game_day, slot_machine_id__in=amounts)
+            .select_related('slot_machine').only('id', 'amount', 'slot_machine_id', 'slot_machine__hall_id')
+        )
+        found = {daily_amount.slot_machine_id for daily_amount in daily_amounts}
+        for slot_machine_id in amounts.keys() - found:
+            errors[str(slot_machine_id)] = "DailyAmount record not found."
+        if errors:
+            return Response({"errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        for daily_amount in daily_amounts:
+            daily_amount.amount = amounts[daily_amount.slot_machine_id]
+
+        with transaction.atomic():
+            updated = DailyAmount.objects.bulk_update(daily_amounts, ['amount'])
+            # bulk_update sends no signals; the rebuild also bumps the day version
+            halls = {daily_amount.slot_machine.hall_id for daily_amount in daily_amounts}
+            HallDailySummary.objects.rebuild(game_days=[recent_game_day], halls=halls)
+            response_cache.bump_on_write(response_cache.SLOT_AMOUNTS)
+            events.publish_on_commit(events.slot_channel(recent_game_day.id), {
+                'type': 'slot.amounts_changed',
+                'game_day': recent_game_day.id,
+                'amounts': [
+                    {'slot_machine': daily_amount.slot_machine_id, 'hall': daily_amount.slot_machine.hall_id,
+                     'amount': daily_amount.amount}
+                    for daily_amount in daily_amounts
+                ],
+            })
+
+        return Response({"message": "Slots closed successfully.", "updated": updated}, status=status.HTTP_200_OK)
+
+
 class SlotMachineAddToHallView(APIView):
     def put(self, request, *args, **kwargs):
         slot_machine_id = kwargs.get('slot_machine_id')
@@ -223,8 +370,12 @@ class SlotMachineAddToHallView(APIView):
         except Hall.DoesNotExist:
             return Response({"error": "Hall not found."}, status=status.HTTP_404_NOT_FOUND)
 
-        slot_machine.hall = hall
-        slot_machine.save()
+        with transaction.atomic():
+            previous_hall_id = slot_machine.hall_id
+            slot_machine.hall = hall
+            slot_machine.save()
+            if previous_hall_id != hall.id:
+                HallDailySummary.objects.refresh_machines([slot_machine.id], halls=[previous_hall_id, hall.id])
 
         return Response({"message": f"Slot Machine {slot_machine.name} has been added to Hall {hall.name}."}, status=status.HTTP_200_OK)
 
@@ -239,12 +390,54 @@ class SlotMachineRemoveFromHallView(APIView):
             return Response({"error": "Slot Machine not found."}, status=status.HTTP_404_NOT_FOUND)
 
         # Remove slot machine from the hall (set hall to None)
-        slot_machine.hall = None
-        slot_machine.save()
+        with transaction.atomic():
+            previous_hall_id = slot_machine.hall_id
+            slot_machine.hall = None
+            slot_machine.save()
+            if previous_hall_id is not None:
+                HallDailySummary.objects.refresh_machines([slot_machine.id], halls=[previous_hall_id])
 
         return Response({"message": f"Slot Machine {slot_machine.name} has been removed from its hall."}, status=status.HTTP_200_OK)
 
 
+class SlotMachinesMoveToHallView(APIView):
+    """
+    Moves many slot machines at once: ``{"slot_machines": [ids], "hall": id or null}``,
+    with a single UPDATE. Reports how many machines actually changed hall.
+    """
+    def put(self, request, *args, **kwargs):
+        slot_machine_ids = request.data.get('slot_machines')
+        if not isinstance(slot_machine_ids, list) or not slot_machine_ids or not all(
+                isinstance(slot_machine_id, int) and not isinstance(slot_machine_id, bool)
+                for slot_machine_id in slot_machine_ids):
+            return Response({"error": "slot_machines must be a non-empty list of slot machine ids."}, status=status.HTTP_400_BAD_REQUEST)
+
+        hall_id = request.data.get('hall')
+        if hall_id is not None and (not isinstance(hall_id, int) or isinstance(hall_id, bool)):
+            return Response({"error": "hall must be a hall id or null."}, status=status.HTTP_400_BAD_REQUEST)
+        if hall_id is not None and not Hall.objects.filter(id=hall_id).exists():
+            return Response({"error": "Hall not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        slot_machine_ids = set(slot_machine_ids)
+        moving = SlotMachine.objects.filter(id__in=slot_machine_ids)
+        current_halls = dict(moving.values_list('id', 'hall_id'))
+        missing = slot_machine_ids - current_halls.keys()
+        if missing:
+            return Response({"error": "Slot Machine not found.", "missing": sorted(missing)}, status=status.HTTP_404_NOT_FOUND)
+
+        moved = [slot_machine_id for slot_machine_id, current_hall_id in current_halls.items()
+                 if current_hall_id != hall_id]
+        with transaction.atomic():
+            updated = moving.exclude(hall_id=hall_id).update(hall_id=hall_id)
+            if updated:
+                # update() sends no signals; the rebuild also bumps the day versions
+                HallDailySummary.objects.refresh_machines(
+                    moved, halls={*(current_halls[slot_machine_id] for slot_machine_id in moved), hall_id})
+                response_cache.bump_on_write(response_cache.SLOT_FLOOR, response_cache.SLOT_AMOUNTS)
+
+        return Response({"message": "Slot Machines have been moved.", "updated": updated}, status=status.HTTP_200_OK)
+
+
 class CloseOpenGameDayView(APIView):
 
     def get(self, request, *args, **kwargs):
@@ -255,7 +448,6 @@ class CloseOpenGameDayView(APIView):
     def post(self, request, *args, **kwargs):
         # Get the current date from the request
         current_date = request.data.get('date')
-        print(f"Current Date from Frontend: {current_date}")
 
         if not current_date:
             return Response({"error": "Date is required."}, status=status.HTTP_400_BAD_REQUEST)
@@ -267,7 +459,6 @@ class CloseOpenGameDayView(APIView):
             if game_day_exists:
                 # If the current game day exists, create a new day with the next day date
                 new_date = (datetime.strptime(current_date, "%Y-%m-%d") + timedelta(days=1)).date()
-                print(f"New Date to be created: {new_date}")
             else:
                 # If the current date doesn't exist, set it as the new date
                 new_date = current_date
@@ -290,11 +481,15 @@ class CloseOpenGameDayView(APIView):
                 for slot_machine in slot_machines
             ]
             DailyAmount.objects.bulk_create(daily_amounts)
+            HallDailySummary.objects.rebuild(game_days=[game_day])
+            # bulk_create sends no signals
+            game_days.bump_version(game_days.SLOT, game_day.id)
+            response_cache.bump_on_write(response_cache.SLOT_AMOUNTS)
 
             return Response({"message": "New GameDay created and DailyAmount records added."}, status=status.HTTP_201_CREATED)
 
         except Exception as e:
-            print(f"Error: {str(e)}")
+            logger.exception("Could not open the slot game day after %s", current_date)
             return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -306,13 +501,58 @@ class GameDayRetrieveView(generics.RetrieveAPIView):
 
 class HallsWithSlotMachinesView(APIView):
     def get(self, request, *args, **kwargs):
+        return response_cache.cached_response(
+            request, 'slot-halls-with-machines', [],
+            [response_cache.SLOT_FLOOR, response_cache.SLOT_AMOUNTS],
+            self.halls,
+        )
+
+    def halls(self):
         halls = Hall.objects.prefetch_related('slot_machines').all()
         serializer = HallSerializer(halls, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return serializer.data
 
 class DailyAmountListCreateView(generics.ListCreateAPIView):
     queryset = DailyAmount.objects.all()
     serializer_class = DailyAmountSerializer
+    pagination_class = KeysetPagination
+
+    def perform_create(self, serializer):
+        with transaction.atomic():
+            daily_amount = serializer.save()
+            HallDailySummary.objects.apply(
+                daily_amount.slot_machine, daily_amount.game_day_id, amount=daily_amount.amount, machines=1)
+
+class DailyAmountImportView(APIView):
+    """
+    Bulk import of DailyAmount readings from a CSV or NDJSON upload in the
+    ``file`` field; see ``slot_machine.importer`` for the record layout.
+    """
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({"error": "Upload a CSV or NDJSON file in the 'file' field."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        file_format = request.data.get('file_format') or importer.format_for(upload.name)
+        if file_format not in importer.FORMATS:
+            return Response({"error": "File format must be csv or ndjson."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not importer.is_utf8(upload.chunks()):
+            return Response({"error": "The file must be UTF-8 encoded."}, status=status.HTTP_400_BAD_REQUEST)
+        upload.seek(0)
+
+        report = importer.import_daily_amounts(
+            codecs.iterdecode(upload, 'utf-8-sig'),
+            file_format,
+            overwrite=query_flag(request, 'overwrite', True),
+            create_game_days=query_flag(request, 'create_game_days', False),
+        )
+        if not report['written'] and report['error_count']:
+            return Response({"error": "No readings could be imported.", **report}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({"message": f"Imported {report['written']} readings.", **report}, status=status.HTTP_201_CREATED)
 
 # Retrieve, Update, and Delete DailyAmount objects
 class DailyAmountRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
@@ -320,3 +560,103 @@ class DailyAmountRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView
     serializer_class = DailyAmountSerializer
     lookup_field = 'id'
 
+    def perform_update(self, serializer):
+        with transaction.atomic():
+            # Take the amount being replaced under a lock so concurrent edits subtract the right one
+            previous = DailyAmount.objects.select_related('slot_machine').select_for_update().get(
+                pk=serializer.instance.pk)
+            daily_amount = serializer.save()
+            bucket = (daily_amount.slot_machine.hall_id, daily_amount.slot_machine.brand, daily_amount.game_day_id)
+            if bucket == (previous.slot_machine.hall_id, previous.slot_machine.brand, previous.game_day_id):
+                HallDailySummary.objects.apply(
+                    daily_amount.slot_machine, daily_amount.game_day_id, amount=daily_amount.amount - previous.amount)
+            else:
+                HallDailySummary.objects.apply(
+                    previous.slot_machine, previous.game_day_id, amount=-previous.amount, machines=-1)
+                HallDailySummary.objects.apply(
+                    daily_amount.slot_machine, daily_amount.game_day_id, amount=daily_amount.amount, machines=1)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            deleted = DailyAmount.objects.filter(pk=instance.pk).select_for_update().first()
+            if deleted is None:
+                return
+            instance.delete()
+            HallDailySummary.objects.apply(
+                instance.slot_machine, instance.game_day_id, amount=-deleted.amount, machines=-1)
+
+
+class AsyncHallListView(View):
+    """
+    Async variant of ``HallListView.get`` for ASGI workers; same payload,
+    cache entries and ETag.
+    """
+    async def get(self, request, *args, **kwargs):
+        start_date = request.GET.get('start_date')
+        end_date = request.GET.get('end_date')
+
+        if not start_date or not end_date:
+            try:
+                latest_game_day = await game_days.acurrent_slot_game_day()
+                start_date = end_date = latest_game_day.date.isoformat()
+            except GameDay.DoesNotExist:
+                return JsonResponse({"error": "No GameDay record exists."}, status=status.HTTP_404_NOT_FOUND)
+
+        try:
+            start, end = parse_date(start_date), parse_date(end_date)
+        except ValueError:
+            start = end = None
+        if start is None or end is None:
+            return JsonResponse({"error": "Invalid date format. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
+
+        async def build():
+            halls = [hall async for hall in HallListView.hall_queryset(start_date, end_date)]
+            hall_totals = await Hall.objects.all().amoney_totals(start_date, end_date)
+            return HallListView.hall_data(halls, start_date, end_date, hall_totals)
+
+        return await response_cache.acached_response(
+            request, 'slot-halls', [start_date, end_date], [response_cache.SLOT_FLOOR], build,
+            day_versions=lambda: game_days.aversions(game_days.SLOT, date__range=[start, end]),
+        )
+
+
+class AsyncCurrentGameDayView(View):
+    """Async variant of ``CurrentGameDayView.get``."""
+    async def get(self, request, *args, **kwargs):
+        try:
+            current_game_day = await game_days.acurrent_slot_game_day()
+        except GameDay.DoesNotExist:
+            return JsonResponse({"error": "No GameDay record exists."}, status=status.HTTP_404_NOT_FOUND)
+
+        async def build():
+            daily_amounts, halls = CurrentGameDayView.floor_queries(current_game_day)
+            # GameDaySerializer nests the day's amounts; load them up front
+            game_day = await GameDay.objects.prefetch_related('daily_amounts_by_game_day').aget(pk=current_game_day.pk)
+            return CurrentGameDayView.floor_data(
+                game_day,
+                [row async for row in daily_amounts.aiterator()],
+                [hall async for hall in halls],
+            )
+
+        return await response_cache.acached_response(
+            request, 'slot-game-date', [current_game_day.id], [response_cache.SLOT_FLOOR], build,
+            day_versions=lambda: game_days.aversions(game_days.SLOT, pk=current_game_day.id),
+        )
+
+
+class SlotEventStreamView(View):
+    """
+    Server-sent events for the slot floor of a game day (``?game_day=<id>``,
+    the current day by default): machine amounts as they are closed.
+    """
+    async def get(self, request, *args, **kwargs):
+        try:
+            game_day_id = request.GET.get('game_day') or (await sync_to_async(current_slot_game_day)()).id
+            game_day = await GameDay.objects.aget(id=game_day_id)
+        except (GameDay.DoesNotExist, ValueError):
+            return JsonResponse({"error": "No GameDay record exists."}, status=status.HTTP_404_NOT_FOUND)
+
+        return events.stream_response(
+            events.slot_channel(game_day.id),
+            {'type': 'ready', 'game_day': game_day.id, 'version': game_day.version},
+        )
@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.db.models import F
+from rest_framework import serializers
+
+from django_rest import events, game_days, money
+
+from game_table.models import CloseFloot, TableResult
+
+
+def ledger_deltas(amount):
+    """
+    Split a fill/credit amount into the CloseFloot column deltas it causes.
+    Fills are negative and go to ``total_fill``, credits are positive and go
+    to ``total_credit``; both move the close flot ``result``.
+    """
+    if amount < 0:
+        return {'total_fill': amount, 'total_credit': 0, 'result': amount}
+    return {'total_fill': 0, 'total_credit': amount, 'result': amount}
+
+
+def apply_deltas(table_id, game_day_id, total_fill=0, total_credit=0, result=0):
+    """
+    Add the deltas to the day's CloseFloot and TableResult rows with single
+    UPDATE ... SET col = col + delta statements, so concurrent postings to the
+    same table never overwrite each other.
+    """
+    apply_batch({(table_id, game_day_id): {'total_fill': total_fill, 'total_credit': total_credit, 'result': result}})
+
+
+def apply_batch(deltas):
+    """
+    Apply ``{(table_id, game_day_id): deltas}`` as ``apply_deltas`` does, all
+    in the caller's transaction: one pair of UPDATEs per table, in (table,
+    game day) order so concurrent batches lock rows in the same order, and
+    one version bump for every game day touched. ``update()`` sends no
+    signals, so the version is bumped and the changes pushed to the days'
+    event streams here.
+    """
+    with transaction.atomic(savepoint=False):
+        for (table_id, game_day_id), table_deltas in sorted(deltas.items()):
+            total_fill, total_credit, result = (
+                table_deltas.get(column, 0) for column in ('total_fill', 'total_credit', 'result'))
+
+            updated = CloseFloot.objects.filter(table_id=table_id, game_day_id=game_day_id).update(
+                total_fill=F('total_fill') + money.value(total_fill),
+                total_credit=F('total_credit') + money.value(total_credit),
+                result=F('result') + money.value(result),
+            )
+            if not updated:
+                raise serializers.ValidationError({"message": "Close Floot does not exist."})
+
+            updated = TableResult.objects.filter(table_id=table_id, game_day_id=game_day_id).update(
+                result=F('result') + money.value(result),
+            )
+            if not updated:
+                raise serializers.ValidationError({"message": "Table Result does not exist."})
+
+            events.publish_on_commit(events.live_channel(game_day_id), {
+                'type': 'fill_credit.posted',
+                'game_day': game_day_id,
+                'table': table_id,
+                'total_fill': total_fill,
+                'total_credit': total_credit,
+                'result': result,
+            })
+
+        game_days.bump_version(game_days.LIVE, *(game_day_id for _, game_day_id in deltas))
+
+
+def post(table_id, game_day_id, amount):
+    """Post one fill/credit to the table's ledger for the game day."""
+    apply_deltas(table_id, game_day_id, **ledger_deltas(amount))
+
+
+def reverse(table_id, game_day_id, amount):
+    """Take a previously posted fill/credit back out of the ledger."""
+    apply_deltas(table_id, game_day_id, **{column: -delta for column, delta in ledger_deltas(amount).items()})
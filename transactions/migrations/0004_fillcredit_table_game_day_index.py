@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game_table', '0014_table_game_day_constraints'),
+        ('transactions', '0003_alter_fillcredit_created_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='fillcredit',
+            index=models.Index(fields=['table', 'game_day'], name='fillcredit_table_game_day_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.1 on 2026-10-18 18:19
+
+import django_rest.money
+from django.db import migrations
+from django.db.models import F
+from django.db.models.functions import Round
+
+
+def to_minor_units(apps, schema_editor):
+    """Scale the float amounts to cents while the column is still a float."""
+    FillCredit = apps.get_model('transactions', 'FillCredit')
+    FillCredit.objects.update(fill_credit=Round(F('fill_credit') * 100))
+
+
+def from_minor_units(apps, schema_editor):
+    FillCredit = apps.get_model('transactions', 'FillCredit')
+    FillCredit.objects.update(fill_credit=F('fill_credit') / 100.0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_fillcredit_table_game_day_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(to_minor_units, from_minor_units),
+        migrations.AlterField(
+            model_name='fillcredit',
+            name='fill_credit',
+            field=django_rest.money.MoneyField(default=0),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 from django.utils import timezone
 from datetime import timedelta
+from django_rest.money import MoneyField
 from game_table.models import Table, GameDayLive
 
 
@@ -13,11 +14,16 @@ class FillCredit(models.Model):
     table = models.ForeignKey(Table, on_delete=models.CASCADE)
     game_day = models.ForeignKey(GameDayLive, on_delete=models.CASCADE)
     action_time = models.DateTimeField(null=True, blank=True)
-    fill_credit = models.FloatField(default=0.0)
+    fill_credit = MoneyField(default=0)
     result = models.FloatField(default=0.0)
     created_at = models.DateTimeField(default=adjusted_now)
     updated_at = models.DateTimeField(null=True, blank=True)
     deleted_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['table', 'game_day'], name='fillcredit_table_game_day_idx'),
+        ]
+
     def __str__(self):
         return f"FillCredit: {self.fill_credit}"
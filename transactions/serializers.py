@@ -1,6 +1,10 @@
+from django.db import transaction
 from rest_framework import serializers
+from rest_framework.exceptions import NotFound
+from django_rest import money
+from . import ledger
 from .models import FillCredit
-from game_table.models import TableResult, GameDayLive, CloseFloot
+from game_table.models import Table, GameDayLive, CloseFloot, TableResult
 from django.utils import timezone
 from datetime import timedelta
 
@@ -24,7 +28,7 @@ class FillCreditSerializer(serializers.ModelSerializer):
         return self.get(request)
 
     def create(self, validated_data):
-        table_id = validated_data.pop('table')
+        table = validated_data.pop('table')
         game_day_data = validated_data.pop('game_day')
         fill_credit_amount = validated_data.pop('fill_credit')
 
@@ -42,51 +46,27 @@ class FillCreditSerializer(serializers.ModelSerializer):
 
             try:
                 game_day_id = GameDayLive.objects.get(date=action_date).id
-                print(game_day_id)
             except GameDayLive.DoesNotExist:
                 raise serializers.ValidationError({"message": "Game Day does not exist."})
         else:
             action_time = timezone.now() + timedelta(hours=4)
 
-        try:
-            close_floot = CloseFloot.objects.filter(table=table_id, game_day_id=game_day_id).first()
-        except CloseFloot.DoesNotExist:
-            return serializers.ValidationError({"message": "Close Floot does not exist."})
+        if fill_credit_amount == 0:
+            raise serializers.ValidationError({"message": "Fill Credit amount cannot be zero."})
 
-        if fill_credit_amount < 0:
-            close_floot.total_fill += fill_credit_amount
-            close_floot.result += fill_credit_amount
-            close_floot.save()
-
-        elif fill_credit_amount > 0:
-            close_floot.total_credit += fill_credit_amount
-            close_floot.result += fill_credit_amount
-            close_floot.save()
-        else:
-            return serializers.ValidationError({"message": "Fill Credit amount cannot be zero."})
-
-
-        try:
-            table_result = TableResult.objects.get(
-                table=table_id, game_day_id=game_day_id
+        with transaction.atomic():
+            fill_credit = FillCredit.objects.create(
+                table=table,
+                game_day_id=game_day_id,
+                fill_credit=fill_credit_amount,
+                action_time=action_time
             )
-        except TableResult.DoesNotExist:
-            raise serializers.ValidationError({"message": "Table Result does not exist."})
-
-        fill_credit = FillCredit.objects.create(
-            table=table_id,
-            game_day_id=game_day_id,
-            fill_credit=fill_credit_amount,
-            action_time=action_time
-        )
-
-        table_result.result += fill_credit_amount
-        table_result.save()
+            ledger.post(table.id, game_day_id, fill_credit_amount)
 
         return fill_credit
 
     def update(self, instance, validated_data):
-        table_id = validated_data.pop('table', instance.table)
+        table = validated_data.pop('table', instance.table)
         game_day_data = validated_data.pop('game_day', instance.game_day)
         new_fill_credit_amount = validated_data.pop('fill_credit', instance.fill_credit)
         new_action_time = validated_data.pop('action_time', instance.action_time)
@@ -96,75 +76,129 @@ class FillCreditSerializer(serializers.ModelSerializer):
         else:
             game_day_id = game_day_data
 
-        if timezone.is_naive(new_action_time):
+        if new_action_time and timezone.is_naive(new_action_time):
             new_action_time = timezone.make_aware(new_action_time, timezone.get_current_timezone())
-        action_date = new_action_time.date()
-
-        try:
-            close_floot = CloseFloot.objects.filter(table=table_id, game_day_id=game_day_id).first()
-        except CloseFloot.DoesNotExist:
-            return serializers.ValidationError({"message": "Close Floot does not exist."})
-
-        old_fill_credit_amount = instance.fill_credit
-
-        if old_fill_credit_amount < 0:
-            close_floot.total_fill -= old_fill_credit_amount
-            close_floot.result -= old_fill_credit_amount
-            if new_fill_credit_amount < 0:
-                close_floot.total_fill += new_fill_credit_amount
-                close_floot.result += new_fill_credit_amount
-                close_floot.save()
-            elif new_fill_credit_amount > 0:
-                close_floot.total_credit += new_fill_credit_amount
-                close_floot.result += new_fill_credit_amount
-                close_floot.save()
-            else:
-                return serializers.ValidationError({"message": "Fill Credit amount cannot be zero."})
-
-        elif old_fill_credit_amount > 0:
-            close_floot.total_credit -= old_fill_credit_amount
-            close_floot.result -= old_fill_credit_amount
-            if new_fill_credit_amount < 0:
-                close_floot.total_fill += new_fill_credit_amount
-                close_floot.result += new_fill_credit_amount
-                close_floot.save()
-            elif new_fill_credit_amount > 0:
-                close_floot.total_credit += new_fill_credit_amount
-                close_floot.result += new_fill_credit_amount
-                close_floot.save()
-            else:
-                return serializers.ValidationError({"message": "Fill Credit amount cannot be zero."})
-
-        instance.fill_credit = new_fill_credit_amount
-        instance.action_time = new_action_time
-        instance.updated_at = timezone.now() + timedelta(hours=4)
-        instance.save()
-
-        try:
-            table_result = TableResult.objects.get(
-                table=table_id, game_day_id=game_day_id
-            )
-        except TableResult.DoesNotExist:
-            raise serializers.ValidationError({"message": "Table Result does not exist."})
 
-        table_result.result -= old_fill_credit_amount
-        table_result.result += new_fill_credit_amount
-        table_result.save()
+        if new_fill_credit_amount == 0:
+            raise serializers.ValidationError({"message": "Fill Credit amount cannot be zero."})
+
+        with transaction.atomic():
+            # Reverse what is actually posted, not what this request read earlier
+            posted = FillCredit.objects.select_for_update().get(pk=instance.pk)
+            ledger.reverse(posted.table_id, posted.game_day_id, posted.fill_credit)
+            ledger.post(table.id, game_day_id, new_fill_credit_amount)
+
+            instance.table = table
+            instance.game_day_id = game_day_id
+            instance.fill_credit = new_fill_credit_amount
+            instance.action_time = new_action_time
+            instance.updated_at = timezone.now() + timedelta(hours=4)
+            instance.save()
 
         return instance
 
     def delete(self, instance):
-        table_id = instance.table
-        game_day_id = instance
-        fill_credit_amount = instance.fill_credit
-
-        try:
-            table_result = TableResult.objects.get(table=table_id, game_day=game_day_id)
-        except TableResult.DoesNotExist:
-            raise serializers.ValidationError({"message": "Table Result does not exist."})
+        with transaction.atomic():
+            try:
+                posted = FillCredit.objects.select_for_update().get(pk=instance.pk)
+            except FillCredit.DoesNotExist:
+                raise NotFound({"message": "Fill Credit does not exist."})
 
-        table_result.result -= fill_credit_amount
-        table_result.save()
+            ledger.reverse(posted.table_id, posted.game_day_id, posted.fill_credit)
+            posted.delete()
 
-        instance.delete()
         return instance
+
+
+class FillCreditBatchItemSerializer(serializers.Serializer):
+    table = serializers.IntegerField()
+    game_day = serializers.IntegerField(required=False, allow_null=True)
+    fill_credit = money.MoneySerializerField()
+    action_time = serializers.DateTimeField(required=False, allow_null=True)
+
+    def validate_fill_credit(self, value):
+        if value == 0:
+            raise serializers.ValidationError("Fill Credit amount cannot be zero.")
+        return value
+
+    def validate(self, attrs):
+        action_time = attrs.get('action_time')
+        if action_time and timezone.is_naive(action_time):
+            attrs['action_time'] = timezone.make_aware(action_time, timezone.get_current_timezone())
+        if not attrs.get('action_time') and not attrs.get('game_day'):
+            raise serializers.ValidationError({"game_day": "Either game_day or action_time is required."})
+        return attrs
+
+
+class FillCreditBatchSerializer(serializers.Serializer):
+    entries = FillCreditBatchItemSerializer(many=True, allow_empty=False, max_length=1000)
+
+    def validate(self, attrs):
+        entries = attrs['entries']
+
+        table_ids = {entry['table'] for entry in entries}
+        known_tables = set(Table.objects.filter(id__in=table_ids).values_list('id', flat=True))
+
+        action_dates = {entry['action_time'].date() for entry in entries if entry.get('action_time')}
+        game_days_by_date = dict(GameDayLive.objects.filter(date__in=action_dates).values_list('date', 'id'))
+        game_day_ids = {entry['game_day'] for entry in entries if entry.get('game_day')}
+        known_game_days = set(GameDayLive.objects.filter(id__in=game_day_ids).values_list('id', flat=True))
+
+        # Same rule as a single posting: action_time picks the game day by date
+        for entry in entries:
+            if entry.get('action_time'):
+                entry['game_day'] = game_days_by_date.get(entry['action_time'].date())
+
+        candidate_days = set(game_days_by_date.values()) | known_game_days
+        open_pairs = set(
+            CloseFloot.objects.filter(table_id__in=table_ids, game_day_id__in=candidate_days)
+            .values_list('table_id', 'game_day_id')
+        ) & set(
+            TableResult.objects.filter(table_id__in=table_ids, game_day_id__in=candidate_days)
+            .values_list('table_id', 'game_day_id')
+        )
+
+        errors = []
+        for entry in entries:
+            entry_errors = {}
+            if entry['table'] not in known_tables:
+                entry_errors['table'] = ["Table with this ID does not exist."]
+            if entry.get('action_time') and entry['game_day'] is None:
+                entry_errors['action_time'] = ["Game Day does not exist."]
+            elif not entry.get('action_time') and entry['game_day'] not in known_game_days:
+                entry_errors['game_day'] = ["Game Day does not exist."]
+            elif not entry_errors and (entry['table'], entry['game_day']) not in open_pairs:
+                entry_errors['table'] = ["Close Floot does not exist for this game day."]
+            errors.append(entry_errors)
+
+        if any(errors):
+            raise serializers.ValidationError({'entries': errors})
+
+        return attrs
+
+    def create(self, validated_data):
+        entries = validated_data['entries']
+        default_action_time = timezone.now() + timedelta(hours=4)
+
+        deltas = {}
+        for entry in entries:
+            table_deltas = deltas.setdefault((entry['table'], entry['game_day']),
+                                             {'total_fill': 0, 'total_credit': 0, 'result': 0})
+            for column, delta in ledger.ledger_deltas(entry['fill_credit']).items():
+                table_deltas[column] += delta
+
+        with transaction.atomic():
+            fill_credits = FillCredit.objects.bulk_create([
+                FillCredit(
+                    table_id=entry['table'],
+                    game_day_id=entry['game_day'],
+                    fill_credit=entry['fill_credit'],
+                    action_time=entry.get('action_time') or default_action_time,
+                )
+                for entry in entries
+            ], batch_size=500)
+
+            # One pair of UPDATEs per table and one version bump per game day
+            ledger.apply_batch(deltas)
+
+        return fill_credits
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from django_rest import game_days
+from .models import FillCredit
+
+
+@receiver(post_save, sender=FillCredit)
+@receiver(post_delete, sender=FillCredit)
+def bump_live_game_day_version(sender, instance, **kwargs):
+    game_days.bump_version(game_days.LIVE, instance.game_day_id)
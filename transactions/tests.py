@@ -1,3 +1,203 @@
-from django.test import TestCase
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from decimal import Decimal
 
-# Create your tests here.
+from django.db import connections
+from django.db.models import BigIntegerField
+from django.db.models.functions import Cast
+from django.test import Client, TestCase, TransactionTestCase
+
+from game_table.models import Table, CloseFloot, GameDayLive, TableResult
+from .models import FillCredit
+
+
+def open_table(name='T1', game_day=None):
+    game_day = game_day or GameDayLive.objects.create(date=date(2024, 11, 1))
+    table = Table.objects.create(name=name)
+    CloseFloot.objects.create(table=table, game_day=game_day)
+    TableResult.objects.create(table=table, game_day=game_day)
+    return table, game_day
+
+
+class FillCreditLedgerTests(TestCase):
+    url = '/api/transactions/fill-credit/'
+
+    def setUp(self):
+        self.table, self.game_day = open_table()
+
+    def post_fill_credit(self, amount, table=None):
+        return self.client.post(self.url, {
+            'table': (table or self.table).id,
+            'game_day': self.game_day.id,
+            'fill_credit': amount,
+        }, content_type='application/json')
+
+    def assertLedger(self, total_fill, total_credit, result, table=None):
+        close_floot = CloseFloot.objects.get(table=table or self.table, game_day=self.game_day)
+        table_result = TableResult.objects.get(table=table or self.table, game_day=self.game_day)
+        self.assertEqual(
+            (close_floot.total_fill, close_floot.total_credit, close_floot.result, table_result.result),
+            (total_fill, total_credit, result, result),
+        )
+
+    def test_fills_and_credits_are_posted(self):
+        self.assertEqual(self.post_fill_credit(-100).status_code, 201)
+        self.assertEqual(self.post_fill_credit(250).status_code, 201)
+
+        self.assertLedger(-100, 250, 150)
+
+    def test_posting_bumps_the_game_day_version(self):
+        before = GameDayLive.objects.get().version
+
+        self.post_fill_credit(-100)
+
+        # The FillCredit row and the ledger update each move it
+        self.assertEqual(GameDayLive.objects.get().version, before + 2)
+
+    def test_amounts_are_summed_exactly(self):
+        for _ in range(10):
+            self.post_fill_credit(0.1)
+
+        self.assertLedger(0, Decimal('1.00'), Decimal('1.00'))
+        # Stored as cents
+        self.assertEqual(list(CloseFloot.objects.values_list(Cast('total_credit', BigIntegerField()), flat=True)),
+                         [100])
+        response = self.client.get(self.url)
+        self.assertEqual(response.json()['results'][0]['fill_credit'], 0.1)
+
+    def test_zero_amount_is_rejected(self):
+        response = self.post_fill_credit(0)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(FillCredit.objects.exists())
+
+    def test_update_moves_the_posting(self):
+        self.post_fill_credit(-100)
+        fill_credit = FillCredit.objects.get()
+
+        response = self.client.put(f'{self.url}{fill_credit.id}/', {'fill_credit': 40},
+                                   content_type='application/json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLedger(0, 40, 40)
+
+    def test_update_to_another_table_moves_both_ledgers(self):
+        other_table, _ = open_table('T2', game_day=self.game_day)
+        self.post_fill_credit(-100)
+        fill_credit = FillCredit.objects.get()
+
+        self.client.put(f'{self.url}{fill_credit.id}/', {'table': other_table.id},
+                        content_type='application/json')
+
+        self.assertLedger(0, 0, 0)
+        self.assertLedger(-100, 0, -100, table=other_table)
+
+    def test_delete_reverses_the_posting(self):
+        self.post_fill_credit(75)
+        fill_credit = FillCredit.objects.get()
+
+        response = self.client.delete(f'{self.url}{fill_credit.id}/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLedger(0, 0, 0)
+        self.assertFalse(FillCredit.objects.exists())
+
+
+class FillCreditBatchCreateTests(TestCase):
+    url = '/api/transactions/fill-credit/batch/'
+
+    def setUp(self):
+        self.table, self.game_day = open_table()
+        self.other_table, _ = open_table('T2', game_day=self.game_day)
+
+    def post_batch(self, entries):
+        return self.client.post(self.url, {'entries': entries}, content_type='application/json')
+
+    def test_posts_every_entry_and_sums_per_table(self):
+        response = self.post_batch([
+            {'table': self.table.id, 'game_day': self.game_day.id, 'fill_credit': -100},
+            {'table': self.table.id, 'game_day': self.game_day.id, 'fill_credit': 30},
+            {'table': self.other_table.id, 'game_day': self.game_day.id, 'fill_credit': 55},
+            {'table': self.table.id, 'action_time': '2024-11-01T22:15:00', 'fill_credit': -5},
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual([item['index'] for item in response.json()['results']], [0, 1, 2, 3])
+        self.assertEqual(FillCredit.objects.count(), 4)
+        close_floot = CloseFloot.objects.get(table=self.table)
+        self.assertEqual((close_floot.total_fill, close_floot.total_credit, close_floot.result), (-105, 30, -75))
+        self.assertEqual(TableResult.objects.get(table=self.other_table).result, 55)
+
+    def test_query_count_does_not_grow_with_entries(self):
+        entries = [{'table': self.table.id, 'game_day': self.game_day.id, 'fill_credit': 10}]
+        with self.assertNumQueries(10):
+            self.post_batch(entries)
+        with self.assertNumQueries(10):
+            self.post_batch(entries * 100)
+
+    def test_each_extra_table_costs_one_pair_of_updates(self):
+        entries = [{'table': table.id, 'game_day': self.game_day.id, 'fill_credit': 10}
+                   for table in (self.table, self.other_table)]
+        version = GameDayLive.objects.get(pk=self.game_day.pk).version
+
+        with self.assertNumQueries(12):
+            self.post_batch(entries)
+
+        self.assertEqual(GameDayLive.objects.get(pk=self.game_day.pk).version, version + 1)
+
+    def test_one_bad_entry_rejects_the_batch(self):
+        unopened = Table.objects.create(name='T3')
+
+        response = self.post_batch([
+            {'table': self.table.id, 'game_day': self.game_day.id, 'fill_credit': 10},
+            {'table': unopened.id, 'game_day': self.game_day.id, 'fill_credit': 10},
+            {'table': self.table.id, 'action_time': '2030-01-01T10:00:00', 'fill_credit': 10},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        errors = response.json()['entries']
+        self.assertEqual(errors[0], {})
+        self.assertIn('table', errors[1])
+        self.assertIn('action_time', errors[2])
+        self.assertFalse(FillCredit.objects.exists())
+        self.assertEqual(TableResult.objects.get(table=self.table).result, 0)
+
+    def test_invalid_amounts_are_reported_per_entry(self):
+        response = self.post_batch([
+            {'table': self.table.id, 'game_day': self.game_day.id, 'fill_credit': 10},
+            {'table': self.table.id, 'game_day': self.game_day.id, 'fill_credit': 0},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['entries'][0], {})
+        self.assertIn('fill_credit', response.json()['entries'][1])
+
+
+class ConcurrentFillCreditTests(TransactionTestCase):
+    url = '/api/transactions/fill-credit/'
+
+    def test_parallel_postings_are_not_lost(self):
+        # Under the shipped database settings: no locking mode is patched in
+        table, game_day = open_table()
+        amounts = [(-1) ** index * (index % 7 + 1) * 5 for index in range(300)]
+
+        def post(amount):
+            try:
+                return Client().post(self.url, {
+                    'table': table.id,
+                    'game_day': game_day.id,
+                    'fill_credit': amount,
+                }, content_type='application/json').status_code
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            statuses = list(executor.map(post, amounts))
+
+        self.assertEqual(statuses, [201] * len(amounts))
+        close_floot = CloseFloot.objects.get(table=table, game_day=game_day)
+        self.assertEqual(close_floot.total_fill, sum(amount for amount in amounts if amount < 0))
+        self.assertEqual(close_floot.total_credit, sum(amount for amount in amounts if amount > 0))
+        self.assertEqual(close_floot.result, sum(amounts))
+        self.assertEqual(TableResult.objects.get(table=table, game_day=game_day).result, sum(amounts))
+        self.assertEqual(FillCredit.objects.count(), len(amounts))
@@ -1,8 +1,9 @@
 from django.urls import path
-from .views import FillCreditListCreate, FillCreditRetrieveUpdateDestroy
+from .views import FillCreditListCreate, FillCreditRetrieveUpdateDestroy, FillCreditBatchCreate
 
 
 urlpatterns = [
     path('fill-credit/', FillCreditListCreate.as_view(), name='fill-credit-list-create'),
+    path('fill-credit/batch/', FillCreditBatchCreate.as_view(), name='fill-credit-batch-create'),
     path('fill-credit/<int:pk>/', FillCreditRetrieveUpdateDestroy.as_view(), name='fill-credit-retrieve-update-destroy'),
 ]
\ No newline at end of file
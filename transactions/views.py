@@ -1,10 +1,12 @@
 from rest_framework import generics
 from rest_framework.response import Response
-from rest_framework.exceptions import NotFound
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework import status
 from .models import FillCredit
-from .serializers import FillCreditSerializer
-from game_table.models import GameDayLive, TableResult
+from .serializers import FillCreditSerializer, FillCreditBatchSerializer
+from game_table.models import GameDayLive
+from django_rest.game_days import current_live_game_day
+from django_rest.pagination import KeysetPagination
 
 
 # Create your views here.
@@ -12,6 +14,7 @@ from game_table.models import GameDayLive, TableResult
 
 class FillCreditListCreate(generics.ListCreateAPIView):
     serializer_class = FillCreditSerializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         start_date = self.request.query_params.get('start_date', None)
@@ -28,17 +31,19 @@ class FillCreditListCreate(generics.ListCreateAPIView):
             except GameDayLive.DoesNotExist:
                 raise NotFound({"message": "End date does not exist."})
 
-            return FillCredit.objects.filter(game_day__date__gte=start_date.date, game_day__date__lte=end_date.date)
+            return FillCredit.objects.select_related('table', 'game_day').filter(
+                game_day__date__gte=start_date.date, game_day__date__lte=end_date.date)
 
         else:
             try:
-                current_game_day = GameDayLive.objects.latest('date')
+                current_game_day = current_live_game_day()
                 start_date = current_game_day
                 end_date = current_game_day
             except GameDayLive.DoesNotExist:
                 raise NotFound({"message": "Game Day does not exist."})
 
-            return FillCredit.objects.filter(game_day__date__gte=start_date.date, game_day__date__lte=end_date.date)
+            return FillCredit.objects.select_related('table', 'game_day').filter(
+                game_day__date__gte=start_date.date, game_day__date__lte=end_date.date)
 
 
 
@@ -75,14 +80,34 @@ class FillCreditRetrieveUpdateDestroy(generics.RetrieveUpdateDestroyAPIView):
         except FillCredit.DoesNotExist:
             return Response({"message": "Fill Credit does not exist."}, status=status.HTTP_404_NOT_FOUND)
 
+        serializer = self.get_serializer(fill_credit)
         try:
-            table_result = TableResult.objects.get(table=fill_credit.table, game_day=fill_credit.game_day)
-        except TableResult.DoesNotExist:
-            return Response({"message": "Table Result does not exist."}, status=status.HTTP_404_NOT_FOUND)
+            serializer.delete(fill_credit)
+        except ValidationError as error:
+            return Response(error.detail, status=status.HTTP_404_NOT_FOUND)
 
-        table_result.result -= fill_credit.fill_credit
-        table_result.save()
+        return Response({"message": "Fill Credit has been deleted."}, status=status.HTTP_200_OK)
 
-        fill_credit.delete()
 
-        return Response({"message": "Fill Credit has been deleted."}, status=status.HTTP_200_OK)
+class FillCreditBatchCreate(generics.CreateAPIView):
+    serializer_class = FillCreditBatchSerializer
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        fill_credits = serializer.save()
+        return Response({
+            "message": f"{len(fill_credits)} Fill Credits have been Added.",
+            "results": [
+                {
+                    "index": index,
+                    "id": fill_credit.id,
+                    "table": fill_credit.table_id,
+                    "game_day": fill_credit.game_day_id,
+                    "fill_credit": fill_credit.fill_credit,
+                }
+                for index, fill_credit in enumerate(fill_credits)
+            ],
+        }, status=status.HTTP_201_CREATED)